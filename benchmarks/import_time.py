@@ -0,0 +1,67 @@
+"""Measure cold import time of sendparcel-inpost entry points.
+
+Each scenario runs in a fresh interpreter, repeated ``--runs`` times,
+and reports the minimum and median wall time together with whether
+``httpx`` ended up loaded.
+
+Usage::
+
+    uv run python benchmarks/import_time.py --runs 20
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+SCENARIOS: dict[str, str] = {
+    "package": "import sendparcel_inpost",
+    "locker entry point": (
+        "from sendparcel_inpost.providers.locker import InPostLockerProvider"
+    ),
+    "courier entry point": (
+        "from sendparcel_inpost.providers.courier import InPostCourierProvider"
+    ),
+    "client built": (
+        "from sendparcel_inpost import ShipXClient\n"
+        "ShipXClient(token='t', organization_id=1)"
+    ),
+}
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, 'httpx' in sys.modules)
+"""
+
+
+def _measure(statement: str) -> tuple[float, bool]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(output[0]), output[1] == "True"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<22}{'min ms':>9}{'median ms':>11}  httpx loaded")
+    for name, statement in SCENARIOS.items():
+        samples = [_measure(statement) for _ in range(args.runs)]
+        times = [elapsed * 1000 for elapsed, _ in samples]
+        loaded = any(flag for _, flag in samples)
+        print(
+            f"{name:<22}{min(times):>9.1f}"
+            f"{statistics.median(times):>11.1f}  {loaded}"
+        )
+
+
+if __name__ == "__main__":
+    main()
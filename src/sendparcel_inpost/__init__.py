@@ -2,9 +2,21 @@
 
 __version__ = "0.1.0"
 
-from sendparcel_inpost.client import ShipXClient
-from sendparcel_inpost.providers.courier import InPostCourierProvider
-from sendparcel_inpost.providers.locker import InPostLockerProvider
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sendparcel_inpost.client import ShipXClient
+    from sendparcel_inpost.providers.courier import InPostCourierProvider
+    from sendparcel_inpost.providers.locker import InPostLockerProvider
+
+# Public names are resolved on first access so that importing the package
+# (e.g. during entry-point discovery) stays cheap.
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "InPostCourierProvider": "sendparcel_inpost.providers.courier",
+    "InPostLockerProvider": "sendparcel_inpost.providers.locker",
+    "ShipXClient": "sendparcel_inpost.client",
+}
 
 __all__ = [
     "InPostCourierProvider",
@@ -12,3 +24,16 @@ __all__ = [
     "ShipXClient",
     "__version__",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,228 @@
+"""Adaptive (AIMD) concurrency limit for ShipX requests.
+
+The right number of requests in flight depends on how busy ShipX is, so
+:class:`AdaptiveConcurrencyLimiter` keeps adjusting it from responses:
+
+* every response within ``latency_tolerance`` times the baseline
+  latency raises the limit additively, by about ``increase`` per
+  ``limit`` responses (one round trip's worth);
+* a 429, a 5xx, a timeout or a response slower than that cuts the limit
+  to ``decrease`` times its value, once per round trip;
+* when ShipX reports the remaining request quota in rate-limit headers,
+  the limit never exceeds it.
+
+The baseline is a slow moving average of response latency kept per
+operation (labels are slower than status lookups), so it also follows a
+lasting change in ShipX latency. Pass the limiter to
+:class:`ShipXClient`::
+
+    limiter = AdaptiveConcurrencyLimiter(initial=10, max_limit=100)
+    client = ShipXClient(token, organization_id, concurrency_limiter=limiter)
+    metrics.gauge("shipx.concurrency_limit", limiter.limit)
+"""
+
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from typing import Protocol
+
+import anyio
+
+DEFAULT_INITIAL_LIMIT = 10
+DEFAULT_MAX_LIMIT = 200
+DEFAULT_DECREASE = 0.5
+DEFAULT_LATENCY_TOLERANCE = 2.0
+DEFAULT_BASELINE_SMOOTHING = 0.05
+
+_OVERLOAD_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_REMAINING_HEADERS = ("x-ratelimit-remaining", "ratelimit-remaining")
+
+
+class _Response(Protocol):
+    @property
+    def status_code(self) -> int: ...
+
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+
+
+@dataclass
+class ConcurrencyStats:
+    """Snapshot of an :class:`AdaptiveConcurrencyLimiter`."""
+
+    limit: int
+    in_flight: int
+    waiting: int
+    baseline_latency: dict[str, float]
+    remaining: int | None
+    increases: int
+    decreases: int
+
+
+def _remaining(headers: Mapping[str, str]) -> int | None:
+    for name in _REMAINING_HEADERS:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return max(0, int(float(value)))
+            except ValueError:
+                return None
+    return None
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limit requests in flight with additive increase, multiplicative decrease.
+
+    Args:
+        initial: Starting limit.
+        min_limit: The limit never drops below this.
+        max_limit: The limit never grows above this.
+        increase: Limit added per ``limit`` healthy responses.
+        decrease: Factor applied to the limit on overload.
+        latency_tolerance: Responses slower than this multiple of the
+            baseline latency count as overload.
+        on_change: Called with the new limit whenever it changes, e.g.
+            to export it as a metric.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        increase: float = 1.0,
+        decrease: float = DEFAULT_DECREASE,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+        baseline_smoothing: float = DEFAULT_BASELINE_SMOOTHING,
+        on_change: Callable[[int], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial <= max_limit")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.baseline_smoothing = baseline_smoothing
+        self.on_change = on_change
+        self.baseline_latency: dict[str, float] = {}
+        self.remaining: int | None = None
+        self.increases = 0
+        self.decreases = 0
+        self._clock = clock
+        self._limit = float(initial)
+        self._last_decrease = float("-inf")
+        self._limiter = anyio.CapacityLimiter(initial)
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def stats(self) -> ConcurrencyStats:
+        """Return the current limit and counters."""
+        statistics = self._limiter.statistics()
+        return ConcurrencyStats(
+            limit=self.limit,
+            in_flight=statistics.borrowed_tokens,
+            waiting=statistics.tasks_waiting,
+            baseline_latency=dict(self.baseline_latency),
+            remaining=self.remaining,
+            increases=self.increases,
+            decreases=self.decreases,
+        )
+
+    async def run[R: _Response](
+        self,
+        call: Callable[[], Awaitable[R]],
+        *,
+        key: str = "",
+        hold: bool = True,
+    ) -> R:
+        """Await ``call()`` within the limit and learn from its outcome.
+
+        ``key`` names the operation whose baseline latency applies. With
+        ``hold=False`` the call does not wait for (or take) a slot, but
+        its response still adjusts the limit.
+        """
+        if not hold:
+            return await self._observe(call, key)
+        async with self._limiter:
+            return await self._observe(call, key)
+
+    async def _observe[R: _Response](
+        self,
+        call: Callable[[], Awaitable[R]],
+        key: str,
+    ) -> R:
+        import httpx
+
+        started = self._clock()
+        try:
+            response = await call()
+        except httpx.TimeoutException:
+            self._on_overload(started)
+            raise
+        self.record(
+            started,
+            self._clock() - started,
+            response.status_code,
+            response.headers,
+            key=key,
+        )
+        return response
+
+    def record(
+        self,
+        started: float,
+        latency: float,
+        status_code: int,
+        headers: Mapping[str, str] | None = None,
+        *,
+        key: str = "",
+    ) -> None:
+        """Adjust the limit for a response to a request sent at ``started``."""
+        remaining = _remaining(headers or {})
+        if remaining is not None:
+            self.remaining = remaining
+        if status_code in _OVERLOAD_STATUS_CODES:
+            self._on_overload(started)
+            return
+        baseline = self.baseline_latency.get(key)
+        self.baseline_latency[key] = (
+            latency
+            if baseline is None
+            else baseline + self.baseline_smoothing * (latency - baseline)
+        )
+        if baseline is not None and latency > baseline * self.latency_tolerance:
+            self._on_overload(started)
+        else:
+            self._set_limit(self._limit + self.increase / self._limit)
+
+    def _on_overload(self, started: float) -> None:
+        # Requests sent before the last cut saw the old limit; one cut per
+        # round trip is enough.
+        if started < self._last_decrease:
+            return
+        self._last_decrease = self._clock()
+        self._set_limit(self._limit * self.decrease)
+
+    def _set_limit(self, value: float) -> None:
+        ceiling = self.max_limit
+        if self.remaining is not None:
+            ceiling = min(ceiling, max(self.min_limit, self.remaining))
+        previous = self.limit
+        self._limit = min(max(value, self.min_limit), ceiling)
+        if self.limit == previous:
+            return
+        if self.limit > previous:
+            self.increases += 1
+        else:
+            self.decreases += 1
+        self._limiter.total_tokens = self.limit
+        if self.on_change is not None:
+            self.on_change(self.limit)
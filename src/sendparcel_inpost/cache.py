@@ -0,0 +1,67 @@
+"""Small in-process caches used by the ShipX client."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+class TTLCache[K: Hashable, V]:
+    """Bounded mapping whose entries expire ``ttl`` seconds after insert.
+
+    When ``maxsize`` is reached the least recently used entry is evicted.
+    Not thread-safe; meant to be owned by a single event loop.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        *,
+        maxsize: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] > self._clock()
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value, or ``None`` if missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires, value = item
+        if expires <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: K | None = None) -> None:
+        """Drop one entry, or every entry when ``key`` is omitted."""
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
@@ -1,20 +1,83 @@
 """ShipX API async HTTP client."""
 
-from typing import Any
+import logging
+from collections.abc import (
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from contextlib import contextmanager
+from datetime import datetime
 from types import TracebackType
+from typing import TYPE_CHECKING, Any
 
-import httpx
+import anyio
+from sendparcel.enums import ShipmentStatus
 
+from sendparcel_inpost.enums import ShipXCancelOutcome, ShipXRequestLane
 from sendparcel_inpost.exceptions import (
     ShipXAPIError,
     ShipXAuthenticationError,
     ShipXValidationError,
 )
+from sendparcel_inpost.status_mapping import (
+    map_shipx_status,
+    shipx_statuses_for,
+)
+from sendparcel_inpost.types import ShipXCancelResult, ShipXSyncResult
+
+# Optional collaborators are imported where they are used, so that
+# importing the client (and with it the providers) stays cheap.
+if TYPE_CHECKING:
+    import httpx
+
+    from sendparcel_inpost.adaptive import AdaptiveConcurrencyLimiter
+    from sendparcel_inpost.cache import TTLCache
+    from sendparcel_inpost.hedging import HedgingPolicy
+    from sendparcel_inpost.lanes import Bulkhead
+    from sendparcel_inpost.pricing import PriceKey
+    from sendparcel_inpost.ratelimit import RateLimiter
+    from sendparcel_inpost.waiters import StatusWaiterRegistry
+
+logger = logging.getLogger(__name__)
 
 PRODUCTION_BASE_URL = "https://api-shipx-pl.easypack24.net"
 SANDBOX_BASE_URL = "https://sandbox-api-shipx-pl.easypack24.net"
 
 DEFAULT_TIMEOUT = 30.0
+DEFAULT_BULK_CONCURRENCY = 10
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_CALCULATE_BATCH_SIZE = 100
+DEFAULT_POINTS_PAGE_SIZE = 500
+DEFAULT_TRACKING_CACHE_SIZE = 10_000
+TRANSIENT_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+DEFAULT_CREATE_ATTEMPTS = 3
+DEFAULT_CREATE_RETRY_DELAY = 0.5
+# Connection pool defaults mirror httpx.Limits().
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+# keep_warm re-warms twice per keepalive_expiry by default.
+DEFAULT_KEEP_WARM_FRACTION = 0.5
+# Operation names accepted in ``operation_timeouts``.
+OPERATIONS = frozenset(
+    {
+        "calculate_prices",
+        "cancel_shipment",
+        "create_dispatch_order",
+        "create_shipment",
+        "get_label",
+        "get_services",
+        "get_shipment",
+        "get_statuses",
+        "get_tracking",
+        "iter_points",
+        "list_shipments",
+        "warm_up",
+    },
+)
 
 
 class ShipXClient:
@@ -36,6 +99,22 @@ class ShipXClient:
         sandbox: bool = False,
         base_url: str | None = None,
         timeout: float = DEFAULT_TIMEOUT,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        write_timeout: float | None = None,
+        pool_timeout: float | None = None,
+        operation_timeouts: Mapping[str, float] | None = None,
+        tracking_cache_ttl: float | None = None,
+        tracking_cache_size: int = DEFAULT_TRACKING_CACHE_SIZE,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        rate_limiter: "RateLimiter | None" = None,
+        validate_payloads: bool = False,
+        price_cache: "TTLCache[PriceKey, dict[str, Any]] | None" = None,
+        hedging: "HedgingPolicy | None" = None,
+        lanes: Mapping[str, int] | None = None,
+        concurrency_limiter: "AdaptiveConcurrencyLimiter | None" = None,
     ) -> None:
         if base_url is not None:
             self.base_url = base_url
@@ -45,13 +124,79 @@ class ShipXClient:
             self.base_url = PRODUCTION_BASE_URL
         self.organization_id = organization_id
         self.timeout = timeout
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.tracking_cache: TTLCache[str, dict[str, Any]] | None = None
+        if tracking_cache_ttl:
+            from sendparcel_inpost import cache
+
+            self.tracking_cache = cache.TTLCache(
+                tracking_cache_ttl,
+                maxsize=tracking_cache_size,
+            )
+        self._tracking_inflight: dict[str, anyio.Event] = {}
+        self.rate_limiter = rate_limiter
+        self.validate_payloads = validate_payloads
+        self.price_cache = price_cache
+        self.hedging = hedging
+        self.bulkhead: Bulkhead | None = None
+        if lanes:
+            from sendparcel_inpost import lanes as lane_limits
+
+            self.bulkhead = lane_limits.Bulkhead(lanes)
+        if self.bulkhead is not None and self.bulkhead.total > max_connections:
+            raise ValueError("Lane limits exceed max_connections")
+        self.concurrency_limiter = concurrency_limiter
+        # Deferred import: provider entry-point discovery imports this
+        # module, and should not pay for loading the whole HTTP stack
+        # until a client is actually built.
+        import httpx
+
+        phases = {
+            "connect": connect_timeout,
+            "read": read_timeout,
+            "write": write_timeout,
+            "pool": pool_timeout,
+        }
+        self._default_timeout = httpx.Timeout(
+            timeout,
+            **{
+                name: value
+                for name, value in phases.items()
+                if value is not None
+            },
+        )
+        unknown = set(operation_timeouts or ()) - OPERATIONS
+        if unknown:
+            raise ValueError(
+                f"Unknown operations in operation_timeouts: {sorted(unknown)}",
+            )
+        self._operation_timeouts = {
+            operation: httpx.Timeout(
+                connect=self._default_timeout.connect,
+                read=read,
+                write=self._default_timeout.write,
+                pool=self._default_timeout.pool,
+            )
+            for operation, read in (operation_timeouts or {}).items()
+        }
+
         self._http = httpx.AsyncClient(
             base_url=self.base_url,
             headers={
                 "Authorization": f"Bearer {token}",
                 "Content-Type": "application/json",
             },
-            timeout=timeout,
+            timeout=self._default_timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            event_hooks={
+                "request": [self._before_request],
+                "response": [self._after_response],
+            },
         )
 
     async def __aenter__(self) -> "ShipXClient":
@@ -69,13 +214,338 @@ class ShipXClient:
         """Close the underlying HTTP client."""
         await self._http.aclose()
 
-    async def create_shipment(self, payload: dict[str, Any]) -> dict[str, Any]:
+    @staticmethod
+    @contextmanager
+    def deadline(seconds: float) -> Iterator[anyio.CancelScope]:
+        """Bound all client calls inside the block to ``seconds`` in total.
+
+        Unlike the per-phase HTTP timeouts, the deadline covers everything:
+        pool and rate limiter waits, several sequential requests and
+        polling. Work still running when it expires is cancelled and
+        ``TimeoutError`` is raised. Nested deadlines keep the earliest.
+
+        Usage::
+
+            with client.deadline(2.0):
+                shipment = await client.get_shipment(shipment_id)
+        """
+        with anyio.fail_after(seconds) as scope:
+            yield scope
+
+    def _timeout_for(self, operation: str) -> "httpx.Timeout":
+        return self._operation_timeouts.get(
+            operation,
+            self._default_timeout,
+        )
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> "httpx.Response":
+        """Send a request in the current lane with the operation timeout."""
+        timeout = self._timeout_for(operation)
+
+        async def _send() -> "httpx.Response":
+            return await self._http.request(
+                method,
+                url,
+                timeout=timeout,
+                **kwargs,
+            )
+
+        async def _limited() -> "httpx.Response":
+            if self.concurrency_limiter is None:
+                return await _send()
+            # Interactive requests keep the isolation lanes give them:
+            # they feed the adaptive limit but never queue behind it.
+            # Requests tagged with a lane that has no limit of its own
+            # share the default lane's slots but are still limited.
+            hold = True
+            if self.bulkhead is not None:
+                from sendparcel_inpost.lanes import current_lane
+
+                lane = current_lane()
+                hold = lane is not None and lane != self.bulkhead.default
+            return await self.concurrency_limiter.run(
+                _send,
+                key=operation,
+                hold=hold,
+            )
+
+        if self.bulkhead is None:
+            return await _limited()
+        async with self.bulkhead.slot():
+            return await _limited()
+
+    async def _read(
+        self,
+        operation: str,
+        url: str,
+        **kwargs: Any,
+    ) -> "httpx.Response":
+        """GET ``url``, hedged by :attr:`hedging` when configured."""
+
+        async def _get() -> "httpx.Response":
+            return await self._request(operation, "GET", url, **kwargs)
+
+        if self.hedging is None:
+            return await _get()
+        return await self.hedging.run(
+            operation,
+            _get,
+            failed=lambda response: (
+                response.status_code in TRANSIENT_STATUS_CODES
+            ),
+        )
+
+    async def _before_request(self, request: "httpx.Request") -> None:
+        # Warm-up requests never reach the API, so they cost no quota.
+        if self.rate_limiter is not None and not request.extensions.get(
+            "shipx_warm_up",
+        ):
+            await self.rate_limiter.acquire()
+
+    async def _after_response(self, response: "httpx.Response") -> None:
+        if self.rate_limiter is None or response.status_code != 429:
+            return
+        from sendparcel_inpost.ratelimit import parse_retry_after
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after:
+            await self.rate_limiter.penalize(retry_after)
+
+    async def warm_up(self, connections: int = 1) -> int:
+        """Pre-open pooled connections to the API.
+
+        Sends ``connections`` concurrent ``HEAD /`` requests so the pool
+        holds that many established TLS connections before real traffic
+        arrives. The count is capped at ``max_keepalive_connections``,
+        since the pool would close any extra idle connection right away.
+        Warm-up requests do not take rate-limiter tokens. Failures are
+        logged and only reduce the returned number of warmed connections.
+        """
+        warmed = 0
+
+        async def _open() -> None:
+            nonlocal warmed
+            try:
+                response = await self._http.head(
+                    "/",
+                    timeout=self._timeout_for("warm_up"),
+                    extensions={"shipx_warm_up": True},
+                )
+                await response.aclose()
+            except Exception as exc:
+                logger.warning("ShipX connection warm-up failed: %s", exc)
+                return
+            warmed += 1
+
+        async with anyio.create_task_group() as task_group:
+            for _ in range(min(connections, self.max_keepalive_connections)):
+                task_group.start_soon(_open)
+        return warmed
+
+    async def keep_warm(
+        self,
+        connections: int = 1,
+        *,
+        interval: float | None = None,
+    ) -> None:
+        """Re-warm pooled connections every ``interval`` seconds, forever.
+
+        Meant to run as a background task next to the client's users::
+
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(client.keep_warm, 10)
+
+        ``interval`` defaults to half of ``keepalive_expiry``. A longer
+        interval than the expiry raises ``ValueError``, since idle
+        connections would be closed between rounds.
+        """
+        if interval is None:
+            interval = self.keepalive_expiry * DEFAULT_KEEP_WARM_FRACTION
+        elif interval >= self.keepalive_expiry:
+            raise ValueError(
+                "keep_warm interval must be shorter than keepalive_expiry",
+            )
+        while True:
+            await self.warm_up(connections)
+            await anyio.sleep(interval)
+
+    async def create_shipment(
+        self,
+        payload: dict[str, Any],
+        *,
+        reference: str | None = None,
+        attempts: int = DEFAULT_CREATE_ATTEMPTS,
+        retry_delay: float = DEFAULT_CREATE_RETRY_DELAY,
+    ) -> dict[str, Any]:
         """Create a shipment via simplified flow.
 
         POST /v1/organizations/{org_id}/shipments
+
+        With ``validate_payloads`` enabled, the payload is checked locally
+        first and ``ShipXValidationError`` is raised without a request.
+
+        ``reference`` (an order number or other idempotency key) is stored
+        on the shipment and makes the call safe to retry: a create whose
+        outcome is unknown - a timeout, a dropped connection or a
+        transient error status - is retried up to ``attempts`` times in
+        total, and before each retry the shipment is looked up by its
+        reference so that one which did reach ShipX is returned instead
+        of being created twice. Without ``reference`` nothing is retried.
         """
+        if reference is not None:
+            payload = {**payload, "reference": reference}
+        if self.validate_payloads:
+            from sendparcel_inpost.validation import raise_for_invalid_payload
+
+            raise_for_invalid_payload(payload)
+        if reference is None:
+            return await self._post_shipment(payload)
+
+        import httpx
+
+        def retryable(exc: ShipXAPIError | httpx.TransportError) -> bool:
+            if isinstance(exc, ShipXAPIError):
+                return exc.status_code in TRANSIENT_STATUS_CODES
+            return True
+
+        attempt = 1
+        while True:
+            try:
+                return await self._post_shipment(payload)
+            except (ShipXAPIError, httpx.TransportError) as exc:
+                if not retryable(exc) or attempt >= attempts:
+                    raise
+            # Never resend before a lookup has shown the shipment missing;
+            # a failed lookup uses up an attempt and is tried again.
+            while True:
+                await anyio.sleep(retry_delay * 2 ** (attempt - 1))
+                attempt += 1
+                try:
+                    existing = await self.find_shipment_by_reference(
+                        reference,
+                    )
+                except (ShipXAPIError, httpx.TransportError) as exc:
+                    if not retryable(exc) or attempt >= attempts:
+                        raise
+                else:
+                    break
+            if existing is not None:
+                return existing
+
+    async def _post_shipment(self, payload: dict[str, Any]) -> dict[str, Any]:
         url = f"/v1/organizations/{self.organization_id}/shipments"
-        response = await self._http.post(url, json=payload)
+        response = await self._request(
+            "create_shipment",
+            "POST",
+            url,
+            json=payload,
+        )
+        self._raise_for_status(response)
+        result: dict[str, Any] = response.json()
+        return result
+
+    async def find_shipment_by_reference(
+        self,
+        reference: str,
+    ) -> dict[str, Any] | None:
+        """Return the organization's shipment with ``reference``, if any.
+
+        GET /v1/organizations/{org_id}/shipments?reference=...
+
+        Every page of the listing is checked for an item whose reference
+        is exactly ``reference``, rather than trusting the server filter.
+        """
+        page = 1
+        while True:
+            data = await self.list_shipments(reference=reference, page=page)
+            items: list[dict[str, Any]] = data.get("items", [])
+            for item in items:
+                if item.get("reference") == reference:
+                    return item
+            if len(items) < DEFAULT_PAGE_SIZE:
+                return None
+            page += 1
+
+    async def calculate_prices(
+        self,
+        payloads: Sequence[dict[str, Any]],
+        *,
+        batch_size: int = DEFAULT_CALCULATE_BATCH_SIZE,
+        cache: "TTLCache[PriceKey, dict[str, Any]] | None" = None,
+    ) -> list[dict[str, Any]]:
+        """Price prospective shipments without creating them.
+
+        POST /v1/organizations/{org_id}/shipments/calculate
+
+        Returns one ShipX calculation result per payload, in order.
+        Payloads with the same price inputs (see ``price_cache_key``) are
+        calculated once, and uncached ones are sent ``batch_size`` per
+        request. Successful results are stored in ``cache`` (default: the
+        client's ``price_cache``); results carrying an ``error`` are
+        returned but not cached.
+        """
+        from sendparcel_inpost.pricing import price_cache_key
+
+        cache = cache if cache is not None else self.price_cache
+        keys = [
+            price_cache_key(self.organization_id, payload)
+            for payload in payloads
+        ]
+        prices: dict[PriceKey, dict[str, Any]] = {}
+        missing: dict[PriceKey, dict[str, Any]] = {}
+        for key, payload in zip(keys, payloads, strict=True):
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                prices[key] = cached
+            elif key not in prices:
+                missing.setdefault(key, payload)
+
+        url = f"/v1/organizations/{self.organization_id}/shipments/calculate"
+        pending = list(missing.items())
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start : start + batch_size]
+            response = await self._request(
+                "calculate_prices",
+                "POST",
+                url,
+                json={
+                    "shipments": [
+                        {**payload, "id": str(index)}
+                        for index, (_, payload) in enumerate(batch)
+                    ],
+                },
+            )
+            self._raise_for_status(response)
+            results: list[dict[str, Any]] = response.json()
+            by_id = {str(result.get("id")): result for result in results}
+            for index, (key, _) in enumerate(batch):
+                result = by_id.get(str(index), {"error": "missing_result"})
+                prices[key] = result
+                if cache is not None and not result.get("error"):
+                    cache.set(key, result)
+        return [prices[key] for key in keys]
+
+    async def create_dispatch_order(
+        self,
+        payload: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Order a courier pickup for confirmed shipments.
+
+        POST /v1/organizations/{org_id}/dispatch_orders
+        """
+        url = f"/v1/organizations/{self.organization_id}/dispatch_orders"
+        response = await self._request(
+            "create_dispatch_order",
+            "POST",
+            url,
+            json=payload,
+        )
         self._raise_for_status(response)
         result: dict[str, Any] = response.json()
         return result
@@ -85,11 +555,159 @@ class ShipXClient:
 
         GET /v1/shipments/{shipment_id}
         """
-        response = await self._http.get(f"/v1/shipments/{shipment_id}")
+        response = await self._read(
+            "get_shipment",
+            f"/v1/shipments/{shipment_id}",
+        )
         self._raise_for_status(response)
         result: dict[str, Any] = response.json()
         return result
 
+    async def list_shipments(
+        self,
+        *,
+        statuses: Iterable[str] | None = None,
+        updated_since: str | None = None,
+        reference: str | None = None,
+        page: int = 1,
+        per_page: int = DEFAULT_PAGE_SIZE,
+    ) -> dict[str, Any]:
+        """Fetch one page of the organization's shipments.
+
+        GET /v1/organizations/{org_id}/shipments
+
+        Results are sorted by ``updated_at`` ascending. ``statuses`` are
+        ShipX status names (sent comma-separated); ``updated_since`` is an
+        ISO 8601 timestamp (inclusive); ``reference`` filters by the
+        shipment reference. Returns the raw page with
+        ``items``, ``count``, ``page`` and ``per_page``.
+        """
+        params: dict[str, Any] = {
+            "sort_by": "updated_at",
+            "sort_order": "asc",
+            "page": page,
+            "per_page": per_page,
+        }
+        if statuses is not None:
+            params["status"] = ",".join(statuses)
+        if updated_since is not None:
+            params["updated_at_gteq"] = updated_since
+        if reference is not None:
+            params["reference"] = reference
+        response = await self._request(
+            "list_shipments",
+            "GET",
+            f"/v1/organizations/{self.organization_id}/shipments",
+            params=params,
+        )
+        self._raise_for_status(response)
+        result: dict[str, Any] = response.json()
+        return result
+
+    async def sync_shipments(
+        self,
+        since: str | None = None,
+        *,
+        statuses: Iterable[ShipmentStatus] | None = None,
+        per_page: int = DEFAULT_PAGE_SIZE,
+    ) -> ShipXSyncResult:
+        """Fetch statuses of shipments updated since the ``since`` cursor.
+
+        Returns the new cursor (the newest ``updated_at`` seen, to be
+        stored and passed back next time) and the sendparcel status of
+        every changed shipment. ``statuses`` restricts the listing
+        server-side, using the ShipX statuses that map to them. The cursor
+        is inclusive, so shipments updated exactly at it are reported
+        again on the next sync.
+
+        Pages are walked by advancing ``updated_since`` to the newest
+        timestamp seen rather than by page number, so shipments updated
+        while syncing cannot shift unseen items past a page boundary.
+        """
+        from sendparcel_inpost.lanes import default_lane
+
+        shipx_statuses = (
+            None if statuses is None else shipx_statuses_for(statuses)
+        )
+        cursor = since
+        newest = _parse_timestamp(since) if since else None
+        changes: dict[int, ShipmentStatus] = {}
+        seen: set[tuple[int, str]] = set()
+        page = 1
+        while True:
+            with default_lane(ShipXRequestLane.BACKGROUND):
+                data = await self.list_shipments(
+                    statuses=shipx_statuses,
+                    updated_since=cursor,
+                    page=page,
+                    per_page=per_page,
+                )
+            items: list[dict[str, Any]] = data.get("items", [])
+            page_cursor = cursor
+            for item in items:
+                updated_at = str(item.get("updated_at", ""))
+                key = (int(item["id"]), updated_at)
+                if key in seen:
+                    continue
+                seen.add(key)
+                status = map_shipx_status(str(item.get("status", "")))
+                if status is not None:
+                    changes[key[0]] = status
+                if not updated_at:
+                    continue
+                timestamp = _parse_timestamp(updated_at)
+                if newest is None or timestamp > newest:
+                    newest = timestamp
+                    page_cursor = updated_at
+            if len(items) < per_page:
+                return ShipXSyncResult(page_cursor, changes)
+            if page_cursor != cursor:
+                cursor, page = page_cursor, 1
+            else:
+                # A full page sharing one timestamp; step past it.
+                page += 1
+
+    async def await_status(
+        self,
+        shipment_id: int,
+        target: ShipmentStatus | str,
+        timeout: float,
+        *,
+        poll_interval: float | None = None,
+        registry: "StatusWaiterRegistry | None" = None,
+    ) -> ShipmentStatus:
+        """Wait until a shipment reaches ``target`` or a later status.
+
+        Resolved primarily by webhooks passed to the providers'
+        ``handle_callback``; ``get_shipment`` is polled every
+        ``poll_interval`` seconds (default 30) as a fallback. Returns the
+        status that ended the wait (possibly terminal, e.g. ``CANCELLED``).
+
+        Raises:
+            TimeoutError: The status was not reached within ``timeout``.
+        """
+
+        async def _poll() -> str:
+            shipment = await self.get_shipment(shipment_id)
+            return str(shipment.get("status", ""))
+
+        from sendparcel_inpost.waiters import (
+            DEFAULT_POLL_INTERVAL,
+            waiter_registry,
+        )
+
+        return await (registry or waiter_registry).wait(
+            shipment_id,
+            target,
+            timeout=timeout,
+            poll=_poll,
+            poll_interval=(
+                DEFAULT_POLL_INTERVAL
+                if poll_interval is None
+                else poll_interval
+            ),
+        )
+
     async def get_label(
         self,
         shipment_id: int,
@@ -101,7 +719,8 @@ class ShipXClient:
 
         GET /v1/shipments/{shipment_id}/label?format=...&type=...
         """
-        response = await self._http.get(
+        response = await self._read(
+            "get_label",
             f"/v1/shipments/{shipment_id}/label",
             params={"format": label_format, "type": label_type},
         )
@@ -113,25 +732,208 @@ class ShipXClient:
 
         DELETE /v1/shipments/{shipment_id}
         """
-        response = await self._http.delete(f"/v1/shipments/{shipment_id}")
+        response = await self._request(
+            "cancel_shipment",
+            "DELETE",
+            f"/v1/shipments/{shipment_id}",
+        )
         self._raise_for_status(response)
 
+    async def cancel_shipments(
+        self,
+        shipment_ids: Iterable[int],
+        *,
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> dict[int, ShipXCancelResult]:
+        """Cancel many shipments concurrently, classifying each outcome.
+
+        Returns a mapping of shipment id to :class:`ShipXCancelResult`:
+
+        * ``CANCELLED`` - the cancellation succeeded.
+        * ``ALREADY_CANCELLED`` - ShipX refused, and the shipment turned
+          out to be cancelled already.
+        * ``NOT_CANCELLABLE`` - ShipX refused (e.g. already dispatched).
+        * ``TRANSIENT_ERROR`` - timeouts, connection errors, 429 and 5xx
+          responses; safe to retry.
+
+        Raises:
+            ShipXAuthenticationError: The token was rejected; no further
+                shipment can be cancelled with it.
+        """
+        results: dict[int, ShipXCancelResult] = {}
+        limiter = anyio.CapacityLimiter(concurrency)
+        auth_error: ShipXAuthenticationError | None = None
+
+        async def _cancel(shipment_id: int) -> None:
+            nonlocal auth_error
+            async with limiter:
+                try:
+                    results[shipment_id] = await self._cancel_one(shipment_id)
+                except ShipXAuthenticationError as exc:
+                    auth_error = exc
+                    task_group.cancel_scope.cancel()
+
+        from sendparcel_inpost.lanes import default_lane
+
+        with default_lane(ShipXRequestLane.BULK):
+            async with anyio.create_task_group() as task_group:
+                for shipment_id in dict.fromkeys(shipment_ids):
+                    task_group.start_soon(_cancel, shipment_id)
+        if auth_error is not None:
+            raise auth_error
+        return results
+
+    async def _cancel_one(self, shipment_id: int) -> ShipXCancelResult:
+        try:
+            await self.cancel_shipment(shipment_id)
+        except ShipXAuthenticationError:
+            raise
+        except ShipXAPIError as exc:
+            if exc.status_code in TRANSIENT_STATUS_CODES:
+                return ShipXCancelResult(
+                    ShipXCancelOutcome.TRANSIENT_ERROR,
+                    exc,
+                )
+            # The refusal reason is not machine-readable; check whether
+            # the shipment is simply cancelled already.
+            try:
+                shipment = await self.get_shipment(shipment_id)
+            except Exception:
+                shipment = {}
+            if shipment.get("status") == "canceled":
+                return ShipXCancelResult(
+                    ShipXCancelOutcome.ALREADY_CANCELLED,
+                    exc,
+                )
+            return ShipXCancelResult(ShipXCancelOutcome.NOT_CANCELLABLE, exc)
+        except Exception as exc:
+            return ShipXCancelResult(ShipXCancelOutcome.TRANSIENT_ERROR, exc)
+        return ShipXCancelResult(ShipXCancelOutcome.CANCELLED)
+
     async def get_tracking(self, tracking_number: str) -> dict[str, Any]:
         """Fetch public tracking data (no auth required).
 
         GET /v1/tracking/{tracking_number}
+
+        When the client was built with ``tracking_cache_ttl``, responses are
+        served from the cache while fresh and concurrent lookups of the same
+        number share a single request. Cached dicts are shared between
+        callers and must be treated as read-only.
+        """
+        cache = self.tracking_cache
+        if cache is None:
+            return await self._fetch_tracking(tracking_number)
+
+        while True:
+            cached = cache.get(tracking_number)
+            if cached is not None:
+                return cached
+            inflight = self._tracking_inflight.get(tracking_number)
+            if inflight is None:
+                break
+            await inflight.wait()
+            if tracking_number not in cache:
+                # The shared request failed; errors are not cached, so
+                # fetch on our own to surface the error to this caller.
+                return await self._fetch_tracking(tracking_number)
+
+        done = anyio.Event()
+        self._tracking_inflight[tracking_number] = done
+        try:
+            result = await self._fetch_tracking(tracking_number)
+            cache.set(tracking_number, result)
+            return result
+        finally:
+            del self._tracking_inflight[tracking_number]
+            done.set()
+
+    async def get_trackings(
+        self,
+        tracking_numbers: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> dict[str, dict[str, Any] | Exception]:
+        """Fetch tracking data for many numbers concurrently.
+
+        Duplicate numbers are looked up once. Returns a mapping of tracking
+        number to either the tracking dict or the exception raised for it
+        (e.g. ``ShipXAPIError`` for an unknown number).
         """
-        response = await self._http.get(f"/v1/tracking/{tracking_number}")
+        results: dict[str, dict[str, Any] | Exception] = {}
+        limiter = anyio.CapacityLimiter(concurrency)
+
+        async def _lookup(tracking_number: str) -> None:
+            async with limiter:
+                try:
+                    results[tracking_number] = await self.get_tracking(
+                        tracking_number,
+                    )
+                except Exception as exc:
+                    results[tracking_number] = exc
+
+        from sendparcel_inpost.lanes import default_lane
+
+        with default_lane(ShipXRequestLane.BULK):
+            async with anyio.create_task_group() as task_group:
+                for tracking_number in dict.fromkeys(tracking_numbers):
+                    task_group.start_soon(_lookup, tracking_number)
+        return results
+
+    async def _fetch_tracking(self, tracking_number: str) -> dict[str, Any]:
+        response = await self._read(
+            "get_tracking",
+            f"/v1/tracking/{tracking_number}",
+        )
         self._raise_for_status(response)
         result: dict[str, Any] = response.json()
         return result
 
+    async def iter_points(
+        self,
+        *,
+        updated_since: str | None = None,
+        types: Iterable[str] | None = None,
+        per_page: int = DEFAULT_POINTS_PAGE_SIZE,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream the point (locker, POP) catalogue page by page.
+
+        GET /v1/points
+
+        ``updated_since`` (ISO 8601) limits the listing to points changed
+        since then, for incremental refreshes; ``types`` filters by point
+        type (e.g. ``parcel_locker``). Only one page is held at a time.
+        """
+        params: dict[str, Any] = {"per_page": per_page}
+        if updated_since is not None:
+            params["updated_from"] = updated_since
+        if types is not None:
+            params["type"] = ",".join(types)
+        page = 1
+        while True:
+            response = await self._request(
+                "iter_points",
+                "GET",
+                "/v1/points",
+                params={**params, "page": page},
+            )
+            self._raise_for_status(response)
+            data: dict[str, Any] = response.json()
+            items: list[dict[str, Any]] = data.get("items", [])
+            for item in items:
+                yield item
+            total_pages = data.get("total_pages")
+            if not items or (total_pages is not None and page >= total_pages):
+                return
+            page += 1
+
     async def get_statuses(self, lang: str = "pl") -> list[dict[str, Any]]:
         """Fetch list of all ShipX statuses.
 
         GET /v1/statuses
         """
-        response = await self._http.get(
+        response = await self._request(
+            "get_statuses",
+            "GET",
             "/v1/statuses",
             params={"lang": lang},
         )
@@ -144,12 +946,16 @@ class ShipXClient:
 
         GET /v1/services
         """
-        response = await self._http.get("/v1/services")
+        response = await self._request(
+            "get_services",
+            "GET",
+            "/v1/services",
+        )
         self._raise_for_status(response)
         result: list[dict[str, Any]] = response.json()
         return result
 
-    def _raise_for_status(self, response: httpx.Response) -> None:
+    def _raise_for_status(self, response: "httpx.Response") -> None:
         """Raise ShipXAPIError subclasses for non-2xx responses."""
         if response.is_success:
             return
@@ -175,3 +981,7 @@ class ShipXClient:
             detail=str(detail),
             errors=errors,
         )
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
@@ -0,0 +1,216 @@
+"""Aggregation of courier pickups into ShipX dispatch orders.
+
+Courier shipments and locker shipments sent with
+``sending_method="dispatch_order"`` need a courier pickup. Instead of
+ordering one pickup per shipment, :class:`DispatchOrderAggregator` groups
+confirmed shipments by pickup address and time window and creates a single
+dispatch order per group, flushing when a group is full or has waited long
+enough.
+
+Usage::
+
+    aggregator = DispatchOrderAggregator(client, max_batch=100)
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(aggregator.run)
+        await aggregator.add(shipment_id, pickup_from_peer(sender_peer))
+"""
+
+import logging
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+import anyio
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.types import (
+    ShipXDispatchOrderPayload,
+    ShipXDispatchPickup,
+    ShipXPeer,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 100
+DEFAULT_MAX_DELAY = 15 * 60.0
+
+_ADDRESS_KEY_FIELDS = (
+    "street",
+    "building_number",
+    "flat_number",
+    "city",
+    "post_code",
+    "country_code",
+)
+
+GroupKey = tuple[tuple[str, ...], Hashable]
+OnCreated = Callable[[dict[str, Any], list[int]], None]
+OnError = Callable[[Exception, list[int]], None]
+
+
+def pickup_from_peer(
+    peer: ShipXPeer,
+    *,
+    comment: str = "",
+) -> ShipXDispatchPickup:
+    """Build dispatch order pickup details from a ShipX sender peer."""
+    pickup: ShipXDispatchPickup = {}
+    if "address" in peer:
+        pickup["address"] = peer["address"]
+    name = " ".join(
+        part
+        for part in (peer.get("first_name", ""), peer.get("last_name", ""))
+        if part
+    )
+    name = peer.get("company_name", "") or name
+    if name:
+        pickup["name"] = name
+    if "phone" in peer:
+        pickup["phone"] = peer["phone"]
+    if "email" in peer:
+        pickup["email"] = peer["email"]
+    if comment:
+        pickup["comment"] = comment
+    return pickup
+
+
+def _group_key(pickup: ShipXDispatchPickup, window: Hashable) -> GroupKey:
+    address: dict[str, Any] = dict(pickup.get("address", {}))
+    normalized = tuple(
+        str(address.get(name, "")).strip().casefold()
+        for name in _ADDRESS_KEY_FIELDS
+    )
+    return normalized, window
+
+
+@dataclass
+class _Group:
+    pickup: ShipXDispatchPickup
+    opened_at: float
+    shipment_ids: list[int] = field(default_factory=list)
+
+
+class DispatchOrderAggregator:
+    """Collect shipments per pickup and create batched dispatch orders.
+
+    Args:
+        client: Client used to create dispatch orders.
+        max_batch: Flush a group as soon as it holds this many shipments.
+        max_delay: Flush a group once its first shipment waited this long
+            (seconds), checked by :meth:`run`.
+        on_created: Called with the ShipX response and shipment ids after
+            a dispatch order was created.
+        on_error: Called with the exception and shipment ids when creating
+            a dispatch order failed. Failed shipments are not re-queued.
+    """
+
+    def __init__(
+        self,
+        client: ShipXClient,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        on_created: OnCreated | None = None,
+        on_error: OnError | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive")
+        self.client = client
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.on_created = on_created
+        self.on_error = on_error
+        self._clock = clock
+        self._groups: dict[GroupKey, _Group] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of shipments waiting for a dispatch order."""
+        return sum(len(group.shipment_ids) for group in self._groups.values())
+
+    async def add(
+        self,
+        shipment_id: int,
+        pickup: ShipXDispatchPickup,
+        *,
+        window: Hashable = None,
+    ) -> dict[str, Any] | None:
+        """Queue a confirmed shipment for pickup.
+
+        ``window`` is any hashable describing the pickup time window (e.g.
+        a date string); shipments are only grouped within the same window.
+        Returns the dispatch order response when this call filled the group
+        and triggered a flush, otherwise ``None``.
+        """
+        key = _group_key(pickup, window)
+        group = self._groups.get(key)
+        if group is None:
+            group = _Group(pickup=pickup, opened_at=self._clock())
+            self._groups[key] = group
+        group.shipment_ids.append(int(shipment_id))
+        if len(group.shipment_ids) >= self.max_batch:
+            del self._groups[key]
+            return await self._create(group)
+        return None
+
+    async def flush(self) -> list[dict[str, Any]]:
+        """Create dispatch orders for every pending group."""
+        groups = list(self._groups.values())
+        self._groups.clear()
+        return await self._create_many(groups)
+
+    async def flush_expired(self) -> list[dict[str, Any]]:
+        """Create dispatch orders for groups older than ``max_delay``."""
+        deadline = self._clock() - self.max_delay
+        expired = [
+            key
+            for key, group in self._groups.items()
+            if group.opened_at <= deadline
+        ]
+        groups = [self._groups.pop(key) for key in expired]
+        return await self._create_many(groups)
+
+    async def run(self, *, check_interval: float = 1.0) -> None:
+        """Flush expired groups forever; flush everything on cancellation."""
+        try:
+            while True:
+                await anyio.sleep(check_interval)
+                await self.flush_expired()
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.flush()
+
+    async def _create_many(
+        self,
+        groups: list[_Group],
+    ) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = []
+        for group in groups:
+            result = await self._create(group)
+            if result is not None:
+                results.append(result)
+        return results
+
+    async def _create(self, group: _Group) -> dict[str, Any] | None:
+        payload: ShipXDispatchOrderPayload = {
+            **group.pickup,
+            "shipments": group.shipment_ids,
+        }
+        try:
+            response = await self.client.create_dispatch_order(
+                payload=dict(payload),
+            )
+        except Exception as exc:
+            logger.warning(
+                "ShipX dispatch order for %d shipments failed: %s",
+                len(group.shipment_ids),
+                exc,
+            )
+            if self.on_error is not None:
+                self.on_error(exc, group.shipment_ids)
+            return None
+        if self.on_created is not None:
+            self.on_created(response, group.shipment_ids)
+        return response
@@ -16,3 +16,29 @@ class ShipXParcelTemplate(StrEnum):
     SMALL = "small"
     MEDIUM = "medium"
     LARGE = "large"
+
+
+class ShipXCancelOutcome(StrEnum):
+    """Outcome of cancelling a single shipment in a bulk cancellation."""
+
+    CANCELLED = "cancelled"
+    ALREADY_CANCELLED = "already_cancelled"
+    NOT_CANCELLABLE = "not_cancellable"
+    TRANSIENT_ERROR = "transient_error"
+
+
+class ShipXRequestLane(StrEnum):
+    """Priority lanes isolating kinds of traffic from each other."""
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+    BACKGROUND = "background"
+
+
+class ShipXOutboxStatus(StrEnum):
+    """State of a shipment creation request in the local outbox."""
+
+    QUEUED = "queued"
+    SENDING = "sending"
+    CREATED = "created"
+    FAILED = "failed"
@@ -0,0 +1,180 @@
+"""Hedged requests for idempotent reads.
+
+A few ShipX responses take many times longer than the median. When an
+attempt has not answered within a high percentile of the latencies seen
+so far, :class:`HedgingPolicy` sends one identical backup request; the
+first attempt to succeed wins and the other is cancelled.
+
+Backups cost extra load, so they are paid from a budget: every call
+earns ``budget`` tokens (up to ``max_tokens``) and every backup spends
+one, capping the extra requests at ``budget`` of the total. Share one
+policy between clients to give them a common budget::
+
+    hedging = HedgingPolicy(percentile=95.0, budget=0.05)
+    client = ShipXClient(token, organization_id, hedging=hedging)
+
+Only use hedging for reads; a hedged write could be applied twice.
+"""
+
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import anyio
+
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_HEDGE_BUDGET = 0.05
+DEFAULT_HEDGE_WINDOW = 1000
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Latencies of the most recent ``window`` calls of one operation."""
+
+    def __init__(self, window: int = DEFAULT_HEDGE_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the ``q``-th percentile (nearest rank), or ``None``."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = math.ceil(q / 100 * len(ordered))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class HedgingPolicy:
+    """Decide when to send a backup request and keep the budget.
+
+    Args:
+        percentile: Latency percentile after which a backup is sent.
+        budget: Fraction of calls that may send a backup.
+        max_tokens: Largest backlog of saved-up backups, bounding bursts.
+        min_delay: Lower bound on the hedge delay, in seconds.
+        min_samples: Latencies an operation needs before it is hedged.
+        window: Latencies kept per operation.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        budget: float = DEFAULT_HEDGE_BUDGET,
+        max_tokens: float = 10.0,
+        min_delay: float = 0.0,
+        min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        window: int = DEFAULT_HEDGE_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 <= budget <= 1:
+            raise ValueError("budget must be between 0 and 1")
+        self.percentile = percentile
+        self.budget = budget
+        self.max_tokens = max_tokens
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._clock = clock
+        self._tokens = 0.0
+        self._trackers: dict[str, LatencyTracker] = {}
+
+    def tracker(self, operation: str) -> LatencyTracker:
+        """Return the latency tracker of ``operation``."""
+        tracker = self._trackers.get(operation)
+        if tracker is None:
+            tracker = self._trackers[operation] = LatencyTracker(self.window)
+        return tracker
+
+    def delay(self, operation: str) -> float | None:
+        """Seconds to wait before hedging, or ``None`` to not hedge."""
+        tracker = self.tracker(operation)
+        if len(tracker) < self.min_samples:
+            return None
+        latency = tracker.percentile(self.percentile)
+        return None if latency is None else max(latency, self.min_delay)
+
+    def _take_token(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def run[T](
+        self,
+        operation: str,
+        call: Callable[[], Awaitable[T]],
+        *,
+        failed: Callable[[T], bool] | None = None,
+    ) -> T:
+        """Await ``call()``, hedging it with a second call if it is slow.
+
+        The first attempt to succeed wins and the other is cancelled. A
+        result for which ``failed`` returns true counts as a failed
+        attempt. Once every started attempt has failed, the first failed
+        result is returned, or else the first error raised. Only the
+        latency of successful attempts is recorded.
+        """
+        self.calls += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget)
+        delay = self.delay(operation)
+        tracker = self.tracker(operation)
+        done = anyio.Event()
+        results: list[Any] = []
+        rejected: list[Any] = []
+        errors: list[Exception] = []
+        pending = 0
+
+        async def attempt(hedge: bool) -> None:
+            nonlocal pending
+            started = self._clock()
+            try:
+                value = await call()
+            except Exception as exc:
+                errors.append(exc)
+            else:
+                if failed is not None and failed(value):
+                    rejected.append(value)
+                elif not results:
+                    tracker.record(self._clock() - started)
+                    results.append(value)
+                    if hedge:
+                        self.hedge_wins += 1
+                    done.set()
+            finally:
+                pending -= 1
+                if not pending:
+                    done.set()
+
+        async with anyio.create_task_group() as task_group:
+            pending += 1
+            task_group.start_soon(attempt, False)
+            if delay is not None:
+                with anyio.move_on_after(delay):
+                    await done.wait()
+                if not done.is_set() and self._take_token():
+                    self.hedges += 1
+                    pending += 1
+                    task_group.start_soon(attempt, True)
+            await done.wait()
+            task_group.cancel_scope.cancel()
+
+        if results:
+            result: T = results[0]
+        elif rejected:
+            result = rejected[0]
+        else:
+            raise errors[0]
+        return result
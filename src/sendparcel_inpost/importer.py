@@ -0,0 +1,698 @@
+"""Streaming bulk import of orders into ShipX shipments and labels.
+
+Orders are read one at a time from CSV or JSONL and pass through bounded
+stages, so a slow stage holds back the ones before it instead of
+buffering the whole file:
+
+    read -> create shipment (``concurrency`` workers)
+         -> wait for confirmation and fetch label (``label_concurrency``)
+         -> append result to the output JSONL
+
+Payloads are built by the courier and locker providers, exactly as for
+``create_shipment``, with the order id as the shipment reference. Every
+create is recorded in a checkpoint file, and every finished order in the
+output, so an interrupted import can simply be run again: finished orders
+are skipped, created ones resume at the confirmation step and ones whose
+create was cut short are looked up by reference before being retried.
+
+Usage::
+
+    sendparcel-inpost-import orders.csv --output results.jsonl \\
+        --labels-dir labels --organization-id 123 --concurrency 20
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, TextIO, cast
+
+import anyio
+from anyio.abc import ObjectReceiveStream, ObjectSendStream
+from sendparcel.enums import ShipmentStatus
+from sendparcel.types import AddressInfo, ParcelInfo
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.enums import ShipXRequestLane
+from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.lanes import default_lane
+from sendparcel_inpost.providers.courier import InPostCourierProvider
+from sendparcel_inpost.providers.locker import InPostLockerProvider
+from sendparcel_inpost.waiters import status_satisfies
+
+DEFAULT_IMPORT_CONCURRENCY = 10
+DEFAULT_CONFIRM_TIMEOUT = 120.0
+DEFAULT_CONFIRM_POLL_INTERVAL = 2.0
+
+_PROVIDERS: dict[str, type[InPostCourierProvider | InPostLockerProvider]] = {
+    "courier": InPostCourierProvider,
+    "inpost_courier": InPostCourierProvider,
+    "inpost_courier_standard": InPostCourierProvider,
+    "locker": InPostLockerProvider,
+    "inpost_locker": InPostLockerProvider,
+    "inpost_locker_standard": InPostLockerProvider,
+}
+_ADDRESS_FIELDS = tuple(AddressInfo.__annotations__)
+_PARCEL_FIELDS = ("weight_kg", "length_cm", "width_cm", "height_cm")
+_LOCKER_OPTIONS = ("target_point", "parcel_template", "sending_method")
+_LABEL_SUFFIXES = {"pdf": ".pdf", "zpl": ".zpl", "epl": ".epl"}
+# Set by read_orders on records it could not parse.
+_PARSE_ERROR = "_parse_error"
+
+# An order and whether an earlier run may already have created it.
+_PendingOrder = tuple[dict[str, Any], bool]
+
+
+@dataclass
+class ImportResult:
+    """Outcome of one order, written as a line of the output JSONL."""
+
+    order_id: str
+    status: str
+    shipment_id: int | None = None
+    tracking_number: str = ""
+    label_path: str = ""
+    error: str = ""
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+@dataclass
+class ImportSummary:
+    """Counters of one import run."""
+
+    created: int = 0
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class _OrderShipment:
+    # Providers only need a shipment for API calls, not to build payloads.
+    id: str
+    status: str = "new"
+    provider: str = ""
+    external_id: str = ""
+    tracking_number: str = ""
+
+
+def order_from_row(row: dict[str, str]) -> dict[str, Any]:
+    """Convert a flat CSV row into an order record.
+
+    Columns are ``order_id``, ``service``, ``receiver_<field>`` and
+    ``sender_<field>`` for every ``AddressInfo`` field, one parcel's
+    ``weight_kg``/``length_cm``/``width_cm``/``height_cm`` and the locker
+    options ``target_point``, ``parcel_template``, ``sending_method``.
+    Empty cells are ignored.
+    """
+    values = {key: value for key, value in row.items() if key and value}
+    order: dict[str, Any] = {
+        "order_id": values.get("order_id", ""),
+        "receiver": {},
+        "sender": {},
+    }
+    if "service" in values:
+        order["service"] = values["service"]
+    for peer in ("receiver", "sender"):
+        for name in _ADDRESS_FIELDS:
+            value = values.get(f"{peer}_{name}")
+            if value:
+                order[peer][name] = value
+    parcel = {name: values[name] for name in _PARCEL_FIELDS if name in values}
+    if parcel:
+        order["parcels"] = [parcel]
+    for name in _LOCKER_OPTIONS:
+        if name in values:
+            order[name] = values[name]
+    return order
+
+
+def read_orders(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Stream order records from a ``.csv`` or JSON Lines file.
+
+    Orders without an ``order_id`` get their 1-based record number. A
+    line that is not a JSON object is still yielded, so that it fails on
+    its own in :func:`build_order_payload` instead of ending the stream.
+    """
+    path = Path(path)
+    with path.open(newline="", encoding="utf-8") as stream:
+        if path.suffix.lower() == ".csv":
+            records: Iterable[Any] = map(
+                order_from_row,
+                csv.DictReader(stream),
+            )
+        else:
+            records = (_parse_line(line) for line in stream if line.strip())
+        for number, order in enumerate(records, start=1):
+            if not isinstance(order, dict):
+                order = {_PARSE_ERROR: "Order is not a JSON object"}
+            order["order_id"] = str(order.get("order_id") or number)
+            yield order
+
+
+def _parse_line(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return {_PARSE_ERROR: f"Invalid JSON: {exc}"}
+
+
+def _address(raw: Any) -> AddressInfo:
+    if not isinstance(raw, dict):
+        raise ValueError("Addresses must be objects")
+    address = {
+        name: raw[name]
+        for name in _ADDRESS_FIELDS
+        if raw.get(name) not in (None, "")
+    }
+    return cast(AddressInfo, address)
+
+
+def _parcels(order: dict[str, Any]) -> list[ParcelInfo]:
+    raw_parcels = order.get("parcels") or []
+    if not isinstance(raw_parcels, list):
+        raise ValueError("Parcels must be a list")
+    parcels: list[ParcelInfo] = []
+    for raw in raw_parcels:
+        if not isinstance(raw, dict):
+            raise ValueError("Parcels must be objects")
+        parcel: dict[str, Decimal] = {}
+        for name in _PARCEL_FIELDS:
+            if raw.get(name) in (None, ""):
+                continue
+            try:
+                parcel[name] = Decimal(str(raw[name]))
+            except InvalidOperation:
+                raise ValueError(f"Invalid {name} {raw[name]!r}") from None
+        parcels.append(cast(ParcelInfo, parcel))
+    return parcels
+
+
+def build_order_payload(
+    order: dict[str, Any],
+    *,
+    default_service: str = "courier",
+    provider_config: Mapping[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Build the create-shipment payload of an order via its provider.
+
+    The provider's own checks apply, e.g. a locker order needs a
+    ``target_point``; ``provider_config`` enables optional ones such as
+    ``validate_target_point``.
+
+    Raises:
+        ValueError: The order could not be parsed, has a malformed field,
+            names an unknown service or lacks a required option.
+        ShipXValidationError: A check enabled in ``provider_config``
+            rejected the payload.
+    """
+    if _PARSE_ERROR in order:
+        raise ValueError(order[_PARSE_ERROR])
+    service = str(order.get("service") or default_service)
+    provider_class = _PROVIDERS.get(service)
+    if provider_class is None:
+        raise ValueError(f"Unknown service {service!r}")
+    provider = provider_class(
+        _OrderShipment(id=str(order["order_id"])),
+        config=dict(provider_config or {}),
+    )
+    options = {name: order[name] for name in _LOCKER_OPTIONS if name in order}
+    return provider.build_shipment_payload(
+        sender_address=_address(order.get("sender") or {}),
+        receiver_address=_address(order.get("receiver") or {}),
+        parcels=_parcels(order),
+        **options,
+    )
+
+
+def _end_partial_line(path: Path) -> None:
+    # A crash can leave half a line behind; keep it off the next record.
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with path.open("rb+") as stream:
+        stream.seek(-1, os.SEEK_END)
+        if stream.read(1) != b"\n":
+            stream.write(b"\n")
+
+
+def load_finished(
+    output: str | Path,
+    *,
+    retry_failed: bool = False,
+) -> set[str]:
+    """Return the orders already present in an output file.
+
+    With ``retry_failed`` only successful orders count as finished.
+    """
+    finished: set[str] = set()
+    path = Path(output)
+    if not path.exists():
+        return finished
+    with path.open(encoding="utf-8") as stream:
+        for line in stream:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            if record.get("status") == "ok" or not retry_failed:
+                finished.add(str(record["order_id"]))
+            else:
+                finished.discard(str(record["order_id"]))
+    return finished
+
+
+class ImportCheckpoint:
+    """Append-only record of shipments created for orders.
+
+    An order is logged as ``pending`` before its create request and as
+    ``created`` once ShipX answers; every line is synced to disk. A
+    restarted import resumes created orders and looks pending ones up by
+    reference, so no shipment is created twice.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, ImportResult]:
+        """Return the latest record of every order by order id."""
+        created: dict[str, ImportResult] = {}
+        if not self.path.exists():
+            return created
+        with self.path.open(encoding="utf-8") as stream:
+            for line in stream:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                created[str(record["order_id"])] = ImportResult(**record)
+        return created
+
+    async def record(self, result: ImportResult) -> None:
+        """Durably append a record.
+
+        The write and ``fsync`` run in a worker thread, so other orders
+        keep going meanwhile.
+        """
+        line = json.dumps(asdict(result)) + "\n"
+        await anyio.to_thread.run_sync(self._record_sync, line)
+
+    def _record_sync(self, line: str) -> None:
+        with self._lock, self.path.open("a", encoding="utf-8") as stream:
+            stream.write(line)
+            stream.flush()
+            os.fsync(stream.fileno())
+
+
+class BulkImporter:
+    """Create shipments and fetch labels for a stream of orders.
+
+    Args:
+        client: Client used for every request.
+        output: JSON Lines file results are appended to.
+        labels_dir: Directory for label files; ``None`` skips labels.
+        checkpoint: Created-shipment log; defaults to
+            ``<output>.checkpoint``.
+        concurrency: Shipments created at the same time.
+        label_concurrency: Shipments confirmed and labelled at once.
+        confirm_timeout: Seconds to wait for a shipment to be confirmed.
+        confirm_poll_interval: Seconds between status polls while waiting
+            for confirmation without webhooks.
+        retry_failed: Process orders that failed in earlier runs again.
+        provider_config: Provider settings used to build and check each
+            payload, e.g. ``{"validate_target_point": True}``.
+
+    An ``order_id`` seen again in the same run is skipped, since it is
+    the shipment reference and would otherwise be created twice.
+    """
+
+    def __init__(
+        self,
+        client: ShipXClient,
+        output: str | Path,
+        *,
+        labels_dir: str | Path | None = None,
+        checkpoint: ImportCheckpoint | None = None,
+        label_format: str = "Pdf",
+        default_service: str = "courier",
+        concurrency: int = DEFAULT_IMPORT_CONCURRENCY,
+        label_concurrency: int = DEFAULT_IMPORT_CONCURRENCY,
+        confirm_timeout: float = DEFAULT_CONFIRM_TIMEOUT,
+        confirm_poll_interval: float = DEFAULT_CONFIRM_POLL_INTERVAL,
+        retry_failed: bool = False,
+        provider_config: Mapping[str, Any] | None = None,
+    ) -> None:
+        if concurrency < 1 or label_concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client = client
+        self.output = Path(output)
+        self.labels_dir = None if labels_dir is None else Path(labels_dir)
+        self.checkpoint = checkpoint or ImportCheckpoint(
+            self.output.with_name(self.output.name + ".checkpoint"),
+        )
+        self.label_format = label_format
+        self.default_service = default_service
+        self.concurrency = concurrency
+        self.label_concurrency = label_concurrency
+        self.confirm_timeout = confirm_timeout
+        self.confirm_poll_interval = confirm_poll_interval
+        self.retry_failed = retry_failed
+        self.provider_config = dict(provider_config or {})
+        self.summary = ImportSummary()
+
+    async def run(self, orders: Iterable[dict[str, Any]]) -> ImportSummary:
+        """Import ``orders``; returns the counters of this run.
+
+        Requests use the bulk lane unless the caller selected one.
+        """
+        if self.labels_dir is not None:
+            self.labels_dir.mkdir(parents=True, exist_ok=True)
+        _end_partial_line(self.output)
+        _end_partial_line(self.checkpoint.path)
+        finished = load_finished(self.output, retry_failed=self.retry_failed)
+        created = self.checkpoint.load()
+        create_send, create_receive = anyio.create_memory_object_stream[
+            _PendingOrder
+        ](self.concurrency)
+        finish_send, finish_receive = anyio.create_memory_object_stream[
+            ImportResult
+        ](self.label_concurrency)
+        result_send, result_receive = anyio.create_memory_object_stream[
+            ImportResult
+        ](self.label_concurrency)
+
+        with default_lane(ShipXRequestLane.BULK):
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(self._write, result_receive)
+                async with create_receive, finish_send, finish_receive:
+                    for _ in range(self.concurrency):
+                        task_group.start_soon(
+                            self._create_worker,
+                            create_receive.clone(),
+                            finish_send.clone(),
+                            result_send.clone(),
+                        )
+                    for _ in range(self.label_concurrency):
+                        task_group.start_soon(
+                            self._finish_worker,
+                            finish_receive.clone(),
+                            result_send.clone(),
+                        )
+                    task_group.start_soon(
+                        self._feed,
+                        orders,
+                        finished,
+                        created,
+                        create_send,
+                        finish_send.clone(),
+                    )
+                await result_send.aclose()
+        return self.summary
+
+    async def _feed(
+        self,
+        orders: Iterable[dict[str, Any]],
+        finished: set[str],
+        created: dict[str, ImportResult],
+        create_send: ObjectSendStream[_PendingOrder],
+        finish_send: ObjectSendStream[ImportResult],
+    ) -> None:
+        async with create_send, finish_send:
+            seen: set[str] = set()
+            for order in orders:
+                order_id = str(order["order_id"])
+                if order_id in seen or order_id in finished:
+                    self.summary.skipped += 1
+                    continue
+                seen.add(order_id)
+                if order_id not in created:
+                    await create_send.send((order, False))
+                elif created[order_id].status == "pending":
+                    await create_send.send((order, True))
+                else:
+                    await finish_send.send(created[order_id])
+
+    async def _create_worker(
+        self,
+        orders: ObjectReceiveStream[_PendingOrder],
+        finish_send: ObjectSendStream[ImportResult],
+        result_send: ObjectSendStream[ImportResult],
+    ) -> None:
+        async with orders, finish_send, result_send:
+            async for order, pending in orders:
+                order_id = str(order["order_id"])
+                try:
+                    payload = build_order_payload(
+                        order,
+                        default_service=self.default_service,
+                        provider_config=self.provider_config,
+                    )
+                    response = await self._create(order_id, payload, pending)
+                    result = ImportResult(
+                        order_id=order_id,
+                        status="created",
+                        shipment_id=int(response["id"]),
+                        tracking_number=str(
+                            response.get("tracking_number") or "",
+                        ),
+                    )
+                except Exception as exc:
+                    # One bad order must not end the import for the rest.
+                    await result_send.send(_failed(order_id, exc))
+                    continue
+                await self.checkpoint.record(result)
+                self.summary.created += 1
+                await finish_send.send(result)
+
+    async def _create(
+        self,
+        order_id: str,
+        payload: dict[str, Any],
+        pending: bool,
+    ) -> dict[str, Any]:
+        # The order id is the shipment reference, so a create interrupted
+        # by a crash (logged as pending) is found instead of repeated.
+        if pending:
+            existing = await self.client.find_shipment_by_reference(order_id)
+            if existing is not None:
+                return existing
+        await self.checkpoint.record(
+            ImportResult(order_id=order_id, status="pending"),
+        )
+        return await self.client.create_shipment(payload, reference=order_id)
+
+    async def _finish_worker(
+        self,
+        created: ObjectReceiveStream[ImportResult],
+        result_send: ObjectSendStream[ImportResult],
+    ) -> None:
+        async with created, result_send:
+            async for result in created:
+                await result_send.send(await self._finish(result))
+
+    async def _finish(self, created: ImportResult) -> ImportResult:
+        assert created.shipment_id is not None
+        result = ImportResult(
+            order_id=created.order_id,
+            status="ok",
+            shipment_id=created.shipment_id,
+            tracking_number=created.tracking_number,
+        )
+        try:
+            status = await self.client.await_status(
+                created.shipment_id,
+                ShipmentStatus.LABEL_READY,
+                self.confirm_timeout,
+                poll_interval=self.confirm_poll_interval,
+            )
+            if not status_satisfies(status, ShipmentStatus.LABEL_READY):
+                result.status = "error"
+                result.error = f"Shipment ended as {status}"
+                return result
+            if not result.tracking_number:
+                shipment = await self.client.get_shipment(created.shipment_id)
+                result.tracking_number = str(
+                    shipment.get("tracking_number") or "",
+                )
+            if self.labels_dir is not None:
+                label = await self.client.get_label(
+                    created.shipment_id,
+                    label_format=self.label_format,
+                )
+                suffix = _LABEL_SUFFIXES.get(self.label_format.lower(), "")
+                path = self.labels_dir / f"{created.order_id}{suffix}"
+                await anyio.Path(path).write_bytes(label)
+                result.label_path = str(path)
+        except Exception as exc:
+            failed = _failed(created.order_id, exc)
+            failed.shipment_id = created.shipment_id
+            failed.tracking_number = result.tracking_number
+            return failed
+        return result
+
+    async def _write(self, results: ObjectReceiveStream[ImportResult]) -> None:
+        with self.output.open("a", encoding="utf-8") as stream:
+            async with results:
+                async for result in results:
+                    await anyio.to_thread.run_sync(
+                        _append_line,
+                        stream,
+                        json.dumps(asdict(result)),
+                    )
+                    if result.ok:
+                        self.summary.completed += 1
+                    else:
+                        self.summary.failed += 1
+
+
+def _append_line(stream: TextIO, line: str) -> None:
+    stream.write(line + "\n")
+    stream.flush()
+
+
+def _failed(order_id: str, exc: Exception) -> ImportResult:
+    if isinstance(exc, ShipXAPIError):
+        return ImportResult(
+            order_id=order_id,
+            status="error",
+            error=exc.detail,
+            errors=list(exc.errors),
+        )
+    return ImportResult(
+        order_id=order_id,
+        status="error",
+        error=str(exc) or type(exc).__name__,
+    )
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sendparcel-inpost-import",
+        description="Create InPost shipments and labels from an order file.",
+    )
+    parser.add_argument("input", help="Orders as .csv or JSON Lines")
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="JSON Lines file results are appended to",
+    )
+    parser.add_argument("--labels-dir", default=None)
+    parser.add_argument("--label-format", default="Pdf")
+    parser.add_argument(
+        "--service",
+        default="courier",
+        choices=sorted(_PROVIDERS),
+        help="Service of orders that do not name one",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("SHIPX_TOKEN", ""),
+        help="ShipX API token (default: $SHIPX_TOKEN)",
+    )
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--sandbox", action="store_true")
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_IMPORT_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--label-concurrency",
+        type=int,
+        default=DEFAULT_IMPORT_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--confirm-timeout",
+        type=float,
+        default=DEFAULT_CONFIRM_TIMEOUT,
+    )
+    parser.add_argument(
+        "--confirm-poll-interval",
+        type=float,
+        default=DEFAULT_CONFIRM_POLL_INTERVAL,
+        help="Seconds between status polls while waiting for confirmation",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Process orders that failed in earlier runs again",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Validate payloads locally before sending them",
+    )
+    parser.add_argument(
+        "--validate-target-point",
+        action="store_true",
+        help="Check locker target points against the ShipX point catalogue",
+    )
+    return parser
+
+
+def main(
+    argv: Sequence[str] | None = None,
+    *,
+    stdout: TextIO | None = None,
+) -> int:
+    """Console entry point for ``sendparcel-inpost-import``."""
+    out = stdout or sys.stdout
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.label_concurrency < 1:
+        parser.error("concurrency must be at least 1")
+
+    async def _run() -> ImportSummary:
+        async with ShipXClient(
+            token=args.token,
+            organization_id=args.organization_id,
+            sandbox=args.sandbox,
+            base_url=args.base_url,
+            timeout=args.timeout,
+            max_connections=args.concurrency + args.label_concurrency,
+            validate_payloads=args.validate,
+        ) as client:
+            if args.validate_target_point:
+                from sendparcel_inpost.points import point_directory
+
+                await point_directory.refresh(client)
+            importer = BulkImporter(
+                client,
+                args.output,
+                labels_dir=args.labels_dir,
+                label_format=args.label_format,
+                default_service=args.service,
+                concurrency=args.concurrency,
+                label_concurrency=args.label_concurrency,
+                confirm_timeout=args.confirm_timeout,
+                confirm_poll_interval=args.confirm_poll_interval,
+                retry_failed=args.retry_failed,
+                provider_config={
+                    "validate_target_point": args.validate_target_point,
+                },
+            )
+            return await importer.run(read_orders(args.input))
+
+    summary = anyio.run(_run)
+    print(
+        f"created={summary.created} completed={summary.completed} "
+        f"failed={summary.failed} skipped={summary.skipped}",
+        file=out,
+    )
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
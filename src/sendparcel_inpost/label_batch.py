@@ -0,0 +1,287 @@
+"""Streaming merge of many labels into print-ready documents.
+
+Print servers handle a few large documents far better than thousands of
+single-label PDFs. The helpers here consume an async stream of labels
+(e.g. from :func:`label_stream`) and yield merged documents incrementally:
+
+* :func:`merge_pdf_labels` places label pages onto sheets (by default four
+  A6 labels per A4 page) and emits one PDF per ``labels_per_document``
+  labels. Merging runs in a worker thread, so the event loop stays free.
+* :func:`merge_zpl_labels` concatenates ZPL labels into combined jobs.
+
+Memory is bounded by the chunk size, not by the stream length. PDF merging
+requires the optional ``pypdf`` dependency
+(``pip install python-sendparcel-inpost[pdf]``).
+
+Usage::
+
+    async with label_stream(client, shipment_ids) as labels:
+        async for document in merge_pdf_labels(labels):
+            await printer.submit(document)
+"""
+
+import io
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import anyio
+from anyio.abc import TaskGroup
+from anyio.streams.memory import (
+    MemoryObjectReceiveStream,
+    MemoryObjectSendStream,
+)
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.enums import ShipXRequestLane
+from sendparcel_inpost.lanes import default_lane
+
+try:
+    from pypdf import PdfReader, PdfWriter, Transformation
+except ImportError:  # pragma: no cover - exercised without the extra
+    PdfReader = PdfWriter = Transformation = None  # type: ignore[assignment,misc]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LABELS_PER_DOCUMENT = 200
+DEFAULT_FETCH_CONCURRENCY = 4
+
+_MM = 72 / 25.4
+
+OnLabelError = Callable[[int, Exception], None]
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """Grid of label cells on an output page (sizes in PDF points)."""
+
+    page_width: float
+    page_height: float
+    columns: int
+    rows: int
+    margin: float = 0.0
+
+    @property
+    def cells(self) -> int:
+        """Number of labels per sheet."""
+        return self.columns * self.rows
+
+
+A4_FOUR_UP = SheetLayout(210 * _MM, 297 * _MM, columns=2, rows=2)
+"""Four A6 labels per portrait A4 page."""
+
+A6_ONE_UP = SheetLayout(105 * _MM, 148 * _MM, columns=1, rows=1)
+"""One label per A6 page (label printers)."""
+
+
+class _LabelFetch:
+    __slots__ = ("content", "done", "error", "shipment_id")
+
+    def __init__(self, shipment_id: int) -> None:
+        self.shipment_id = shipment_id
+        self.content = b""
+        self.error: Exception | None = None
+        self.done = anyio.Event()
+
+
+@asynccontextmanager
+async def label_stream(
+    client: ShipXClient,
+    shipment_ids: Iterable[int],
+    *,
+    label_format: str = "Pdf",
+    label_type: str = "A6",
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    on_error: OnLabelError | None = None,
+) -> AsyncIterator[MemoryObjectReceiveStream[bytes]]:
+    """Fetch labels in the background and stream them in order.
+
+    At most ``concurrency`` labels are downloaded (and held) at a time;
+    the next download starts as soon as a label has been received. A
+    label that cannot be fetched is skipped and reported to ``on_error``
+    with its shipment id (or logged), and the stream carries on.
+    Downloads still running when the block exits are cancelled.
+
+    The default ``label_type`` is ``"A6"``, the size of the cells of
+    :data:`A4_FOUR_UP`. Downloads use the bulk request lane unless the
+    caller selected one.
+    """
+    send, receive = anyio.create_memory_object_stream[bytes]()
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(
+            _fetch_labels,
+            client,
+            shipment_ids,
+            send,
+            label_format,
+            label_type,
+            concurrency,
+            on_error,
+        )
+        with receive:
+            yield receive
+            task_group.cancel_scope.cancel()
+
+
+async def _fetch_labels(
+    client: ShipXClient,
+    shipment_ids: Iterable[int],
+    send: MemoryObjectSendStream[bytes],
+    label_format: str,
+    label_type: str,
+    concurrency: int,
+    on_error: OnLabelError | None,
+) -> None:
+    slots = anyio.Semaphore(concurrency)
+    jobs_send, jobs_receive = anyio.create_memory_object_stream[_LabelFetch](
+        concurrency,
+    )
+
+    async def fetch(job: _LabelFetch) -> None:
+        try:
+            job.content = await client.get_label(
+                shipment_id=job.shipment_id,
+                label_format=label_format,
+                label_type=label_type,
+            )
+        except Exception as exc:
+            job.error = exc
+        finally:
+            job.done.set()
+
+    async def feed(task_group: TaskGroup) -> None:
+        async with jobs_send:
+            for shipment_id in shipment_ids:
+                await slots.acquire()
+                job = _LabelFetch(shipment_id)
+                task_group.start_soon(fetch, job)
+                await jobs_send.send(job)
+
+    with default_lane(ShipXRequestLane.BULK):
+        async with send, anyio.create_task_group() as task_group:
+            task_group.start_soon(feed, task_group)
+            async with jobs_receive:
+                async for job in jobs_receive:
+                    await job.done.wait()
+                    if job.error is None:
+                        await send.send(job.content)
+                    else:
+                        _report_label_error(job, on_error)
+                    slots.release()
+
+
+def _report_label_error(
+    job: _LabelFetch, on_error: OnLabelError | None
+) -> None:
+    assert job.error is not None
+    if on_error is not None:
+        try:
+            on_error(job.shipment_id, job.error)
+        except Exception:
+            logger.exception("on_error callback failed")
+        return
+    logger.warning(
+        "Label for shipment %s failed: %s",
+        job.shipment_id,
+        job.error,
+    )
+
+
+async def _chunks(
+    labels: AsyncIterable[bytes],
+    size: int,
+) -> AsyncIterator[list[bytes]]:
+    if size <= 0:
+        raise ValueError("chunk size must be positive")
+    chunk: list[bytes] = []
+    async for content in labels:
+        chunk.append(content)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def compose_pdf_sheets(
+    labels: Iterable[bytes],
+    layout: SheetLayout = A4_FOUR_UP,
+) -> bytes:
+    """Place every page of the given label PDFs onto layout sheets.
+
+    Each label page is scaled to fit its cell (keeping its aspect ratio)
+    and centred in it. Blocking; see :func:`merge_pdf_labels` for the
+    async, streaming variant.
+    """
+    if PdfWriter is None:
+        raise ImportError(
+            "PDF label merging requires pypdf: "
+            "pip install python-sendparcel-inpost[pdf]",
+        )
+    writer = PdfWriter()
+    cell_width = (layout.page_width - 2 * layout.margin) / layout.columns
+    cell_height = (layout.page_height - 2 * layout.margin) / layout.rows
+    placed = 0
+    sheet = None
+    for content in labels:
+        for page in PdfReader(io.BytesIO(content)).pages:
+            slot = placed % layout.cells
+            if sheet is None or slot == 0:
+                sheet = writer.add_blank_page(
+                    layout.page_width,
+                    layout.page_height,
+                )
+            column, row = slot % layout.columns, slot // layout.columns
+            box = page.mediabox
+            scale = min(
+                cell_width / float(box.width),
+                cell_height / float(box.height),
+            )
+            left = (
+                layout.margin
+                + column * cell_width
+                + (cell_width - float(box.width) * scale) / 2
+            )
+            bottom = (
+                layout.page_height
+                - layout.margin
+                - (row + 1) * cell_height
+                + (cell_height - float(box.height) * scale) / 2
+            )
+            transformation = (
+                Transformation()
+                .translate(-float(box.left), -float(box.bottom))
+                .scale(scale, scale)
+                .translate(left, bottom)
+            )
+            sheet.merge_transformed_page(page, transformation)
+            placed += 1
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+async def merge_pdf_labels(
+    labels: AsyncIterable[bytes],
+    *,
+    layout: SheetLayout = A4_FOUR_UP,
+    labels_per_document: int = DEFAULT_LABELS_PER_DOCUMENT,
+) -> AsyncIterator[bytes]:
+    """Merge a stream of PDF labels into multi-up PDF documents.
+
+    Yields one PDF for every ``labels_per_document`` input labels (the
+    last one may be shorter). Composition runs in a worker thread.
+    """
+    async for chunk in _chunks(labels, labels_per_document):
+        yield await anyio.to_thread.run_sync(compose_pdf_sheets, chunk, layout)
+
+
+async def merge_zpl_labels(
+    labels: AsyncIterable[bytes],
+    *,
+    labels_per_job: int = DEFAULT_LABELS_PER_DOCUMENT,
+) -> AsyncIterator[bytes]:
+    """Concatenate a stream of ZPL labels into combined print jobs."""
+    async for chunk in _chunks(labels, labels_per_job):
+        yield b"\n".join(content.strip() for content in chunk) + b"\n"
@@ -0,0 +1,199 @@
+"""Background label prefetching into a bounded local store.
+
+When a shipment becomes ``confirmed`` (``ShipmentStatus.LABEL_READY``) the
+providers can schedule its label download on :data:`label_prefetcher`, so
+a later ``create_label`` call is served from memory instead of waiting on
+ShipX. Prefetching is opt-in per provider (``prefetch_labels`` setting)
+and only happens while :meth:`LabelPrefetcher.run` is running; labels
+scheduled without a running prefetcher are skipped::
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(label_prefetcher.run)
+        ...
+"""
+
+import logging
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+
+import anyio
+
+from sendparcel_inpost.enums import ShipXRequestLane
+from sendparcel_inpost.lanes import default_lane
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_PREFETCH_CONCURRENCY = 4
+DEFAULT_MAX_PENDING = 10_000
+
+LabelKey = tuple[str, str]
+LabelFetch = Callable[[], Awaitable[bytes]]
+
+
+class LabelStore:
+    """In-memory label cache bounded by total size in bytes.
+
+    Least recently used labels are evicted once ``max_bytes`` would be
+    exceeded; a single label larger than the budget is not stored.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self._labels: OrderedDict[LabelKey, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._labels
+
+    def get(self, shipment_id: int | str, label_format: str) -> bytes | None:
+        """Return a stored label, or ``None``."""
+        key = (str(shipment_id), label_format)
+        content = self._labels.get(key)
+        if content is not None:
+            self._labels.move_to_end(key)
+        return content
+
+    def put(
+        self,
+        shipment_id: int | str,
+        label_format: str,
+        content: bytes,
+    ) -> bool:
+        """Store a label; returns ``False`` if it exceeds the budget."""
+        if len(content) > self.max_bytes:
+            return False
+        key = (str(shipment_id), label_format)
+        self.discard(shipment_id, label_format)
+        self._labels[key] = content
+        self.bytes_used += len(content)
+        while self.bytes_used > self.max_bytes:
+            _, evicted = self._labels.popitem(last=False)
+            self.bytes_used -= len(evicted)
+        return True
+
+    def discard(self, shipment_id: int | str, label_format: str) -> None:
+        """Remove a stored label if present."""
+        content = self._labels.pop((str(shipment_id), label_format), None)
+        if content is not None:
+            self.bytes_used -= len(content)
+
+
+class LabelPrefetcher:
+    """Download labels in the background into a :class:`LabelStore`.
+
+    Args:
+        store: Destination store; a new one with the default byte budget
+            is created if omitted.
+        concurrency: Maximum number of label downloads in flight.
+        max_pending: Scheduled downloads beyond this are dropped.
+    """
+
+    def __init__(
+        self,
+        store: LabelStore | None = None,
+        *,
+        concurrency: int = DEFAULT_PREFETCH_CONCURRENCY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        self.store = store or LabelStore()
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self._queue: deque[tuple[LabelKey, LabelFetch]] = deque()
+        self._scheduled: set[LabelKey] = set()
+        self._wakeup: anyio.Event | None = None
+        self._running = False
+
+    @property
+    def pending(self) -> int:
+        """Number of scheduled or in-flight downloads."""
+        return len(self._scheduled)
+
+    @property
+    def running(self) -> bool:
+        """Whether :meth:`run` is processing downloads."""
+        return self._running
+
+    def schedule(
+        self,
+        shipment_id: int | str,
+        label_format: str,
+        fetch: LabelFetch,
+    ) -> bool:
+        """Queue a label download; returns ``False`` if it was skipped.
+
+        Downloads are skipped while :meth:`run` is not running, since
+        nothing would process them. Labels that are already stored or
+        scheduled are skipped too, as are new ones once ``max_pending``
+        downloads are waiting.
+        """
+        if not self._running:
+            logger.debug(
+                "Label prefetcher not running, skipping %s", shipment_id
+            )
+            return False
+        key = (str(shipment_id), label_format)
+        if key in self._scheduled or key in self.store:
+            return False
+        if len(self._scheduled) >= self.max_pending:
+            logger.warning("Label prefetch queue full, skipping %s", key[0])
+            return False
+        self._scheduled.add(key)
+        self._queue.append((key, fetch))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    async def run(self) -> None:
+        """Process scheduled downloads until cancelled.
+
+        Downloads use the background request lane unless the caller
+        selected one. Downloads still queued when it stops are dropped.
+        """
+        if self._running:
+            raise RuntimeError("LabelPrefetcher is already running")
+        self._running = True
+        slots = anyio.Semaphore(self.concurrency)
+        try:
+            with default_lane(ShipXRequestLane.BACKGROUND):
+                async with anyio.create_task_group() as task_group:
+                    while True:
+                        while not self._queue:
+                            self._wakeup = anyio.Event()
+                            await self._wakeup.wait()
+                        key, fetch = self._queue.popleft()
+                        await slots.acquire()
+                        task_group.start_soon(
+                            self._download,
+                            key,
+                            fetch,
+                            slots,
+                        )
+        finally:
+            self._running = False
+            self._wakeup = None
+            self._queue.clear()
+            self._scheduled.clear()
+
+    async def _download(
+        self,
+        key: LabelKey,
+        fetch: LabelFetch,
+        slots: anyio.Semaphore,
+    ) -> None:
+        try:
+            content = await fetch()
+        except Exception as exc:
+            logger.warning("Label prefetch for %s failed: %s", key[0], exc)
+        else:
+            self.store.put(key[0], key[1], content)
+        finally:
+            self._scheduled.discard(key)
+            slots.release()
+
+
+label_prefetcher = LabelPrefetcher()
+"""Process-wide prefetcher used by the providers."""
@@ -0,0 +1,104 @@
+"""Priority lanes (bulkheads) for ShipX requests.
+
+A :class:`Bulkhead` gives every lane its own concurrency limit, so a
+label printed at a packing station never queues behind a sweep of
+thousands of status lookups. The lane of a request is taken from the
+surrounding :func:`request_lane` block, which follows the call into
+spawned tasks::
+
+    client = ShipXClient(
+        token,
+        organization_id,
+        max_connections=20,
+        lanes={"interactive": 8, "bulk": 8, "background": 4},
+    )
+    with request_lane("bulk"):
+        await sweep(client)
+
+Requests outside any block, or in a lane without a limit, use the
+default (interactive) lane.
+"""
+
+from collections.abc import AsyncIterator, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+import anyio
+
+from sendparcel_inpost.enums import ShipXRequestLane
+
+_current_lane: ContextVar[str | None] = ContextVar(
+    "shipx_request_lane",
+    default=None,
+)
+
+
+def current_lane() -> str | None:
+    """Return the lane selected by the enclosing :func:`request_lane`."""
+    return _current_lane.get()
+
+
+@contextmanager
+def request_lane(lane: str) -> Iterator[None]:
+    """Send every ShipX request made inside the block in ``lane``."""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+@contextmanager
+def default_lane(lane: str) -> Iterator[None]:
+    """Like :func:`request_lane`, unless a lane is already selected."""
+    if _current_lane.get() is not None:
+        yield
+        return
+    with request_lane(lane):
+        yield
+
+
+class Bulkhead:
+    """Per-lane concurrency limits.
+
+    Args:
+        limits: Maximum concurrent requests per lane name.
+        default: Lane used when none (or an unknown one) is selected.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, int],
+        *,
+        default: str = ShipXRequestLane.INTERACTIVE,
+    ) -> None:
+        if default not in limits:
+            raise ValueError(f"No limit for the default lane {default!r}")
+        if any(limit < 1 for limit in limits.values()):
+            raise ValueError("Lane limits must be at least 1")
+        self.limits = dict(limits)
+        self.default = default
+        self._limiters = {
+            lane: anyio.CapacityLimiter(limit) for lane, limit in limits.items()
+        }
+
+    @property
+    def total(self) -> int:
+        """Sum of all lane limits."""
+        return sum(self.limits.values())
+
+    def lane(self, lane: str | None = None) -> str:
+        """Return the lane used for ``lane`` (or the current lane)."""
+        if lane is None:
+            lane = current_lane()
+        return lane if lane in self._limiters else self.default
+
+    def limiter(self, lane: str | None = None) -> anyio.CapacityLimiter:
+        """Return the limiter of ``lane`` (the default lane if unknown)."""
+        return self._limiters[self.lane(lane or self.default)]
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one slot of the current lane."""
+        async with self.limiter(current_lane()):
+            yield
@@ -0,0 +1,479 @@
+"""Open-loop load generator for the ShipX API.
+
+Drives a :class:`ShipXClient` at a fixed arrival rate (not a fixed
+concurrency), so a slow server cannot throttle the offered load. Every
+request has an *intended* start time on the arrival schedule; latency
+measured from that time is corrected for coordinated omission, latency
+measured from the actual send time is reported alongside it.
+
+Usage::
+
+    sendparcel-inpost-load --organization-id 123 --sandbox \\
+        --rate 50 --duration 60 --mix status=6,tracking=3,label=1 \\
+        --shipment-id 1001 --shipment-id 1002 --tracking-number 6200...
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, TextIO
+
+import anyio
+from anyio.abc import TaskGroup
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.exceptions import ShipXAPIError
+
+OPERATIONS = ("create", "label", "status", "tracking")
+
+REPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """HDR-style log-linear latency histogram.
+
+    Values are recorded in microseconds into buckets whose width grows
+    with magnitude, keeping the relative error below
+    ``2 ** -sub_bucket_bits`` regardless of the recorded range.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7) -> None:
+        self._sub_bucket_bits = sub_bucket_bits
+        self._counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def _bucket(self, value_us: int) -> int:
+        shift = max(value_us.bit_length() - self._sub_bucket_bits, 0)
+        return ((value_us >> shift) << shift) | ((1 << shift) - 1)
+
+    def record(self, seconds: float) -> None:
+        """Record a single latency sample given in seconds."""
+        value_us = max(int(seconds * 1_000_000), 0)
+        bucket = self._bucket(value_us)
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.max_us = max(self.max_us, value_us)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add all samples of ``other`` to this histogram."""
+        for bucket, count in other._counts.items():
+            self._counts[bucket] = self._counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percentile: float) -> float:
+        """Return the latency in seconds at the given percentile."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(self.count * percentile / 100.0), 1)
+        seen = 0
+        for bucket in sorted(self._counts):
+            seen += self._counts[bucket]
+            if seen >= rank:
+                return min(bucket, self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        """Mean latency in seconds."""
+        if not self.count:
+            return 0.0
+        return self.total_us / self.count / 1_000_000
+
+    @property
+    def max(self) -> float:
+        """Maximum recorded latency in seconds."""
+        return self.max_us / 1_000_000
+
+
+@dataclass
+class OperationStats:
+    """Latency and error counters for a single operation type."""
+
+    corrected: LatencyHistogram = field(default_factory=LatencyHistogram)
+    uncorrected: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: dict[str, int] = field(default_factory=dict)
+    skipped: int = 0
+
+    @property
+    def error_count(self) -> int:
+        """Total number of failed requests."""
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of completed requests that failed."""
+        if not self.corrected.count:
+            return 0.0
+        return self.error_count / self.corrected.count
+
+    def merge(self, other: "OperationStats") -> None:
+        """Add all counters of ``other`` to these stats."""
+        self.corrected.merge(other.corrected)
+        self.uncorrected.merge(other.uncorrected)
+        for key, count in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + count
+        self.skipped += other.skipped
+
+
+@dataclass
+class LoadProfile:
+    """Description of the offered load."""
+
+    rate: float
+    duration: float
+    mix: dict[str, float]
+    shipment_ids: list[int] = field(default_factory=list)
+    tracking_numbers: list[str] = field(default_factory=list)
+    payload: dict[str, Any] | None = None
+    poisson: bool = False
+    max_in_flight: int = 1000
+    seed: int | None = None
+
+
+@dataclass
+class LoadReport:
+    """Aggregated results of a load run."""
+
+    elapsed: float = 0.0
+    operations: dict[str, OperationStats] = field(default_factory=dict)
+
+    def stats(self, operation: str) -> OperationStats:
+        """Return (creating if needed) stats for an operation."""
+        return self.operations.setdefault(operation, OperationStats())
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse an operation mix such as ``"status=6,tracking=3,label=1"``."""
+    mix: dict[str, float] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation in mix: {name!r}")
+        try:
+            mix[name] = float(weight) if weight else 1.0
+        except ValueError as exc:
+            raise ValueError(f"Invalid weight for {name!r}: {weight}") from exc
+        if mix[name] < 0:
+            raise ValueError(f"Negative weight for {name!r}")
+    if not any(mix.values()):
+        raise ValueError("Operation mix must have a positive weight")
+    return mix
+
+
+class LoadGenerator:
+    """Fire ShipX requests on an open-loop arrival schedule."""
+
+    def __init__(
+        self,
+        client: ShipXClient,
+        profile: LoadProfile,
+        *,
+        on_interval: Callable[[float, LoadReport], None] | None = None,
+        report_interval: float = 5.0,
+    ) -> None:
+        self.client = client
+        self.profile = profile
+        self.on_interval = on_interval
+        self.report_interval = report_interval
+        self._random = random.Random(profile.seed)
+        self._shipment_ids = list(profile.shipment_ids)
+        self._tracking_numbers = list(profile.tracking_numbers)
+        self._operations = [op for op, w in profile.mix.items() if w > 0]
+        self._weights = [profile.mix[op] for op in self._operations]
+        self._total = LoadReport()
+        self._interval = LoadReport()
+
+    async def run(self) -> LoadReport:
+        """Run the load for the configured duration and return totals."""
+        limiter = anyio.CapacityLimiter(self.profile.max_in_flight)
+        start = anyio.current_time()
+        async with anyio.create_task_group() as outer:
+            outer.start_soon(self._report_loop, start)
+            async with anyio.create_task_group() as requests:
+                await self._schedule(requests, limiter, start)
+            outer.cancel_scope.cancel()
+        self._flush_interval(start)
+        self._total.elapsed = anyio.current_time() - start
+        return self._total
+
+    async def _schedule(
+        self,
+        task_group: TaskGroup,
+        limiter: anyio.CapacityLimiter,
+        start: float,
+    ) -> None:
+        sent = 0
+        offset = 0.0
+        while offset < self.profile.duration:
+            intended = start + offset
+            delay = intended - anyio.current_time()
+            if delay > 0:
+                await anyio.sleep(delay)
+            operation = self._random.choices(
+                self._operations,
+                weights=self._weights,
+            )[0]
+            task_group.start_soon(self._fire, operation, intended, limiter)
+            sent += 1
+            offset = self._next_offset(offset, sent)
+
+    def _next_offset(self, offset: float, sent: int) -> float:
+        if self.profile.poisson:
+            return offset + self._random.expovariate(self.profile.rate)
+        # Derive from the count so the schedule does not drift with
+        # accumulated floating-point error.
+        return sent / self.profile.rate
+
+    async def _report_loop(self, start: float) -> None:
+        while True:
+            await anyio.sleep(self.report_interval)
+            self._flush_interval(start)
+
+    def _flush_interval(self, start: float) -> None:
+        interval, self._interval = self._interval, LoadReport()
+        interval.elapsed = anyio.current_time() - start
+        for operation, stats in interval.operations.items():
+            self._total.stats(operation).merge(stats)
+        if self.on_interval is not None and interval.operations:
+            self.on_interval(interval.elapsed, interval)
+
+    async def _fire(
+        self,
+        operation: str,
+        intended: float,
+        limiter: anyio.CapacityLimiter,
+    ) -> None:
+        call = self._build_call(operation)
+        if call is None:
+            self._interval.stats(operation).skipped += 1
+            return
+        async with limiter:
+            sent = anyio.current_time()
+            error: str | None = None
+            try:
+                await call()
+            except ShipXAPIError as exc:
+                error = str(exc.status_code)
+            except Exception as exc:
+                error = type(exc).__name__
+            finished = anyio.current_time()
+        stats = self._interval.stats(operation)
+        stats.corrected.record(finished - intended)
+        stats.uncorrected.record(finished - sent)
+        if error is not None:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def _build_call(
+        self,
+        operation: str,
+    ) -> Callable[[], Awaitable[Any]] | None:
+        if operation == "create":
+            return self._create
+        if operation == "tracking":
+            if not self._tracking_numbers:
+                return None
+            number = self._random.choice(self._tracking_numbers)
+            return lambda: self.client.get_tracking(tracking_number=number)
+        if not self._shipment_ids:
+            return None
+        shipment_id = self._random.choice(self._shipment_ids)
+        if operation == "label":
+            return lambda: self.client.get_label(shipment_id=shipment_id)
+        return lambda: self.client.get_shipment(shipment_id=shipment_id)
+
+    async def _create(self) -> None:
+        response = await self.client.create_shipment(
+            payload=dict(self.profile.payload or {}),
+        )
+        if "id" in response:
+            self._shipment_ids.append(int(response["id"]))
+        if response.get("tracking_number"):
+            self._tracking_numbers.append(response["tracking_number"])
+
+
+async def run_load(
+    client: ShipXClient,
+    profile: LoadProfile,
+    *,
+    on_interval: Callable[[float, LoadReport], None] | None = None,
+    report_interval: float = 5.0,
+) -> LoadReport:
+    """Run an open-loop load against ``client`` and return the totals."""
+    generator = LoadGenerator(
+        client,
+        profile,
+        on_interval=on_interval,
+        report_interval=report_interval,
+    )
+    return await generator.run()
+
+
+def _format_ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}"
+
+
+def format_report(report: LoadReport, *, title: str) -> str:
+    """Render a report as a fixed-width text table."""
+    percentile_headers = "".join(
+        f"{'p' + format(p, 'g'):>9}" for p in REPORT_PERCENTILES
+    )
+    lines = [
+        f"{title} (elapsed {report.elapsed:.1f}s, latencies in ms)",
+        f"{'operation':<10}{'hist':<6}{'count':>7}{'err%':>7}"
+        f"{percentile_headers}{'max':>9}",
+    ]
+    for operation in sorted(report.operations):
+        stats = report.operations[operation]
+        for name, histogram in (
+            ("co", stats.corrected),
+            ("raw", stats.uncorrected),
+        ):
+            values = "".join(
+                f"{_format_ms(histogram.percentile(p)):>9}"
+                for p in REPORT_PERCENTILES
+            )
+            lines.append(
+                f"{operation:<10}{name:<6}{histogram.count:>7}"
+                f"{stats.error_rate * 100:>7.2f}{values}"
+                f"{_format_ms(histogram.max):>9}"
+            )
+        if stats.errors:
+            detail = ", ".join(
+                f"{key}={count}" for key, count in sorted(stats.errors.items())
+            )
+            lines.append(f"{'':<10}errors: {detail}")
+        if stats.skipped:
+            lines.append(f"{'':<10}skipped (no ids yet): {stats.skipped}")
+    return "\n".join(lines)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sendparcel-inpost-load",
+        description="Open-loop load generator for the InPost ShipX API.",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("SHIPX_TOKEN", ""),
+        help="ShipX API token (default: $SHIPX_TOKEN)",
+    )
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--sandbox", action="store_true")
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        required=True,
+        help="Arrival rate in requests per second",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=60.0,
+        help="Run time in seconds",
+    )
+    parser.add_argument(
+        "--mix",
+        default="status=1",
+        help="Weighted operation mix, e.g. status=6,tracking=3,label=1",
+    )
+    parser.add_argument("--shipment-id", type=int, action="append", default=[])
+    parser.add_argument("--tracking-number", action="append", default=[])
+    parser.add_argument(
+        "--payload",
+        type=argparse.FileType("r"),
+        help="JSON file with the create_shipment payload",
+    )
+    parser.add_argument(
+        "--poisson",
+        action="store_true",
+        help="Use exponential inter-arrival times instead of a fixed gap",
+    )
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(
+    argv: Sequence[str] | None = None,
+    *,
+    stdout: TextIO | None = None,
+) -> int:
+    """Console entry point for ``sendparcel-inpost-load``."""
+    out = stdout or sys.stdout
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+    if mix.get("create") and args.payload is None:
+        parser.error("--payload is required when the mix contains create")
+    needs_ids = mix.get("label") or mix.get("status")
+    if needs_ids and not args.shipment_id and not mix.get("create"):
+        parser.error("label/status operations need --shipment-id or create")
+    if (
+        mix.get("tracking")
+        and not args.tracking_number
+        and not mix.get("create")
+    ):
+        parser.error("tracking operations need --tracking-number or create")
+
+    payload = json.load(args.payload) if args.payload else None
+    profile = LoadProfile(
+        rate=args.rate,
+        duration=args.duration,
+        mix=mix,
+        shipment_ids=args.shipment_id,
+        tracking_numbers=args.tracking_number,
+        payload=payload,
+        poisson=args.poisson,
+        max_in_flight=args.max_in_flight,
+        seed=args.seed,
+    )
+
+    def on_interval(elapsed: float, report: LoadReport) -> None:
+        print(format_report(report, title=f"t={elapsed:.0f}s"), file=out)
+        print(file=out)
+
+    async def _run() -> LoadReport:
+        async with ShipXClient(
+            token=args.token,
+            organization_id=args.organization_id,
+            sandbox=args.sandbox,
+            base_url=args.base_url,
+            timeout=args.timeout,
+        ) as client:
+            return await run_load(
+                client,
+                profile,
+                on_interval=on_interval,
+                report_interval=args.report_interval,
+            )
+
+    report = anyio.run(_run)
+    print(format_report(report, title="Summary"), file=out)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,546 @@
+"""Durable local outbox for shipment creation.
+
+Placing an order should not wait for ShipX. :class:`ShipmentOutbox`
+journals ``create_shipment`` requests in a SQLite database and returns
+at once with a ``queued`` entry; an :class:`OutboxDrainer` sends queued
+entries in the background at a controlled rate, stores each result and
+reports it through callbacks.
+
+Every entry has a reference (the order number, or a generated one) that
+is sent as the shipment ``reference``, so a request resent after a crash
+or a timeout is looked up instead of creating a second shipment.
+
+Usage::
+
+    outbox = ShipmentOutbox("/var/lib/shop/shipx-outbox.db")
+    entry = await outbox.enqueue(payload, reference=order.number)
+
+    drainer = OutboxDrainer(outbox, client, on_created=notify_customer)
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(drainer.run)
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import anyio
+
+from sendparcel_inpost.client import TRANSIENT_STATUS_CODES, ShipXClient
+from sendparcel_inpost.enums import ShipXOutboxStatus, ShipXRequestLane
+from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.lanes import default_lane
+from sendparcel_inpost.ratelimit import RateLimiter
+from sendparcel_inpost.validation import raise_for_invalid_payload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE = 300.0
+DEFAULT_DRAIN_CONCURRENCY = 4
+DEFAULT_MAX_ATTEMPTS = 10
+DEFAULT_RETRY_DELAY = 5.0
+DEFAULT_MAX_RETRY_DELAY = 300.0
+
+_COLUMNS = (
+    "reference, payload, status, attempts, sends, claim, shipment, error, "
+    "created_at, updated_at"
+)
+
+OnEntry = Callable[["OutboxEntry"], None]
+
+
+@dataclass
+class OutboxEntry:
+    """A shipment creation request stored in the outbox.
+
+    ``attempts`` counts sends since the entry was last (re)queued, and
+    ``sends`` every send ever made. ``claim`` identifies the current
+    lease of a ``sending`` entry.
+    """
+
+    reference: str
+    payload: dict[str, Any]
+    status: ShipXOutboxStatus
+    attempts: int = 0
+    sends: int = 0
+    claim: str | None = None
+    shipment: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def shipment_id(self) -> int | None:
+        """ShipX id of the created shipment, if any."""
+        if self.shipment is None or self.shipment.get("id") is None:
+            return None
+        return int(self.shipment["id"])
+
+
+def _entry(row: tuple[Any, ...]) -> OutboxEntry:
+    return OutboxEntry(
+        reference=row[0],
+        payload=json.loads(row[1]),
+        status=ShipXOutboxStatus(row[2]),
+        attempts=row[3],
+        sends=row[4],
+        claim=row[5],
+        shipment=json.loads(row[6]) if row[6] is not None else None,
+        error=row[7],
+        created_at=row[8],
+        updated_at=row[9],
+    )
+
+
+class ShipmentOutbox:
+    """Shipment creation requests journaled in a SQLite database file.
+
+    Processes on one host that open the same ``path`` share the outbox;
+    several drainers may run against it at once.
+
+    Args:
+        path: Database file.
+        validate_payloads: Check payloads locally in :meth:`enqueue`, so
+            invalid ones are rejected before they are queued.
+        busy_timeout: Seconds to wait for another process's write lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        validate_payloads: bool = False,
+        busy_timeout: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.validate_payloads = validate_payloads
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS shipx_outbox ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "reference TEXT NOT NULL UNIQUE, "
+            "payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "sends INTEGER NOT NULL DEFAULT 0, "
+            "claim TEXT, "
+            "shipment TEXT, "
+            "error TEXT, "
+            "available_at REAL NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL)",
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS shipx_outbox_due "
+            "ON shipx_outbox (status, available_at)",
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    async def enqueue(
+        self,
+        payload: dict[str, Any],
+        *,
+        reference: str | None = None,
+    ) -> OutboxEntry:
+        """Journal a create-shipment request and return its entry.
+
+        Enqueueing a reference that is already in the outbox returns the
+        existing entry unchanged.
+        """
+        if self.validate_payloads:
+            raise_for_invalid_payload(payload)
+        reference = reference or uuid.uuid4().hex
+        return await anyio.to_thread.run_sync(
+            self._enqueue_sync,
+            reference,
+            json.dumps(payload),
+        )
+
+    async def get(self, reference: str) -> OutboxEntry | None:
+        """Return the entry for ``reference``, if any."""
+        return await anyio.to_thread.run_sync(self._get_sync, reference)
+
+    async def claim(
+        self,
+        limit: int = 1,
+        *,
+        lease: float = DEFAULT_LEASE,
+    ) -> list[OutboxEntry]:
+        """Take up to ``limit`` due entries for sending, oldest first.
+
+        Claimed entries become ``sending``. An entry whose sender has not
+        reported back within ``lease`` seconds (e.g. because it crashed)
+        can be claimed again.
+        """
+        return await anyio.to_thread.run_sync(self._claim_sync, limit, lease)
+
+    async def mark_created(
+        self,
+        entry: OutboxEntry,
+        shipment: dict[str, Any],
+    ) -> OutboxEntry | None:
+        """Store the created shipment of a claimed entry.
+
+        Like :meth:`mark_failed` and :meth:`retry_later`, this returns
+        ``None`` without a change if the claim has expired and the entry
+        was claimed again since.
+        """
+        return await anyio.to_thread.run_sync(
+            self._update_sync,
+            entry,
+            ShipXOutboxStatus.CREATED,
+            json.dumps(shipment),
+            None,
+            0.0,
+        )
+
+    async def mark_failed(
+        self,
+        entry: OutboxEntry,
+        error: str,
+    ) -> OutboxEntry | None:
+        """Give up on a claimed entry and store the error."""
+        return await anyio.to_thread.run_sync(
+            self._update_sync,
+            entry,
+            ShipXOutboxStatus.FAILED,
+            None,
+            error,
+            0.0,
+        )
+
+    async def retry_later(
+        self,
+        entry: OutboxEntry,
+        error: str,
+        delay: float,
+    ) -> OutboxEntry | None:
+        """Queue a claimed entry again, due in ``delay`` seconds."""
+        return await anyio.to_thread.run_sync(
+            self._update_sync,
+            entry,
+            ShipXOutboxStatus.QUEUED,
+            None,
+            error,
+            delay,
+        )
+
+    async def requeue(self, reference: str) -> bool:
+        """Queue a failed entry again; return whether it was failed.
+
+        Its attempts start over, but earlier sends are remembered, so the
+        shipment is looked up before it is created again.
+        """
+        return await anyio.to_thread.run_sync(self._requeue_sync, reference)
+
+    async def counts(self) -> dict[ShipXOutboxStatus, int]:
+        """Return the number of entries in each status."""
+        return await anyio.to_thread.run_sync(self._counts_sync)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _select(
+        self,
+        connection: sqlite3.Connection,
+        reference: str,
+    ) -> OutboxEntry | None:
+        row = connection.execute(
+            f"SELECT {_COLUMNS} FROM shipx_outbox WHERE reference = ?",
+            (reference,),
+        ).fetchone()
+        return _entry(row) if row else None
+
+    def _enqueue_sync(self, reference: str, payload: str) -> OutboxEntry:
+        now = self._clock()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO shipx_outbox (reference, payload, "
+                "status, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (reference, payload, ShipXOutboxStatus.QUEUED, now, now, now),
+            )
+            entry = self._select(connection, reference)
+        assert entry is not None
+        return entry
+
+    def _get_sync(self, reference: str) -> OutboxEntry | None:
+        with self._lock:
+            return self._select(self._connection, reference)
+
+    def _claim_sync(self, limit: int, lease: float) -> list[OutboxEntry]:
+        now = self._clock()
+        with self._transaction() as connection:
+            references = [
+                row[0]
+                for row in connection.execute(
+                    "SELECT reference FROM shipx_outbox "
+                    "WHERE status IN (?, ?) AND available_at <= ? "
+                    "ORDER BY available_at, seq LIMIT ?",
+                    (
+                        ShipXOutboxStatus.QUEUED,
+                        ShipXOutboxStatus.SENDING,
+                        now,
+                        limit,
+                    ),
+                )
+            ]
+            entries: list[OutboxEntry] = []
+            for reference in references:
+                connection.execute(
+                    "UPDATE shipx_outbox SET status = ?, "
+                    "attempts = attempts + 1, sends = sends + 1, claim = ?, "
+                    "available_at = ?, updated_at = ? WHERE reference = ?",
+                    (
+                        ShipXOutboxStatus.SENDING,
+                        uuid.uuid4().hex,
+                        now + lease,
+                        now,
+                        reference,
+                    ),
+                )
+                entry = self._select(connection, reference)
+                assert entry is not None
+                entries.append(entry)
+        return entries
+
+    def _update_sync(
+        self,
+        entry: OutboxEntry,
+        status: ShipXOutboxStatus,
+        shipment: str | None,
+        error: str | None,
+        delay: float,
+    ) -> OutboxEntry | None:
+        now = self._clock()
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE shipx_outbox SET status = ?, claim = NULL, "
+                "shipment = coalesce(?, shipment), error = ?, "
+                "available_at = ?, updated_at = ? "
+                "WHERE reference = ? AND status = ? AND claim = ?",
+                (
+                    status,
+                    shipment,
+                    error,
+                    now + delay,
+                    now,
+                    entry.reference,
+                    ShipXOutboxStatus.SENDING,
+                    entry.claim,
+                ),
+            )
+            if cursor.rowcount == 0:
+                return None
+            return self._select(connection, entry.reference)
+
+    def _requeue_sync(self, reference: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE shipx_outbox SET status = ?, attempts = 0, "
+                "available_at = ?, updated_at = ? "
+                "WHERE reference = ? AND status = ?",
+                (
+                    ShipXOutboxStatus.QUEUED,
+                    now,
+                    now,
+                    reference,
+                    ShipXOutboxStatus.FAILED,
+                ),
+            )
+            return cursor.rowcount > 0
+
+    def _counts_sync(self) -> dict[ShipXOutboxStatus, int]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, count(*) FROM shipx_outbox GROUP BY status",
+            ).fetchall()
+        counts = dict.fromkeys(ShipXOutboxStatus, 0)
+        counts.update(
+            {ShipXOutboxStatus(status): count for status, count in rows},
+        )
+        return counts
+
+
+class OutboxDrainer:
+    """Send queued outbox entries to ShipX.
+
+    Args:
+        outbox: Outbox to drain.
+        client: Client used to create the shipments.
+        rate_limiter: Paces sends; share it (e.g. with a SQLite backend)
+            to pace several drainers together.
+        concurrency: Maximum creates in flight.
+        max_attempts: Give up on an entry after this many sends that
+            failed with a timeout, a dropped connection or a transient
+            error status. Other errors fail the entry at once.
+        retry_delay: Delay before the second attempt; doubled for every
+            further attempt up to ``max_retry_delay``.
+        lease: Seconds a claimed entry is reserved for this drainer.
+        on_created: Called with the entry once its shipment was created.
+        on_failed: Called with the entry when it was given up on.
+    """
+
+    def __init__(
+        self,
+        outbox: ShipmentOutbox,
+        client: ShipXClient,
+        *,
+        rate_limiter: RateLimiter | None = None,
+        concurrency: int = DEFAULT_DRAIN_CONCURRENCY,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+        lease: float = DEFAULT_LEASE,
+        on_created: OnEntry | None = None,
+        on_failed: OnEntry | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.outbox = outbox
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.lease = lease
+        self.on_created = on_created
+        self.on_failed = on_failed
+
+    async def drain(self) -> int:
+        """Send every due entry; return how many were processed.
+
+        Requests use the bulk lane unless the caller selected one.
+        """
+        processed = 0
+
+        async def worker() -> None:
+            nonlocal processed
+            while True:
+                entries = await self.outbox.claim(lease=self.lease)
+                if not entries:
+                    return
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire()
+                await self._send(entries[0])
+                processed += 1
+
+        with default_lane(ShipXRequestLane.BULK):
+            async with anyio.create_task_group() as task_group:
+                for _ in range(self.concurrency):
+                    task_group.start_soon(worker)
+        return processed
+
+    async def run(self, *, poll_interval: float = 1.0) -> None:
+        """Drain the outbox forever, checking for new entries periodically."""
+        while True:
+            await self.drain()
+            await anyio.sleep(poll_interval)
+
+    async def _send(self, entry: OutboxEntry) -> None:
+        import httpx
+
+        try:
+            shipment = None
+            if entry.sends > 1:
+                # An earlier send may have reached ShipX.
+                shipment = await self.client.find_shipment_by_reference(
+                    entry.reference,
+                )
+            if shipment is None:
+                # Retries are scheduled through the outbox instead.
+                shipment = await self.client.create_shipment(
+                    entry.payload,
+                    reference=entry.reference,
+                    attempts=1,
+                )
+        except (ShipXAPIError, httpx.TransportError) as exc:
+            transient = (
+                not isinstance(exc, ShipXAPIError)
+                or exc.status_code in TRANSIENT_STATUS_CODES
+            )
+            if transient and entry.attempts < self.max_attempts:
+                delay = min(
+                    self.retry_delay * 2 ** (entry.attempts - 1),
+                    self.max_retry_delay,
+                )
+                await self.outbox.retry_later(entry, str(exc), delay)
+                return
+            await self._fail(entry, exc)
+            return
+        except Exception as exc:
+            await self._fail(entry, exc)
+            return
+        created = await self.outbox.mark_created(entry, shipment)
+        if created is None:
+            _log_lost_claim(entry)
+        elif self.on_created is not None:
+            _notify(self.on_created, created)
+
+    async def _fail(self, entry: OutboxEntry, exc: Exception) -> None:
+        logger.warning(
+            "ShipX outbox entry %s failed after %d attempts: %s",
+            entry.reference,
+            entry.attempts,
+            exc,
+        )
+        failed = await self.outbox.mark_failed(entry, str(exc))
+        if failed is None:
+            _log_lost_claim(entry)
+        elif self.on_failed is not None:
+            _notify(self.on_failed, failed)
+
+
+def _notify(
+    callback: Callable[[OutboxEntry], None],
+    entry: OutboxEntry,
+) -> None:
+    # The entry is already stored; a broken callback must not stop the
+    # drain.
+    try:
+        callback(entry)
+    except Exception:
+        logger.exception(
+            "ShipX outbox callback failed for entry %s",
+            entry.reference,
+        )
+
+
+def _log_lost_claim(entry: OutboxEntry) -> None:
+    logger.warning(
+        "ShipX outbox entry %s was claimed again before its result was "
+        "stored; the new claim will look the shipment up",
+        entry.reference,
+    )
@@ -0,0 +1,442 @@
+"""Local directory of InPost points with a nearest-point index.
+
+Locker pickers and ``target_point`` suggestions query points on every
+keystroke or map move. :class:`PointDirectory` keeps the catalogue in
+memory, indexed on a latitude/longitude grid, so ``nearest`` queries only
+scan a few grid cells. The catalogue is filled from
+:meth:`ShipXClient.iter_points` and refreshed incrementally, and can be
+saved to a compact JSON file between restarts::
+
+    directory = PointDirectory.load("points.json")
+    await directory.refresh(client)  # only points changed since last time
+    directory.save("points.json")
+
+    for point, distance_km in directory.nearest(50.06, 19.94, k=5):
+        ...
+"""
+
+import json
+import logging
+import math
+from collections.abc import AsyncIterable, Callable, Iterable
+from dataclasses import astuple, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import anyio
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.enums import ShipXParcelTemplate, ShipXRequestLane
+from sendparcel_inpost.lanes import default_lane
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CELL_SIZE = 0.05
+DEFAULT_REFRESH_INTERVAL = 3600.0
+OPERATING_STATUS = "Operating"
+PARCEL_COLLECT_FUNCTION = "parcel_collect"
+TARGET_POINT_FIELD = "custom_attributes.target_point"
+
+_EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = math.pi * _EARTH_RADIUS_KM / 180
+_STORE_VERSION = 1
+
+GridCell = tuple[int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class Point:
+    """A pickup point (parcel locker, POP, ...)."""
+
+    name: str
+    latitude: float
+    longitude: float
+    types: tuple[str, ...] = ()
+    status: str = OPERATING_STATUS
+    city: str = ""
+    post_code: str = ""
+    street: str = ""
+    building_number: str = ""
+    description: str = ""
+    functions: tuple[str, ...] = ()
+
+    @property
+    def operating(self) -> bool:
+        """Whether the point currently accepts parcels."""
+        return self.status == OPERATING_STATUS
+
+    def accepts_template(self, template: str) -> bool:
+        """Whether a locker parcel of ``template`` can be sent here.
+
+        ShipX does not publish per-size capacity, so this checks that the
+        template is a locker size and that the point accepts parcels for
+        collection (when its functions are known).
+        """
+        if template not in ShipXParcelTemplate:
+            return False
+        return not self.functions or PARCEL_COLLECT_FUNCTION in self.functions
+
+    @classmethod
+    def from_shipx(cls, item: dict[str, Any]) -> "Point":
+        """Build a point from a ShipX ``/v1/points`` item."""
+        location = item.get("location") or {}
+        address = item.get("address_details") or {}
+        point_type = item.get("type") or ()
+        return cls(
+            name=str(item["name"]),
+            latitude=float(location.get("latitude", 0.0)),
+            longitude=float(location.get("longitude", 0.0)),
+            types=(
+                (point_type,)
+                if isinstance(point_type, str)
+                else tuple(point_type)
+            ),
+            status=str(item.get("status", OPERATING_STATUS)),
+            city=str(address.get("city") or ""),
+            post_code=str(address.get("post_code") or ""),
+            street=str(address.get("street") or ""),
+            building_number=str(address.get("building_number") or ""),
+            description=str(item.get("location_description") or ""),
+            functions=tuple(item.get("functions") or ()),
+        )
+
+
+def haversine_km(
+    lat1: float,
+    lon1: float,
+    lat2: float,
+    lon2: float,
+) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+class PointDirectory:
+    """In-memory point catalogue with name lookup and nearest search.
+
+    Args:
+        cell_size: Grid cell size in degrees. Smaller cells make dense
+            city queries cheaper and sparse rural queries scan more rings.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.cursor: str | None = None
+        self._points: dict[str, Point] = {}
+        self._grid: dict[GridCell, list[Point]] = {}
+        # Populated grid rows/columns (min_row, max_row, min_col, max_col);
+        # only ever grows, which keeps nearest() searches conservative.
+        self._bounds = (0, -1, 0, -1)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.upper() in self._points
+
+    def get(self, name: str) -> Point | None:
+        """Return the point with the given name (e.g. ``KRA010``)."""
+        return self._points.get(name.upper())
+
+    def upsert(self, points: Iterable[Point]) -> int:
+        """Add or replace points; returns the number processed."""
+        count = 0
+        for point in points:
+            self.remove(point.name)
+            cell = self._cell(point)
+            self._points[point.name.upper()] = point
+            self._grid.setdefault(cell, []).append(point)
+            self._extend_bounds(cell)
+            count += 1
+        return count
+
+    def remove(self, name: str) -> bool:
+        """Drop a point; returns ``False`` if it was not present."""
+        point = self._points.pop(name.upper(), None)
+        if point is None:
+            return False
+        cell = self._cell(point)
+        bucket = self._grid[cell]
+        bucket.remove(point)
+        if not bucket:
+            del self._grid[cell]
+        return True
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 5,
+        *,
+        max_distance_km: float | None = None,
+        predicate: Callable[[Point], bool] | None = None,
+        point_type: str | None = None,
+        function: str | None = None,
+        operating_only: bool = True,
+    ) -> list[tuple[Point, float]]:
+        """Return up to ``k`` closest points with their distances (km).
+
+        Results can be narrowed by ``point_type`` (e.g.
+        ``parcel_locker``), a supported ``function`` (e.g.
+        ``parcel_collect``), operating status and an arbitrary
+        ``predicate``. Grid rings are scanned outwards until no unscanned
+        cell can hold a closer point.
+        """
+        if k <= 0 or not self._grid:
+            return []
+        origin = self._cell_of(latitude, longitude)
+        max_ring = self._max_ring(origin, latitude, max_distance_km)
+        found: list[tuple[float, Point]] = []
+        ring = 0
+        while ring <= max_ring:
+            for cell in self._ring_cells(origin, ring):
+                for point in self._grid.get(cell, ()):
+                    if not self._matches(
+                        point,
+                        point_type,
+                        function,
+                        operating_only,
+                        predicate,
+                    ):
+                        continue
+                    distance = haversine_km(
+                        latitude,
+                        longitude,
+                        point.latitude,
+                        point.longitude,
+                    )
+                    if max_distance_km is None or distance <= max_distance_km:
+                        found.append((distance, point))
+            if len(found) >= k:
+                found.sort(key=lambda pair: pair[0])
+                del found[k:]
+                if found[-1][0] <= self._ring_bound(latitude, ring):
+                    break
+            ring += 1
+        found.sort(key=lambda pair: pair[0])
+        return [(point, distance) for distance, point in found[:k]]
+
+    def target_point_errors(
+        self,
+        name: str,
+        template: str,
+    ) -> list[dict[str, str]]:
+        """Check a locker shipment's ``target_point`` against the catalogue.
+
+        Returns errors in the ``ShipXValidationError.errors`` format; an
+        empty list means the point exists, is operating and accepts
+        ``template`` parcels.
+        """
+        point = self.get(name)
+        if point is None:
+            message = f"Point {name} does not exist"
+        elif not point.operating:
+            message = f"Point {name} is not operating ({point.status})"
+        elif not point.accepts_template(template):
+            message = f"Point {name} does not accept {template} parcels"
+        else:
+            return []
+        return [{"field": TARGET_POINT_FIELD, "message": message}]
+
+    async def refresh(
+        self,
+        client: ShipXClient,
+        *,
+        full: bool = False,
+        types: Iterable[str] | None = None,
+    ) -> int:
+        """Fetch points changed since the last refresh (or all of them).
+
+        Returns the number of upserted points. The cursor only advances
+        after the whole listing was consumed.
+        """
+        started = datetime.now(UTC).isoformat()
+        since = None if full else self.cursor
+        with default_lane(ShipXRequestLane.BACKGROUND):
+            count = await self.upsert_stream(
+                client.iter_points(updated_since=since, types=types),
+            )
+        self.cursor = started
+        return count
+
+    async def keep_fresh(
+        self,
+        client: ShipXClient,
+        *,
+        interval: float = DEFAULT_REFRESH_INTERVAL,
+    ) -> None:
+        """Refresh every ``interval`` seconds until cancelled.
+
+        Failed refreshes are logged and retried on the next interval.
+        """
+        while True:
+            try:
+                await self.refresh(client)
+            except Exception as exc:
+                logger.warning("Point catalogue refresh failed: %s", exc)
+            await anyio.sleep(interval)
+
+    async def upsert_stream(
+        self,
+        items: AsyncIterable[dict[str, Any]],
+    ) -> int:
+        """Upsert ShipX point items from an async stream."""
+        count = 0
+        async for item in items:
+            count += self.upsert([Point.from_shipx(item)])
+        return count
+
+    def save(self, path: str | Path) -> None:
+        """Write the directory to a compact JSON file."""
+        data = {
+            "version": _STORE_VERSION,
+            "cursor": self.cursor,
+            "points": [astuple(point) for point in self._points.values()],
+        }
+        Path(path).write_text(
+            json.dumps(data, separators=(",", ":")),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        *,
+        cell_size: float = DEFAULT_CELL_SIZE,
+    ) -> "PointDirectory":
+        """Read a file written by :meth:`save`; empty if it is missing."""
+        directory = cls(cell_size)
+        file = Path(path)
+        if not file.exists():
+            return directory
+        data = json.loads(file.read_text(encoding="utf-8"))
+        if data.get("version") != _STORE_VERSION:
+            return directory
+        directory.cursor = data.get("cursor")
+        directory.upsert(
+            Point(
+                name,
+                latitude,
+                longitude,
+                tuple(types),
+                status,
+                city,
+                post_code,
+                street,
+                building_number,
+                description,
+                tuple(functions),
+            )
+            for (
+                name,
+                latitude,
+                longitude,
+                types,
+                status,
+                city,
+                post_code,
+                street,
+                building_number,
+                description,
+                functions,
+            ) in data.get("points", [])
+        )
+        return directory
+
+    def _extend_bounds(self, cell: GridCell) -> None:
+        row, column = cell
+        if self._bounds[1] < self._bounds[0]:
+            self._bounds = (row, row, column, column)
+            return
+        min_row, max_row, min_column, max_column = self._bounds
+        self._bounds = (
+            min(min_row, row),
+            max(max_row, row),
+            min(min_column, column),
+            max(max_column, column),
+        )
+
+    def _cell(self, point: Point) -> GridCell:
+        return self._cell_of(point.latitude, point.longitude)
+
+    def _cell_of(self, latitude: float, longitude: float) -> GridCell:
+        return (
+            math.floor(latitude / self.cell_size),
+            math.floor(longitude / self.cell_size),
+        )
+
+    def _ring_bound(self, latitude: float, ring: int) -> float:
+        # Any point outside ``ring`` is at least this far away: ``ring``
+        # whole cells in either direction, with longitude degrees measured
+        # at the highest latitude the ring reaches.
+        edge = min(89.0, abs(latitude) + (ring + 1) * self.cell_size)
+        cell_km = self.cell_size * _KM_PER_DEGREE * math.cos(math.radians(edge))
+        return ring * cell_km
+
+    def _max_ring(
+        self,
+        origin: GridCell,
+        latitude: float,
+        max_distance_km: float | None,
+    ) -> int:
+        # Rings beyond the populated bounding box cannot add points.
+        min_row, max_row, min_column, max_column = self._bounds
+        row, column = origin
+        limit = max(
+            abs(row - min_row),
+            abs(row - max_row),
+            abs(column - min_column),
+            abs(column - max_column),
+        )
+        if max_distance_km is None:
+            return limit
+        ring = 0
+        while ring < limit and (
+            self._ring_bound(latitude, ring) <= max_distance_km
+        ):
+            ring += 1
+        return ring
+
+    @staticmethod
+    def _ring_cells(origin: GridCell, ring: int) -> Iterable[GridCell]:
+        row, column = origin
+        if ring == 0:
+            yield origin
+            return
+        for offset in range(-ring, ring + 1):
+            yield row - ring, column + offset
+            yield row + ring, column + offset
+        for offset in range(-ring + 1, ring):
+            yield row + offset, column - ring
+            yield row + offset, column + ring
+
+    @staticmethod
+    def _matches(
+        point: Point,
+        point_type: str | None,
+        function: str | None,
+        operating_only: bool,
+        predicate: Callable[[Point], bool] | None,
+    ) -> bool:
+        if operating_only and not point.operating:
+            return False
+        if point_type is not None and point_type not in point.types:
+            return False
+        if function is not None and function not in point.functions:
+            return False
+        return predicate is None or predicate(point)
+
+
+point_directory = PointDirectory()
+"""Process-wide catalogue used for ``target_point`` validation."""
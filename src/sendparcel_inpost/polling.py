@@ -0,0 +1,309 @@
+"""Status-aware polling scheduler for open shipments.
+
+Decides when each shipment should next be polled (e.g. through
+``fetch_shipment_status``) based on its current sendparcel status, instead
+of polling every shipment on a fixed cron. Due times are kept in a binary
+heap with lazy deletion, so scheduling and popping stay ``O(log n)`` for
+millions of tracked shipments.
+
+Usage::
+
+    scheduler = PollScheduler()
+    scheduler.schedule("123", ShipmentStatus.CREATED)
+
+    async def poll(shipment_id: str) -> str | None:
+        provider = InPostLockerProvider(load_shipment(shipment_id), config)
+        return (await provider.fetch_shipment_status())["status"]
+
+    await scheduler.run(poll, concurrency=10)
+"""
+
+import heapq
+import random
+import time
+from collections.abc import Awaitable, Callable, Mapping
+
+import anyio
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.enums import ShipXRequestLane
+from sendparcel_inpost.lanes import default_lane
+
+DEFAULT_POLL_INTERVALS: dict[ShipmentStatus, float | None] = {
+    ShipmentStatus.NEW: 5 * 60.0,
+    ShipmentStatus.CREATED: 60.0,
+    ShipmentStatus.LABEL_READY: 60 * 60.0,
+    ShipmentStatus.IN_TRANSIT: 6 * 60 * 60.0,
+    ShipmentStatus.OUT_FOR_DELIVERY: 15 * 60.0,
+    ShipmentStatus.FAILED: 12 * 60 * 60.0,
+    # Terminal statuses are never polled again.
+    ShipmentStatus.DELIVERED: None,
+    ShipmentStatus.CANCELLED: None,
+    ShipmentStatus.RETURNED: None,
+}
+
+DEFAULT_WEBHOOK_BACKOFF = 4.0
+DEFAULT_WEBHOOK_WINDOW = 24 * 60 * 60.0
+DEFAULT_MAX_INTERVAL = 24 * 60 * 60.0
+
+PollFunction = Callable[[str], Awaitable[ShipmentStatus | str | None]]
+
+
+class _Entry:
+    __slots__ = ("due", "last_webhook", "queued", "status", "version")
+
+    def __init__(self, status: ShipmentStatus) -> None:
+        self.status = status
+        self.due = 0.0
+        self.queued = False
+        self.last_webhook: float | None = None
+        self.version = 0
+
+
+class PollScheduler:
+    """Heap-based due-time queue of shipments to poll.
+
+    Args:
+        intervals: Poll interval in seconds per status; ``None`` stops
+            polling. Unlisted statuses fall back to ``max_interval``.
+        webhook_backoff: Interval multiplier applied while webhooks are
+            arriving for a shipment.
+        webhook_window: How long (seconds) after the last webhook the
+            backoff stays in effect.
+        max_interval: Upper bound for any computed interval.
+        jitter: Relative random spread added to intervals so shipments
+            created together do not stay synchronized.
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        intervals: Mapping[ShipmentStatus, float | None] | None = None,
+        *,
+        webhook_backoff: float = DEFAULT_WEBHOOK_BACKOFF,
+        webhook_window: float = DEFAULT_WEBHOOK_WINDOW,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        jitter: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.intervals = dict(DEFAULT_POLL_INTERVALS)
+        if intervals is not None:
+            self.intervals.update(intervals)
+        self.webhook_backoff = webhook_backoff
+        self.webhook_window = webhook_window
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._clock = clock
+        self._random = rng or random.Random()
+        self._entries: dict[str, _Entry] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._changed: anyio.Event | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, shipment_id: object) -> bool:
+        return shipment_id in self._entries
+
+    def status_of(self, shipment_id: str) -> ShipmentStatus | None:
+        """Return the last known status of a scheduled shipment."""
+        entry = self._entries.get(shipment_id)
+        return entry.status if entry else None
+
+    def due_at(self, shipment_id: str) -> float | None:
+        """Return the clock time at which the shipment is next due."""
+        entry = self._entries.get(shipment_id)
+        return entry.due if entry and entry.queued else None
+
+    def interval_for(
+        self,
+        status: ShipmentStatus,
+        *,
+        webhook_active: bool = False,
+    ) -> float | None:
+        """Return the base poll interval for a status (without jitter)."""
+        interval = self.intervals.get(status, self.max_interval)
+        if interval is None:
+            return None
+        if webhook_active:
+            interval *= self.webhook_backoff
+        return min(interval, self.max_interval)
+
+    def schedule(
+        self,
+        shipment_id: str,
+        status: ShipmentStatus | str,
+        *,
+        now: float | None = None,
+    ) -> float | None:
+        """Record the current status and schedule the next poll.
+
+        Returns the due time, or ``None`` when the status is terminal and
+        the shipment was dropped from the schedule.
+        """
+        status = ShipmentStatus(status)
+        now = self._clock() if now is None else now
+        entry = self._entries.get(shipment_id)
+        if entry is None:
+            entry = _Entry(status)
+        entry.status = status
+        webhook_active = (
+            entry.last_webhook is not None
+            and now - entry.last_webhook < self.webhook_window
+        )
+        interval = self.interval_for(status, webhook_active=webhook_active)
+        if interval is None:
+            self.remove(shipment_id)
+            return None
+        if self.jitter:
+            interval *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        self._push(shipment_id, entry, now + interval)
+        return entry.due
+
+    def record_webhook(
+        self,
+        shipment_id: str,
+        status: ShipmentStatus | str,
+        *,
+        now: float | None = None,
+    ) -> float | None:
+        """Record a webhook-delivered status and back off polling."""
+        now = self._clock() if now is None else now
+        entry = self._entries.get(shipment_id)
+        if entry is None:
+            entry = _Entry(ShipmentStatus(status))
+            self._entries[shipment_id] = entry
+        entry.last_webhook = now
+        return self.schedule(shipment_id, status, now=now)
+
+    def remove(self, shipment_id: str) -> None:
+        """Stop polling a shipment."""
+        if self._entries.pop(shipment_id, None) is not None:
+            self._maybe_compact()
+
+    def next_due(self) -> float | None:
+        """Return the earliest due time, or ``None`` if nothing is queued."""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(
+        self,
+        *,
+        now: float | None = None,
+        limit: int | None = None,
+    ) -> list[str]:
+        """Return shipments whose poll is due, removing them from the heap.
+
+        Popped shipments keep their status; call :meth:`schedule` with the
+        polled status to queue them again.
+        """
+        now = self._clock() if now is None else now
+        due: list[str] = []
+        while self._heap and (limit is None or len(due) < limit):
+            when, version, shipment_id = self._heap[0]
+            entry = self._entries.get(shipment_id)
+            if entry is None or entry.version != version:
+                heapq.heappop(self._heap)
+                continue
+            if when > now:
+                break
+            heapq.heappop(self._heap)
+            entry.version += 1
+            entry.queued = False
+            due.append(shipment_id)
+        return due
+
+    async def run(
+        self,
+        poll: PollFunction,
+        *,
+        concurrency: int = 10,
+    ) -> None:
+        """Poll due shipments forever, rescheduling them by their status.
+
+        ``poll`` receives a shipment id and returns the current status
+        (``ShipmentStatus``, its string value, or ``None`` if unknown, in
+        which case the previous status is kept). Exceptions are swallowed
+        and the shipment is retried after its regular interval.
+
+        Up to ``concurrency`` polls run at once; each due shipment is
+        started as soon as a slot frees up, so a slow poll holds only its
+        own slot. Polls use the background request lane unless the caller
+        selected one.
+        """
+        slots = anyio.Semaphore(concurrency)
+        with default_lane(ShipXRequestLane.BACKGROUND):
+            async with anyio.create_task_group() as task_group:
+                while True:
+                    await self._wait_until_due()
+                    await slots.acquire()
+                    due = self.pop_due(limit=1)
+                    if not due:
+                        slots.release()
+                        continue
+                    task_group.start_soon(self._poll_one, poll, due[0], slots)
+
+    async def _wait_until_due(self) -> None:
+        while True:
+            self._changed = anyio.Event()
+            next_due = self.next_due()
+            if next_due is None:
+                await self._changed.wait()
+                continue
+            delay = next_due - self._clock()
+            if delay <= 0:
+                return
+            with anyio.move_on_after(delay):
+                await self._changed.wait()
+
+    async def _poll_one(
+        self,
+        poll: PollFunction,
+        shipment_id: str,
+        slots: anyio.Semaphore,
+    ) -> None:
+        try:
+            result = await poll(shipment_id)
+            # An unknown status is handled like a failed poll: the
+            # shipment keeps its previous status and schedule.
+            status = ShipmentStatus(result) if result else None
+        except Exception:
+            status = None
+        finally:
+            slots.release()
+        entry = self._entries.get(shipment_id)
+        if entry is None:
+            return
+        self.schedule(shipment_id, status or entry.status)
+
+    def _push(self, shipment_id: str, entry: _Entry, due: float) -> None:
+        entry.version += 1
+        entry.due = due
+        entry.queued = True
+        self._entries[shipment_id] = entry
+        heapq.heappush(self._heap, (due, entry.version, shipment_id))
+        self._maybe_compact()
+        if self._changed is not None:
+            self._changed.set()
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            _, version, shipment_id = self._heap[0]
+            entry = self._entries.get(shipment_id)
+            if entry is not None and entry.version == version:
+                return
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self) -> None:
+        # Rescheduling leaves stale heap items behind; rebuild once they
+        # outnumber live entries so memory stays proportional to the
+        # number of tracked shipments.
+        if len(self._heap) <= 2 * len(self._entries) + 64:
+            return
+        self._heap = [
+            (entry.due, entry.version, shipment_id)
+            for shipment_id, entry in self._entries.items()
+            if entry.queued
+        ]
+        heapq.heapify(self._heap)
@@ -0,0 +1,260 @@
+"""Shared ShipX clients for many tenants.
+
+Each merchant (tenant) has its own ``token`` and ``organization_id``.
+:class:`ShipXClientPool` keeps one :class:`ShipXClient` per tenant, so
+connections are reused across calls, and bounds the total number of
+connections: every client gets ``connections_per_tenant`` connections,
+and once ``max_connections`` would be exceeded the least recently used
+idle tenant is closed. When every open client is busy, new tenants wait
+for one to become idle.
+
+Usage::
+
+    async with client_pool.client(token, organization_id) as client:
+        await client.get_shipment(shipment_id=123)
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import anyio
+
+from sendparcel_inpost.client import (
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_TIMEOUT,
+    PRODUCTION_BASE_URL,
+    SANDBOX_BASE_URL,
+    ShipXClient,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_MAX_CONNECTIONS = 200
+DEFAULT_CONNECTIONS_PER_TENANT = 10
+
+TenantKey = tuple[int, str]
+ClientFactory = Callable[..., ShipXClient]
+
+
+@dataclass
+class TenantUsage:
+    """Usage counters of one tenant, kept across evictions."""
+
+    leases: int = 0
+    active: int = 0
+    clients_created: int = 0
+    evictions: int = 0
+    last_used: float = 0.0
+
+
+@dataclass
+class _Entry:
+    client: ShipXClient
+    token: str
+    timeout: float
+    active: int = 0
+    retired: bool = False
+
+
+class ShipXClientPool:
+    """Lazily created, LRU-evicted ``ShipXClient`` per tenant.
+
+    Tenants are identified by ``(organization_id, base_url)``. A lease
+    with a different token or timeout (e.g. a rotated token) replaces the
+    tenant's client; the old one is closed once its leases end.
+
+    Args:
+        max_connections: Global cap on connections across all clients.
+        connections_per_tenant: Connection pool size of each client.
+        idle_timeout: Clients idle this long (seconds) are closed by
+            :meth:`close_idle`; ``None`` keeps them until evicted.
+        lanes: Per-lane concurrency limits of each client (see
+            :mod:`sendparcel_inpost.lanes`); must fit within
+            ``connections_per_tenant``.
+        client_factory: Builds clients; defaults to ``ShipXClient``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = DEFAULT_POOL_MAX_CONNECTIONS,
+        connections_per_tenant: int = DEFAULT_CONNECTIONS_PER_TENANT,
+        idle_timeout: float | None = None,
+        lanes: Mapping[str, int] | None = None,
+        client_factory: ClientFactory = ShipXClient,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if connections_per_tenant <= 0:
+            raise ValueError("connections_per_tenant must be positive")
+        if max_connections < connections_per_tenant:
+            raise ValueError(
+                "max_connections must allow at least one tenant client"
+            )
+        self.max_connections = max_connections
+        self.connections_per_tenant = connections_per_tenant
+        if lanes and sum(lanes.values()) > connections_per_tenant:
+            raise ValueError("Lane limits exceed connections_per_tenant")
+        self.idle_timeout = idle_timeout
+        self.lanes = dict(lanes) if lanes else None
+        self._client_factory = client_factory
+        self._clock = clock
+        self._entries: OrderedDict[TenantKey, _Entry] = OrderedDict()
+        self._retired: list[_Entry] = []
+        self._usage: dict[TenantKey, TenantUsage] = {}
+        self._released: anyio.Event | None = None
+
+    @property
+    def max_clients(self) -> int:
+        """Number of clients that fit under ``max_connections``."""
+        return self.max_connections // self.connections_per_tenant
+
+    @property
+    def open_clients(self) -> int:
+        """Clients currently holding connections (including retired)."""
+        return len(self._entries) + len(self._retired)
+
+    def usage(self) -> dict[TenantKey, TenantUsage]:
+        """Return per-tenant usage counters."""
+        return dict(self._usage)
+
+    @asynccontextmanager
+    async def client(
+        self,
+        token: str,
+        organization_id: int,
+        *,
+        sandbox: bool = False,
+        base_url: str | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> AsyncIterator[ShipXClient]:
+        """Lease the tenant's client, creating it if needed.
+
+        Waits while the connection cap is reached and every open client
+        is leased. The client must not be closed by the caller.
+        """
+        if base_url is None:
+            base_url = SANDBOX_BASE_URL if sandbox else PRODUCTION_BASE_URL
+        key = (organization_id, base_url)
+        entry = await self._acquire(key, token, base_url, timeout)
+        usage = self._usage[key]
+        usage.leases += 1
+        usage.active += 1
+        try:
+            yield entry.client
+        finally:
+            entry.active -= 1
+            usage.active -= 1
+            usage.last_used = self._clock()
+            if entry.retired and entry.active == 0:
+                self._retired.remove(entry)
+                with anyio.CancelScope(shield=True):
+                    await entry.client.close()
+            self._notify_released()
+
+    async def close_idle(self) -> int:
+        """Close clients idle for longer than ``idle_timeout``.
+
+        Returns the number of closed clients.
+        """
+        if self.idle_timeout is None:
+            return 0
+        deadline = self._clock() - self.idle_timeout
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if entry.active == 0 and self._usage[key].last_used <= deadline
+        ]
+        for key in expired:
+            await self._evict(key)
+        return len(expired)
+
+    async def aclose(self) -> None:
+        """Close every client, including leased ones."""
+        entries = [*self._entries.values(), *self._retired]
+        self._entries.clear()
+        self._retired.clear()
+        for entry in entries:
+            entry.retired = False
+            await entry.client.close()
+
+    async def _acquire(
+        self,
+        key: TenantKey,
+        token: str,
+        base_url: str,
+        timeout: float,
+    ) -> _Entry:
+        usage = self._usage.setdefault(key, TenantUsage())
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.token == token and entry.timeout == timeout:
+                    self._entries.move_to_end(key)
+                    entry.active += 1
+                    return entry
+                await self._replace(key, entry)
+                continue
+            if self.open_clients < self.max_clients:
+                break
+            idle = next(
+                (k for k, e in self._entries.items() if e.active == 0),
+                None,
+            )
+            if idle is not None:
+                await self._evict(idle)
+                continue
+            # All waiters share one event, so a release wakes every one of
+            # them to recheck the pool.
+            if self._released is None:
+                self._released = anyio.Event()
+            await self._released.wait()
+
+        keepalive = min(
+            self.connections_per_tenant,
+            DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        )
+        entry = _Entry(
+            client=self._client_factory(
+                token=token,
+                organization_id=key[0],
+                base_url=base_url,
+                timeout=timeout,
+                max_connections=self.connections_per_tenant,
+                max_keepalive_connections=keepalive,
+                **({"lanes": self.lanes} if self.lanes else {}),
+            ),
+            token=token,
+            timeout=timeout,
+            active=1,
+        )
+        self._entries[key] = entry
+        usage.clients_created += 1
+        return entry
+
+    async def _replace(self, key: TenantKey, entry: _Entry) -> None:
+        del self._entries[key]
+        if entry.active:
+            entry.retired = True
+            self._retired.append(entry)
+        else:
+            await entry.client.close()
+
+    async def _evict(self, key: TenantKey) -> None:
+        entry = self._entries.pop(key)
+        self._usage[key].evictions += 1
+        logger.debug("Evicting ShipX client of organization %s", key[0])
+        await entry.client.close()
+        self._notify_released()
+
+    def _notify_released(self) -> None:
+        if self._released is not None:
+            self._released.set()
+            self._released = None
+
+
+client_pool = ShipXClientPool()
+"""Process-wide pool used by providers with ``use_client_pool`` enabled."""
@@ -0,0 +1,96 @@
+"""Shipment price calculation helpers and the shared price cache.
+
+ShipX prices depend on the service, parcel size and weight and a few
+options, not on who the receiver is. :func:`price_cache_key` reduces a
+shipment payload to exactly those inputs, so checkout quotes for
+different baskets with the same parcel share one cached price.
+"""
+
+from collections.abc import Hashable
+from decimal import Decimal
+from typing import Any
+
+from sendparcel_inpost.cache import TTLCache
+from sendparcel_inpost.exceptions import ShipXValidationError
+from sendparcel_inpost.types import ShipXQuote
+
+DEFAULT_PRICE_CACHE_TTL = 15 * 60.0
+DEFAULT_PRICE_CACHE_SIZE = 10_000
+
+PriceKey = tuple[Hashable, ...]
+
+_UNIT_TO_MM = {"mm": 1.0, "cm": 10.0, "m": 1000.0}
+_UNIT_TO_KG = {"kg": 1.0, "g": 0.001}
+
+
+def _amount(value: Any) -> str | None:
+    if isinstance(value, dict):
+        value = value.get("amount")
+    return None if value is None else str(Decimal(str(value)).normalize())
+
+
+def _parcel_key(parcel: dict[str, Any]) -> Hashable:
+    template = parcel.get("template")
+    dimensions = parcel.get("dimensions") or {}
+    weight = parcel.get("weight") or {}
+    sides: tuple[float, ...] = ()
+    if dimensions:
+        factor = _UNIT_TO_MM.get(str(dimensions.get("unit", "mm")), 1.0)
+        # Orientation does not change the price.
+        sides = tuple(
+            sorted(
+                round(float(dimensions.get(name, 0)) * factor, 1)
+                for name in ("length", "width", "height")
+            ),
+        )
+    kg = None
+    if weight:
+        factor = _UNIT_TO_KG.get(str(weight.get("unit", "kg")), 1.0)
+        kg = round(float(weight.get("amount", 0)) * factor, 3)
+    return template, sides, kg
+
+
+def price_cache_key(
+    organization_id: int,
+    payload: dict[str, Any],
+) -> PriceKey:
+    """Return the normalized price-relevant inputs of a payload.
+
+    Covers the organization (contract prices differ), service, parcel
+    templates or dimensions, weights, sending method, COD, insurance
+    and additional services. Receiver and sender details are ignored.
+    """
+    attributes = payload.get("custom_attributes") or {}
+    return (
+        organization_id,
+        payload.get("service"),
+        tuple(_parcel_key(parcel) for parcel in payload.get("parcels", [])),
+        attributes.get("sending_method"),
+        _amount(payload.get("cod")),
+        _amount(payload.get("insurance")),
+        tuple(sorted(payload.get("additional_services") or ())),
+    )
+
+
+def quote_from_price(price: dict[str, Any]) -> ShipXQuote:
+    """Convert a ShipX calculation result into a :class:`ShipXQuote`.
+
+    Raises:
+        ShipXValidationError: ShipX could not price the shipment.
+    """
+    if price.get("error") or price.get("calculated_charge_amount") is None:
+        raise ShipXValidationError(
+            detail=str(price.get("message") or price.get("error") or ""),
+            errors=price.get("details") or [],
+        )
+    return ShipXQuote(
+        amount=Decimal(str(price["calculated_charge_amount"])),
+        currency=str(price.get("currency", "PLN")),
+    )
+
+
+price_cache: TTLCache[PriceKey, dict[str, Any]] = TTLCache(
+    DEFAULT_PRICE_CACHE_TTL,
+    maxsize=DEFAULT_PRICE_CACHE_SIZE,
+)
+"""Process-wide price cache used by the providers' ``quote``."""
@@ -1,6 +1,28 @@
 """InPost sendparcel providers."""
 
-from sendparcel_inpost.providers.courier import InPostCourierProvider
-from sendparcel_inpost.providers.locker import InPostLockerProvider
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sendparcel_inpost.providers.courier import InPostCourierProvider
+    from sendparcel_inpost.providers.locker import InPostLockerProvider
+
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "InPostCourierProvider": "sendparcel_inpost.providers.courier",
+    "InPostLockerProvider": "sendparcel_inpost.providers.locker",
+}
 
 __all__ = ["InPostCourierProvider", "InPostLockerProvider"]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
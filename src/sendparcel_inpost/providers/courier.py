@@ -3,9 +3,11 @@
 import base64
 import ipaddress
 import logging
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
 from typing import Any, ClassVar, cast
 
-from sendparcel.enums import ConfirmationMethod, LabelFormat
+from sendparcel.enums import ConfirmationMethod, LabelFormat, ShipmentStatus
 from sendparcel.exceptions import InvalidCallbackError
 from sendparcel.provider import (
     BaseProvider,
@@ -25,7 +27,12 @@ from sendparcel.types import (
 from sendparcel_inpost.client import ShipXClient
 from sendparcel_inpost.exceptions import ShipXAPIError
 from sendparcel_inpost.status_mapping import map_shipx_status
-from sendparcel_inpost.types import ShipXAddress, ShipXPeer
+from sendparcel_inpost.types import (
+    ShipXAddress,
+    ShipXCancelResult,
+    ShipXPeer,
+    ShipXQuote,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +89,35 @@ class InPostCourierProvider(
             "description": "HTTP request timeout in seconds",
             "default": 30.0,
         },
+        "prefetch_labels": {
+            "type": "bool",
+            "required": False,
+            "secret": False,
+            "description": "Prefetch labels in the background on confirmation",
+            "default": False,
+        },
+        "prefetch_label_format": {
+            "type": "str",
+            "required": False,
+            "secret": False,
+            "description": "Label format to prefetch",
+            "default": "Pdf",
+        },
+        "use_client_pool": {
+            "type": "bool",
+            "required": False,
+            "secret": False,
+            "description": "Share one client per tenant via the client pool",
+            "default": False,
+        },
+        "validate_payloads": {
+            "type": "bool",
+            "required": False,
+            "secret": False,
+            "description": "Validate shipment payloads locally before "
+            "sending them",
+            "default": False,
+        },
     }
 
     def _get_client(self) -> ShipXClient:
@@ -94,6 +130,27 @@ class InPostCourierProvider(
             timeout=self.get_setting("timeout", 30.0),
         )
 
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[ShipXClient]:
+        """Yield a client for one call, pooled if ``use_client_pool``."""
+        if self.get_setting("use_client_pool", False):
+            from sendparcel_inpost.pool import client_pool
+
+            async with client_pool.client(
+                self.get_setting("token", ""),
+                self.get_setting("organization_id", 0),
+                sandbox=self.get_setting("sandbox", False),
+                base_url=self.get_setting("base_url"),
+                timeout=self.get_setting("timeout", 30.0),
+            ) as client:
+                yield client
+            return
+        client = self._get_client()
+        try:
+            yield client
+        finally:
+            await client.close()
+
     def _address_to_peer(self, addr: AddressInfo) -> ShipXPeer:
         """Convert sendparcel AddressInfo to ShipX peer dict."""
         first_name = addr.get("first_name", "")
@@ -148,6 +205,23 @@ class InPostCourierProvider(
 
         return peer
 
+    def _schedule_label_prefetch(self, shipment_id: int) -> None:
+        """Queue a background label download if prefetching is enabled."""
+        if not self.get_setting("prefetch_labels", False):
+            return
+        label_format = self.get_setting("prefetch_label_format", "Pdf")
+
+        async def _fetch() -> bytes:
+            async with self._client() as client:
+                return await client.get_label(
+                    shipment_id=shipment_id,
+                    label_format=label_format,
+                )
+
+        from sendparcel_inpost.labels import label_prefetcher
+
+        label_prefetcher.schedule(shipment_id, label_format, _fetch)
+
     def _parcels_to_shipx(
         self, parcels: list[ParcelInfo]
     ) -> list[dict[str, Any]]:
@@ -178,15 +252,15 @@ class InPostCourierProvider(
 
         return result or [{"weight": {"amount": 1.0, "unit": "kg"}}]
 
-    async def create_shipment(
+    def _build_payload(
         self,
         *,
         sender_address: AddressInfo,
         receiver_address: AddressInfo,
         parcels: list[ParcelInfo],
         **kwargs: Any,
-    ) -> ShipmentCreateResult:
-        """Create an InPost courier shipment."""
+    ) -> dict[str, Any]:
+        """Build the ShipX shipment payload."""
         receiver_peer = self._address_to_peer(receiver_address)
 
         payload: dict[str, Any] = {
@@ -199,30 +273,107 @@ class InPostCourierProvider(
         if sender_peer:
             payload["sender"] = dict(sender_peer)
 
-        client = self._get_client()
-        try:
-            response = await client.create_shipment(payload=payload)
-        finally:
-            await client.close()
+        return payload
+
+    def build_shipment_payload(
+        self,
+        *,
+        sender_address: AddressInfo,
+        receiver_address: AddressInfo,
+        parcels: list[ParcelInfo],
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Build and check the payload ``create_shipment`` would send.
+
+        With the ``validate_payloads`` setting, raises
+        ``ShipXValidationError`` for a payload ShipX would reject.
+        """
+        payload = self._build_payload(
+            sender_address=sender_address,
+            receiver_address=receiver_address,
+            parcels=parcels,
+        )
+
+        if self.get_setting("validate_payloads", False):
+            from sendparcel_inpost.validation import raise_for_invalid_payload
+
+            raise_for_invalid_payload(payload)
+
+        return payload
+
+    async def create_shipment(
+        self,
+        *,
+        sender_address: AddressInfo,
+        receiver_address: AddressInfo,
+        parcels: list[ParcelInfo],
+        **kwargs: Any,
+    ) -> ShipmentCreateResult:
+        """Create an InPost courier shipment.
+
+        Optional kwargs:
+            reference: Idempotency key (e.g. order number) stored on the
+                shipment; makes creates with an unknown outcome safe to
+                retry. ``idempotency_key`` is accepted as an alias.
+        """
+        payload = self.build_shipment_payload(
+            sender_address=sender_address,
+            receiver_address=receiver_address,
+            parcels=parcels,
+        )
+
+        reference = kwargs.get("reference") or kwargs.get("idempotency_key")
+        async with self._client() as client:
+            response = await client.create_shipment(
+                payload=payload,
+                reference=reference,
+            )
 
         return ShipmentCreateResult(
             external_id=str(response["id"]),
             tracking_number=response.get("tracking_number", ""),
         )
 
+    async def quote(
+        self,
+        *,
+        sender_address: AddressInfo,
+        receiver_address: AddressInfo,
+        parcels: list[ParcelInfo],
+        **kwargs: Any,
+    ) -> ShipXQuote:
+        """Price a shipment of these parcels, served from the price cache."""
+        payload = self._build_payload(
+            sender_address=sender_address,
+            receiver_address=receiver_address,
+            parcels=parcels,
+            **kwargs,
+        )
+
+        from sendparcel_inpost.pricing import price_cache, quote_from_price
+
+        async with self._client() as client:
+            [price] = await client.calculate_prices(
+                [payload],
+                cache=price_cache,
+            )
+
+        return quote_from_price(price)
+
     async def create_label(self, **kwargs: Any) -> LabelInfo:
         """Fetch label PDF for the shipment."""
         shipment_id = int(self.shipment.external_id)
         label_format = kwargs.get("label_format", "Pdf")
 
-        client = self._get_client()
-        try:
-            content = await client.get_label(
-                shipment_id=shipment_id,
-                label_format=label_format,
-            )
-        finally:
-            await client.close()
+        from sendparcel_inpost.labels import label_prefetcher
+
+        content = label_prefetcher.store.get(shipment_id, label_format)
+        if content is None:
+            async with self._client() as client:
+                content = await client.get_label(
+                    shipment_id=shipment_id,
+                    label_format=label_format,
+                )
 
         return LabelInfo(
             format=cast(
@@ -261,12 +412,18 @@ class InPostCourierProvider(
         payload = data.get("payload", {})
         shipx_status = payload.get("status", "")
         sendparcel_status = map_shipx_status(shipx_status)
+        shipment_id = payload.get("shipment_id")
+        from sendparcel_inpost.waiters import waiter_registry
+
+        waiter_registry.notify(shipment_id, shipx_status)
+        if sendparcel_status is ShipmentStatus.LABEL_READY and shipment_id:
+            self._schedule_label_prefetch(int(shipment_id))
         if sendparcel_status:
             logger.info(
                 "InPost webhook: %s -> %s (shipment %s)",
                 shipx_status,
                 sendparcel_status,
-                payload.get("shipment_id"),
+                shipment_id,
             )
 
     async def fetch_shipment_status(
@@ -276,30 +433,77 @@ class InPostCourierProvider(
         """Fetch current status from ShipX API."""
         shipment_id = int(self.shipment.external_id)
 
-        client = self._get_client()
-        try:
+        async with self._client() as client:
             response = await client.get_shipment(
                 shipment_id=shipment_id,
             )
-        finally:
-            await client.close()
 
         shipx_status = response.get("status", "")
         sendparcel_status = map_shipx_status(shipx_status)
+        from sendparcel_inpost.waiters import waiter_registry
+
+        waiter_registry.notify(shipment_id, shipx_status)
+        if sendparcel_status is ShipmentStatus.LABEL_READY:
+            self._schedule_label_prefetch(shipment_id)
 
         return ShipmentStatusResponse(
             status=sendparcel_status.value if sendparcel_status else None,
         )
 
+    async def await_status(
+        self,
+        target: ShipmentStatus | str = ShipmentStatus.LABEL_READY,
+        *,
+        timeout: float = 60.0,
+        poll_interval: float | None = None,
+    ) -> ShipmentStatus:
+        """Wait for the shipment to reach ``target`` (webhook-driven)."""
+        shipment_id = int(self.shipment.external_id)
+
+        async with self._client() as client:
+            return await client.await_status(
+                shipment_id,
+                target,
+                timeout,
+                poll_interval=poll_interval,
+            )
+
     async def cancel_shipment(self, **kwargs: Any) -> bool:
         """Cancel shipment via ShipX API."""
         shipment_id = int(self.shipment.external_id)
 
-        client = self._get_client()
-        try:
-            await client.cancel_shipment(shipment_id=shipment_id)
-            return True
-        except ShipXAPIError:
-            return False
-        finally:
-            await client.close()
+        async with self._client() as client:
+            try:
+                await client.cancel_shipment(shipment_id=shipment_id)
+                return True
+            except ShipXAPIError as exc:
+                logger.warning(
+                    "Cancelling shipment %s failed: %s", shipment_id, exc
+                )
+                return False
+
+    async def cancel_shipments(
+        self,
+        external_ids: Iterable[str],
+        *,
+        concurrency: int = 10,
+    ) -> dict[str, ShipXCancelResult]:
+        """Cancel many shipments using this provider's configuration.
+
+        Returns per-id outcomes keyed by external id; see
+        ``ShipXClient.cancel_shipments``. Retry only the ids whose outcome
+        is ``TRANSIENT_ERROR``.
+        """
+        ids = {
+            int(external_id): str(external_id) for external_id in external_ids
+        }
+
+        async with self._client() as client:
+            results = await client.cancel_shipments(
+                ids,
+                concurrency=concurrency,
+            )
+
+        return {
+            ids[shipment_id]: result for shipment_id, result in results.items()
+        }
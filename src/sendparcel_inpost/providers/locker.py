@@ -3,9 +3,11 @@
 import base64
 import ipaddress
 import logging
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
 from typing import Any, ClassVar
 
-from sendparcel.enums import ConfirmationMethod, LabelFormat
+from sendparcel.enums import ConfirmationMethod, LabelFormat, ShipmentStatus
 from sendparcel.exceptions import InvalidCallbackError
 from sendparcel.provider import (
     BaseProvider,
@@ -23,9 +25,14 @@ from sendparcel.types import (
 )
 
 from sendparcel_inpost.client import ShipXClient
-from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.exceptions import ShipXAPIError, ShipXValidationError
 from sendparcel_inpost.status_mapping import map_shipx_status
-from sendparcel_inpost.types import ShipXAddress, ShipXPeer
+from sendparcel_inpost.types import (
+    ShipXAddress,
+    ShipXCancelResult,
+    ShipXPeer,
+    ShipXQuote,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +89,43 @@ class InPostLockerProvider(
             "description": "HTTP request timeout in seconds",
             "default": 30.0,
         },
+        "prefetch_labels": {
+            "type": "bool",
+            "required": False,
+            "secret": False,
+            "description": "Prefetch labels in the background on confirmation",
+            "default": False,
+        },
+        "prefetch_label_format": {
+            "type": "str",
+            "required": False,
+            "secret": False,
+            "description": "Label format to prefetch",
+            "default": "Pdf",
+        },
+        "use_client_pool": {
+            "type": "bool",
+            "required": False,
+            "secret": False,
+            "description": "Share one client per tenant via the client pool",
+            "default": False,
+        },
+        "validate_target_point": {
+            "type": "bool",
+            "required": False,
+            "secret": False,
+            "description": "Check locker target_point against the point "
+            "catalogue before creating shipments",
+            "default": False,
+        },
+        "validate_payloads": {
+            "type": "bool",
+            "required": False,
+            "secret": False,
+            "description": "Validate shipment payloads locally before "
+            "sending them",
+            "default": False,
+        },
     }
 
     def _get_client(self) -> ShipXClient:
@@ -94,6 +138,27 @@ class InPostLockerProvider(
             timeout=self.get_setting("timeout", 30.0),
         )
 
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[ShipXClient]:
+        """Yield a client for one call, pooled if ``use_client_pool``."""
+        if self.get_setting("use_client_pool", False):
+            from sendparcel_inpost.pool import client_pool
+
+            async with client_pool.client(
+                self.get_setting("token", ""),
+                self.get_setting("organization_id", 0),
+                sandbox=self.get_setting("sandbox", False),
+                base_url=self.get_setting("base_url"),
+                timeout=self.get_setting("timeout", 30.0),
+            ) as client:
+                yield client
+            return
+        client = self._get_client()
+        try:
+            yield client
+        finally:
+            await client.close()
+
     def _address_to_peer(self, addr: AddressInfo) -> ShipXPeer:
         """Convert sendparcel AddressInfo to ShipX peer dict."""
         first_name = addr.get("first_name", "")
@@ -148,6 +213,40 @@ class InPostLockerProvider(
 
         return peer
 
+    def _schedule_label_prefetch(self, shipment_id: int) -> None:
+        """Queue a background label download if prefetching is enabled."""
+        if not self.get_setting("prefetch_labels", False):
+            return
+        label_format = self.get_setting("prefetch_label_format", "Pdf")
+
+        async def _fetch() -> bytes:
+            async with self._client() as client:
+                return await client.get_label(
+                    shipment_id=shipment_id,
+                    label_format=label_format,
+                )
+
+        from sendparcel_inpost.labels import label_prefetcher
+
+        label_prefetcher.schedule(shipment_id, label_format, _fetch)
+
+    def _validate_target_point(self, target_point: str, template: str) -> None:
+        """Reject unknown, inactive or unsuitable points before calling ShipX.
+
+        Skipped while the point catalogue has not been loaded.
+        """
+        from sendparcel_inpost.points import point_directory
+
+        if not point_directory:
+            logger.debug("Point catalogue empty, skipping target_point check")
+            return
+        errors = point_directory.target_point_errors(target_point, template)
+        if errors:
+            raise ShipXValidationError(
+                detail=f"Invalid target_point {target_point}",
+                errors=errors,
+            )
+
     def _parcel_template_from_parcels(self, parcels: list[ParcelInfo]) -> str:
         """Determine locker parcel template from parcels.
 
@@ -166,73 +265,164 @@ class InPostLockerProvider(
             return "medium"
         return "small"
 
-    async def create_shipment(
+    def _build_payload(
         self,
         *,
         sender_address: AddressInfo,
         receiver_address: AddressInfo,
         parcels: list[ParcelInfo],
         **kwargs: Any,
-    ) -> ShipmentCreateResult:
-        """Create an InPost locker shipment.
-
-        Required kwargs:
-            target_point: Locker machine ID (e.g. "KRA010")
-
-        Optional kwargs:
-            sending_method: How to dispatch (default "dispatch_order")
-            parcel_template: Override parcel size ("small"/"medium"/"large")
-        """
-        target_point = kwargs.get("target_point")
-        if not target_point:
-            raise ValueError("target_point is required for locker shipments")
-
+    ) -> dict[str, Any]:
+        """Build the ShipX shipment payload (``target_point`` optional)."""
         sending_method = kwargs.get("sending_method", "dispatch_order")
         template = kwargs.get(
             "parcel_template",
             self._parcel_template_from_parcels(parcels),
         )
 
+        custom_attributes: dict[str, Any] = {}
+        target_point = kwargs.get("target_point")
+        if target_point:
+            custom_attributes["target_point"] = target_point
+        custom_attributes["sending_method"] = sending_method
+
         receiver_peer = self._address_to_peer(receiver_address)
 
-        payload = {
+        payload: dict[str, Any] = {
             "receiver": dict(receiver_peer),
             "parcels": [{"template": template}],
             "service": "inpost_locker_standard",
-            "custom_attributes": {
-                "target_point": target_point,
-                "sending_method": sending_method,
-            },
+            "custom_attributes": custom_attributes,
         }
 
         sender_peer = self._address_to_peer(sender_address)
         if sender_peer:
             payload["sender"] = dict(sender_peer)
 
-        client = self._get_client()
-        try:
-            response = await client.create_shipment(payload=payload)
-        finally:
-            await client.close()
+        return payload
+
+    def build_shipment_payload(
+        self,
+        *,
+        sender_address: AddressInfo,
+        receiver_address: AddressInfo,
+        parcels: list[ParcelInfo],
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Build and check the payload ``create_shipment`` would send.
+
+        Takes the same kwargs as ``create_shipment``. Raises
+        ``ValueError`` without a ``target_point`` and, with the
+        ``validate_target_point`` or ``validate_payloads`` settings,
+        ``ShipXValidationError`` for a payload ShipX would reject.
+        """
+        target_point = kwargs.get("target_point")
+        if not target_point:
+            raise ValueError("target_point is required for locker shipments")
+
+        payload = self._build_payload(
+            sender_address=sender_address,
+            receiver_address=receiver_address,
+            parcels=parcels,
+            **kwargs,
+        )
+
+        if self.get_setting("validate_target_point", False):
+            self._validate_target_point(
+                target_point,
+                payload["parcels"][0]["template"],
+            )
+
+        if self.get_setting("validate_payloads", False):
+            from sendparcel_inpost.validation import raise_for_invalid_payload
+
+            raise_for_invalid_payload(payload)
+
+        return payload
+
+    async def create_shipment(
+        self,
+        *,
+        sender_address: AddressInfo,
+        receiver_address: AddressInfo,
+        parcels: list[ParcelInfo],
+        **kwargs: Any,
+    ) -> ShipmentCreateResult:
+        """Create an InPost locker shipment.
+
+        Required kwargs:
+            target_point: Locker machine ID (e.g. "KRA010")
+
+        Optional kwargs:
+            sending_method: How to dispatch (default "dispatch_order")
+            parcel_template: Override parcel size ("small"/"medium"/"large")
+            reference: Idempotency key (e.g. order number) stored on the
+                shipment; makes creates with an unknown outcome safe to
+                retry. ``idempotency_key`` is accepted as an alias.
+        """
+        payload = self.build_shipment_payload(
+            sender_address=sender_address,
+            receiver_address=receiver_address,
+            parcels=parcels,
+            **kwargs,
+        )
+
+        reference = kwargs.get("reference") or kwargs.get("idempotency_key")
+        async with self._client() as client:
+            response = await client.create_shipment(
+                payload=payload,
+                reference=reference,
+            )
 
         return ShipmentCreateResult(
             external_id=str(response["id"]),
             tracking_number=response.get("tracking_number", ""),
         )
 
+    async def quote(
+        self,
+        *,
+        sender_address: AddressInfo,
+        receiver_address: AddressInfo,
+        parcels: list[ParcelInfo],
+        **kwargs: Any,
+    ) -> ShipXQuote:
+        """Price a shipment of these parcels, served from the price cache.
+
+        Accepts the same kwargs as ``create_shipment``; ``target_point``
+        is not needed.
+        """
+        payload = self._build_payload(
+            sender_address=sender_address,
+            receiver_address=receiver_address,
+            parcels=parcels,
+            **kwargs,
+        )
+
+        from sendparcel_inpost.pricing import price_cache, quote_from_price
+
+        async with self._client() as client:
+            [price] = await client.calculate_prices(
+                [payload],
+                cache=price_cache,
+            )
+
+        return quote_from_price(price)
+
     async def create_label(self, **kwargs: Any) -> LabelInfo:
         """Fetch label PDF for the shipment."""
         shipment_id = int(self.shipment.external_id)
         label_format = kwargs.get("label_format", "Pdf")
 
-        client = self._get_client()
-        try:
-            content = await client.get_label(
-                shipment_id=shipment_id,
-                label_format=label_format,
-            )
-        finally:
-            await client.close()
+        from sendparcel_inpost.labels import label_prefetcher
+
+        content = label_prefetcher.store.get(shipment_id, label_format)
+        if content is None:
+            async with self._client() as client:
+                content = await client.get_label(
+                    shipment_id=shipment_id,
+                    label_format=label_format,
+                )
 
         format_value: LabelFormat = (
             LabelFormat.PDF
@@ -278,12 +468,18 @@ class InPostLockerProvider(
         payload = data.get("payload", {})
         shipx_status = payload.get("status", "")
         sendparcel_status = map_shipx_status(shipx_status)
+        shipment_id = payload.get("shipment_id")
+        from sendparcel_inpost.waiters import waiter_registry
+
+        waiter_registry.notify(shipment_id, shipx_status)
+        if sendparcel_status is ShipmentStatus.LABEL_READY and shipment_id:
+            self._schedule_label_prefetch(int(shipment_id))
         if sendparcel_status:
             logger.info(
                 "InPost webhook: %s -> %s (shipment %s)",
                 shipx_status,
                 sendparcel_status,
-                payload.get("shipment_id"),
+                shipment_id,
             )
 
     async def fetch_shipment_status(
@@ -293,28 +489,75 @@ class InPostLockerProvider(
         """Fetch current status from ShipX API."""
         shipment_id = int(self.shipment.external_id)
 
-        client = self._get_client()
-        try:
+        async with self._client() as client:
             response = await client.get_shipment(shipment_id=shipment_id)
-        finally:
-            await client.close()
 
         shipx_status = response.get("status", "")
         sendparcel_status = map_shipx_status(shipx_status)
+        from sendparcel_inpost.waiters import waiter_registry
+
+        waiter_registry.notify(shipment_id, shipx_status)
+        if sendparcel_status is ShipmentStatus.LABEL_READY:
+            self._schedule_label_prefetch(shipment_id)
 
         return ShipmentStatusResponse(
             status=sendparcel_status.value if sendparcel_status else None,
         )
 
+    async def await_status(
+        self,
+        target: ShipmentStatus | str = ShipmentStatus.LABEL_READY,
+        *,
+        timeout: float = 60.0,
+        poll_interval: float | None = None,
+    ) -> ShipmentStatus:
+        """Wait for the shipment to reach ``target`` (webhook-driven)."""
+        shipment_id = int(self.shipment.external_id)
+
+        async with self._client() as client:
+            return await client.await_status(
+                shipment_id,
+                target,
+                timeout,
+                poll_interval=poll_interval,
+            )
+
     async def cancel_shipment(self, **kwargs: Any) -> bool:
         """Cancel shipment via ShipX API."""
         shipment_id = int(self.shipment.external_id)
 
-        client = self._get_client()
-        try:
-            await client.cancel_shipment(shipment_id=shipment_id)
-            return True
-        except ShipXAPIError:
-            return False
-        finally:
-            await client.close()
+        async with self._client() as client:
+            try:
+                await client.cancel_shipment(shipment_id=shipment_id)
+                return True
+            except ShipXAPIError as exc:
+                logger.warning(
+                    "Cancelling shipment %s failed: %s", shipment_id, exc
+                )
+                return False
+
+    async def cancel_shipments(
+        self,
+        external_ids: Iterable[str],
+        *,
+        concurrency: int = 10,
+    ) -> dict[str, ShipXCancelResult]:
+        """Cancel many shipments using this provider's configuration.
+
+        Returns per-id outcomes keyed by external id; see
+        ``ShipXClient.cancel_shipments``. Retry only the ids whose outcome
+        is ``TRANSIENT_ERROR``.
+        """
+        ids = {
+            int(external_id): str(external_id) for external_id in external_ids
+        }
+
+        async with self._client() as client:
+            results = await client.cancel_shipments(
+                ids,
+                concurrency=concurrency,
+            )
+
+        return {
+            ids[shipment_id]: result for shipment_id, result in results.items()
+        }
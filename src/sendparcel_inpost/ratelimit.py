@@ -0,0 +1,237 @@
+"""Client-side rate limiting with shared limiter state.
+
+ShipX limits requests per organization, but webhook handlers and pollers
+often run as many processes. A :class:`RateLimiter` keeps its state in a
+:class:`RateLimitBackend`, so every process using the same backend and
+key draws from one shared budget:
+
+* :class:`MemoryRateLimitBackend` - a single process.
+* :class:`SQLiteRateLimitBackend` - all processes on one host sharing a
+  database file.
+* Anything implementing :class:`RateLimitBackend` (e.g. a Redis script)
+  for processes on several hosts.
+
+The limiter uses GCRA (a token bucket stored as a single "theoretical
+arrival time" per key), so a backend only has to update one number
+atomically. Timestamps are wall-clock (``time.time()``) so that they are
+comparable across processes.
+
+Usage::
+
+    limiter = RateLimiter(
+        SQLiteRateLimitBackend("/var/run/shipx-limits.db"),
+        key=f"shipx:{organization_id}",
+        rate=10.0,
+        burst=20,
+    )
+    client = ShipXClient(token, organization_id, rate_limiter=limiter)
+"""
+
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from email.utils import parsedate_to_datetime
+from typing import Protocol
+
+import anyio
+
+DEFAULT_BURST = 1
+
+
+class RateLimitBackend(Protocol):
+    """Storage of per-key limiter state shared between limiters."""
+
+    async def reserve(
+        self,
+        key: str,
+        interval: float,
+        burst: int,
+    ) -> float:
+        """Reserve one request slot; return the seconds to wait for it.
+
+        ``interval`` is the spacing between requests (``1 / rate``). The
+        reservation must be atomic across all users of the backend.
+        """
+        ...
+
+    async def penalize(self, key: str, until: float) -> None:
+        """Move the key's arrival time to at least ``until``."""
+        ...
+
+
+def _reserve(
+    tat: float | None,
+    now: float,
+    interval: float,
+    burst: int,
+) -> tuple[float, float]:
+    """GCRA step: return the new arrival time and the wait for a slot."""
+    tat = now if tat is None else max(tat, now)
+    wait = max(0.0, tat - now - (burst - 1) * interval)
+    return tat + interval, wait
+
+
+class MemoryRateLimitBackend:
+    """In-process backend; limits are shared only within one process."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._tat: dict[str, float] = {}
+
+    async def reserve(self, key: str, interval: float, burst: int) -> float:
+        self._tat[key], wait = _reserve(
+            self._tat.get(key),
+            self._clock(),
+            interval,
+            burst,
+        )
+        return wait
+
+    async def penalize(self, key: str, until: float) -> None:
+        self._tat[key] = max(self._tat.get(key, 0.0), until)
+
+
+class SQLiteRateLimitBackend:
+    """Backend storing limiter state in a SQLite database file.
+
+    Processes on one host that open the same ``path`` share limits. Every
+    reservation is a short ``BEGIN IMMEDIATE`` transaction run in a worker
+    thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        busy_timeout: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS shipx_rate_limits ("
+            "key TEXT PRIMARY KEY, tat REAL NOT NULL)",
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    async def reserve(self, key: str, interval: float, burst: int) -> float:
+        return await anyio.to_thread.run_sync(
+            self._reserve_sync,
+            key,
+            interval,
+            burst,
+        )
+
+    async def penalize(self, key: str, until: float) -> None:
+        await anyio.to_thread.run_sync(self._penalize_sync, key, until)
+
+    def _reserve_sync(self, key: str, interval: float, burst: int) -> float:
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT tat FROM shipx_rate_limits WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                tat, wait = _reserve(
+                    row[0] if row else None,
+                    self._clock(),
+                    interval,
+                    burst,
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO shipx_rate_limits (key, tat) "
+                    "VALUES (?, ?)",
+                    (key, tat),
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return wait
+
+    def _penalize_sync(self, key: str, until: float) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO shipx_rate_limits (key, tat) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tat = max(tat, excluded.tat)",
+                (key, until),
+            )
+
+
+def parse_retry_after(
+    value: str | None,
+    now: float | None = None,
+) -> float | None:
+    """Parse a ``Retry-After`` header into seconds, or ``None``."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    current = time.time() if now is None else now
+    return max(0.0, moment.timestamp() - current)
+
+
+class RateLimiter:
+    """Limit requests for ``key`` to ``rate`` per second across processes.
+
+    Args:
+        backend: Shared state; limiters with the same backend and key
+            share one budget.
+        key: Budget name, typically one per ShipX organization.
+        rate: Sustained requests per second.
+        burst: Requests allowed back-to-back after an idle period.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        *,
+        key: str,
+        rate: float,
+        burst: int = DEFAULT_BURST,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.backend = backend
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+
+    async def acquire(self) -> float:
+        """Wait for a request slot; returns the time waited in seconds."""
+        wait = await self.backend.reserve(self.key, 1 / self.rate, self.burst)
+        if wait > 0:
+            await anyio.sleep(wait)
+        return wait
+
+    async def penalize(self, seconds: float) -> None:
+        """Stop all users of this budget from sending for ``seconds``."""
+        interval = 1 / self.rate
+        until = self._clock() + seconds + (self.burst - 1) * interval
+        await self.backend.penalize(self.key, until)
@@ -1,5 +1,7 @@
 """ShipX status to sendparcel status mapping."""
 
+from collections.abc import Iterable
+
 from sendparcel.enums import ShipmentStatus
 
 SHIPX_TO_SENDPARCEL_STATUS: dict[str, ShipmentStatus] = {
@@ -44,3 +46,25 @@ def map_shipx_status(shipx_status: str) -> ShipmentStatus | None:
     Returns None if the status is not recognized.
     """
     return SHIPX_TO_SENDPARCEL_STATUS.get(shipx_status)
+
+
+def _reverse_mapping() -> dict[ShipmentStatus, tuple[str, ...]]:
+    reverse: dict[ShipmentStatus, list[str]] = {}
+    for shipx_status, status in SHIPX_TO_SENDPARCEL_STATUS.items():
+        reverse.setdefault(status, []).append(shipx_status)
+    return {status: tuple(names) for status, names in reverse.items()}
+
+
+SENDPARCEL_TO_SHIPX_STATUSES: dict[ShipmentStatus, tuple[str, ...]] = (
+    _reverse_mapping()
+)
+"""ShipX statuses mapping to each sendparcel status (reverse lookup)."""
+
+
+def shipx_statuses_for(statuses: Iterable[ShipmentStatus]) -> list[str]:
+    """Return every ShipX status that maps to one of ``statuses``."""
+    return [
+        shipx_status
+        for status in dict.fromkeys(statuses)
+        for shipx_status in SENDPARCEL_TO_SHIPX_STATUSES.get(status, ())
+    ]
@@ -0,0 +1,154 @@
+"""Incremental processing of ShipX tracking histories.
+
+``get_tracking`` returns the whole history of a parcel on every call.
+:class:`TrackingHistoryProcessor` remembers a small fingerprint of the
+history already seen for each tracking number (event count plus the
+events at the newest timestamp) and turns each new response into only
+the events added since the last one::
+
+    processor = TrackingHistoryProcessor()
+    for number, events in (await processor.poll(client, numbers)).items():
+        for event in events:
+            handle(number, event.status)
+
+Unchanged histories are recognised without sorting or mapping them.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from sendparcel_inpost.status_mapping import map_shipx_status
+from sendparcel_inpost.types import ShipXTrackingEvent
+
+if TYPE_CHECKING:
+    from sendparcel_inpost.client import ShipXClient
+
+DEFAULT_MAX_TRACKED = 100_000
+
+
+# An event is identified by its timestamp and ShipX status.
+_Identity = tuple[str, str]
+
+
+class _Fingerprint(NamedTuple):
+    events: int
+    newest: _Identity
+    # Every event at the newest timestamp, to tell apart new events that
+    # share it.
+    tail: frozenset[_Identity]
+
+
+def _timestamp(detail: dict[str, Any]) -> str:
+    return str(detail.get("datetime") or "")
+
+
+def _identity(detail: dict[str, Any]) -> _Identity:
+    return _timestamp(detail), str(detail.get("status", ""))
+
+
+class TrackingHistoryProcessor:
+    """Diff tracking responses against the history already seen.
+
+    Fingerprints are kept for the ``max_tracked`` most recently seen
+    numbers; a number evicted (or :meth:`forget`-ten) reports its whole
+    history again the next time.
+    """
+
+    def __init__(self, max_tracked: int = DEFAULT_MAX_TRACKED) -> None:
+        self.max_tracked = max_tracked
+        self._seen: OrderedDict[str, _Fingerprint] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def forget(self, tracking_number: str) -> None:
+        """Drop the fingerprint, e.g. once a parcel is delivered."""
+        self._seen.pop(tracking_number, None)
+
+    def diff(
+        self,
+        tracking_number: str,
+        tracking: dict[str, Any],
+    ) -> list[ShipXTrackingEvent]:
+        """Return the events of ``tracking`` not seen before, oldest first."""
+        details: list[dict[str, Any]] = tracking.get("tracking_details") or []
+        seen = self._seen.get(tracking_number)
+        if seen is not None:
+            self._seen.move_to_end(tracking_number)
+            if len(details) == seen.events and (
+                not details
+                or _identity(max(details, key=_identity)) == seen.newest
+            ):
+                return []
+
+        ordered = sorted(details, key=_identity)
+        if seen is None or seen.events == 0:
+            new = ordered
+        elif (
+            len(ordered) > seen.events
+            and _identity(ordered[seen.events - 1]) == seen.newest
+        ):
+            new = ordered[seen.events :]
+        else:
+            # The history was rewritten; keep what is newer than the last
+            # event seen.
+            timestamp = seen.newest[0]
+            new = [
+                detail
+                for detail in ordered
+                if _timestamp(detail) > timestamp
+                or (
+                    _timestamp(detail) == timestamp
+                    and _identity(detail) not in seen.tail
+                )
+            ]
+
+        newest = _identity(ordered[-1]) if ordered else ("", "")
+        self._seen[tracking_number] = _Fingerprint(
+            len(ordered),
+            newest,
+            frozenset(
+                _identity(detail)
+                for detail in ordered
+                if _timestamp(detail) == newest[0]
+            ),
+        )
+        if len(self._seen) > self.max_tracked:
+            self._seen.popitem(last=False)
+        return [
+            ShipXTrackingEvent(
+                _timestamp(detail),
+                str(detail.get("status", "")),
+                map_shipx_status(str(detail.get("status", ""))),
+            )
+            for detail in new
+        ]
+
+    def process(
+        self,
+        trackings: Mapping[str, dict[str, Any] | Exception],
+    ) -> dict[str, list[ShipXTrackingEvent]]:
+        """Diff many responses; only numbers with new events are returned.
+
+        Accepts the output of :meth:`ShipXClient.get_trackings`; failed
+        lookups are skipped and keep their fingerprint.
+        """
+        changes: dict[str, list[ShipXTrackingEvent]] = {}
+        for tracking_number, tracking in trackings.items():
+            if isinstance(tracking, Exception):
+                continue
+            events = self.diff(tracking_number, tracking)
+            if events:
+                changes[tracking_number] = events
+        return changes
+
+    async def poll(
+        self,
+        client: "ShipXClient",
+        tracking_numbers: Iterable[str],
+        **kwargs: Any,
+    ) -> dict[str, list[ShipXTrackingEvent]]:
+        """Fetch tracking for many numbers and return only new events."""
+        trackings = await client.get_trackings(tracking_numbers, **kwargs)
+        return self.process(trackings)
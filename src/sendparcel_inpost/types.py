@@ -1,6 +1,11 @@
 """ShipX-specific type definitions."""
 
-from typing import TypedDict
+from decimal import Decimal
+from typing import NamedTuple, TypedDict
+
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.enums import ShipXCancelOutcome
 
 
 class ShipXAddress(TypedDict, total=False):
@@ -70,3 +75,48 @@ class ShipXShipmentPayload(TypedDict, total=False):
     insurance: dict[str, object]
     cod: dict[str, object]
     additional_services: list[str]
+
+
+class ShipXDispatchPickup(TypedDict, total=False):
+    """Pickup location and contact for a ShipX dispatch order."""
+
+    address: ShipXAddress
+    name: str
+    phone: str
+    email: str
+    comment: str
+
+
+class ShipXDispatchOrderPayload(ShipXDispatchPickup, total=False):
+    """Payload for ShipX create dispatch order endpoint."""
+
+    shipments: list[int]
+
+
+class ShipXQuote(TypedDict):
+    """Price of a prospective shipment."""
+
+    amount: Decimal
+    currency: str
+
+
+class ShipXCancelResult(NamedTuple):
+    """Per-shipment result of a bulk cancellation."""
+
+    outcome: ShipXCancelOutcome
+    error: Exception | None = None
+
+
+class ShipXSyncResult(NamedTuple):
+    """Result of an incremental shipment sync."""
+
+    cursor: str | None
+    changes: dict[int, ShipmentStatus]
+
+
+class ShipXTrackingEvent(NamedTuple):
+    """One tracking history entry not seen before."""
+
+    timestamp: str
+    shipx_status: str
+    status: ShipmentStatus | None
@@ -0,0 +1,335 @@
+"""Local pre-flight validation of ShipX shipment payloads.
+
+ShipX answers malformed create-shipment requests with a 422 after a full
+round trip. :class:`PayloadValidator` runs the common checks locally and
+reports every problem at once, in the ``{"field", "message"}`` format of
+:attr:`ShipXValidationError.errors`::
+
+    errors = validate_shipment_payload(payload)
+    if errors:
+        ...
+
+The rules cover only what is cheap to check offline; ShipX remains the
+authority and may still reject a payload that passes.
+"""
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sendparcel_inpost.enums import ShipXParcelTemplate, ShipXService
+from sendparcel_inpost.exceptions import ShipXValidationError
+
+ValidationErrors = list[dict[str, str]]
+_Rule = Callable[[dict[str, Any], ValidationErrors], None]
+
+_PL_POST_CODE = re.compile(r"\d{2}-\d{3}")
+_PHONE = re.compile(r"(?:\+?48)?\d{9}")
+_PHONE_SEPARATORS = re.compile(r"[\s\-()]")
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+_ADDRESS_FIELDS = ("street", "building_number", "city", "post_code")
+
+
+@dataclass(frozen=True)
+class LockerSize:
+    """Maximum parcel size of a locker template (millimetres)."""
+
+    height: float
+    width: float
+    length: float
+
+
+# Locker compartments A/B/C; weight is limited to 25 kg for every size.
+LOCKER_SIZES: dict[str, LockerSize] = {
+    ShipXParcelTemplate.SMALL: LockerSize(80, 380, 640),
+    ShipXParcelTemplate.MEDIUM: LockerSize(190, 380, 640),
+    ShipXParcelTemplate.LARGE: LockerSize(410, 380, 640),
+}
+LOCKER_MAX_WEIGHT_KG = 25.0
+COURIER_MAX_WEIGHT_KG = 50.0
+COURIER_MAX_SIDE_MM = 3500.0
+
+_UNIT_TO_MM = {"mm": 1.0, "cm": 10.0, "m": 1000.0}
+_UNIT_TO_KG = {"kg": 1.0, "g": 0.001}
+
+
+def _error(errors: ValidationErrors, field: str, message: str) -> None:
+    errors.append({"field": field, "message": message})
+
+
+def _check_peer(
+    peer: Any,
+    prefix: str,
+    errors: ValidationErrors,
+    *,
+    contact_required: bool,
+    address_required: bool,
+) -> None:
+    if not isinstance(peer, dict):
+        _error(errors, prefix, "is required")
+        return
+    phone = peer.get("phone")
+    if phone:
+        if not _PHONE.fullmatch(_PHONE_SEPARATORS.sub("", str(phone))):
+            _error(errors, f"{prefix}.phone", "is not a valid phone number")
+    elif contact_required:
+        _error(errors, f"{prefix}.phone", "is required")
+    email = peer.get("email")
+    if email:
+        if not _EMAIL.fullmatch(str(email)):
+            _error(errors, f"{prefix}.email", "is not a valid email")
+    elif contact_required:
+        _error(errors, f"{prefix}.email", "is required")
+    if address_required and not (
+        peer.get("company_name")
+        or (peer.get("first_name") and peer.get("last_name"))
+    ):
+        _error(
+            errors,
+            f"{prefix}.name",
+            "first_name and last_name or company_name is required",
+        )
+
+    address = peer.get("address")
+    if not address:
+        if address_required:
+            _error(errors, f"{prefix}.address", "is required")
+        return
+    if address_required:
+        for name in _ADDRESS_FIELDS:
+            if not address.get(name):
+                _error(errors, f"{prefix}.address.{name}", "is required")
+    post_code = address.get("post_code")
+    country = str(address.get("country_code") or "PL").upper()
+    if (
+        post_code
+        and country == "PL"
+        and not _PL_POST_CODE.fullmatch(str(post_code))
+    ):
+        _error(
+            errors,
+            f"{prefix}.address.post_code",
+            "must have the format NN-NNN",
+        )
+
+
+def _dimensions_mm(dimensions: dict[str, Any]) -> list[float] | None:
+    factor = _UNIT_TO_MM.get(str(dimensions.get("unit", "mm")))
+    try:
+        sides = [
+            float(dimensions[name]) for name in ("height", "width", "length")
+        ]
+    except (KeyError, TypeError, ValueError):
+        return None
+    if factor is None:
+        return None
+    return [side * factor for side in sides]
+
+
+def _weight_kg(weight: dict[str, Any]) -> float | None:
+    factor = _UNIT_TO_KG.get(str(weight.get("unit", "kg")))
+    try:
+        amount = float(weight["amount"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return None if factor is None else amount * factor
+
+
+def _fits(sides: list[float], size: LockerSize) -> bool:
+    # Parcels can be rotated, so compare sorted sides.
+    limits = sorted((size.height, size.width, size.length))
+    return all(
+        side <= limit for side, limit in zip(sorted(sides), limits, strict=True)
+    )
+
+
+class PayloadValidator:
+    """Validate create-shipment payloads before they are sent.
+
+    Rules are selected per service once, at construction time; calling
+    :meth:`validate` only runs the relevant checks.
+    """
+
+    def __init__(
+        self,
+        *,
+        locker_sizes: dict[str, LockerSize] | None = None,
+        locker_max_weight_kg: float = LOCKER_MAX_WEIGHT_KG,
+        courier_max_weight_kg: float = COURIER_MAX_WEIGHT_KG,
+        courier_max_side_mm: float = COURIER_MAX_SIDE_MM,
+    ) -> None:
+        self.locker_sizes = locker_sizes or LOCKER_SIZES
+        self.locker_max_weight_kg = locker_max_weight_kg
+        self.courier_max_weight_kg = courier_max_weight_kg
+        self.courier_max_side_mm = courier_max_side_mm
+        self._rules: dict[str, tuple[_Rule, ...]] = {
+            ShipXService.INPOST_LOCKER_STANDARD: (
+                self._check_locker_receiver,
+                self._check_sender,
+                self._check_target_point,
+                self._check_locker_parcels,
+            ),
+            ShipXService.INPOST_COURIER_STANDARD: (
+                self._check_courier_receiver,
+                self._check_sender,
+                self._check_courier_parcels,
+            ),
+        }
+
+    def validate(self, payload: dict[str, Any]) -> ValidationErrors:
+        """Return every problem found; an empty list means valid."""
+        errors: ValidationErrors = []
+        rules = self._rules.get(str(payload.get("service", "")))
+        if rules is None:
+            _error(errors, "service", "is not a supported service")
+            return errors
+        for rule in rules:
+            rule(payload, errors)
+        return errors
+
+    def _check_locker_receiver(
+        self,
+        payload: dict[str, Any],
+        errors: ValidationErrors,
+    ) -> None:
+        _check_peer(
+            payload.get("receiver"),
+            "receiver",
+            errors,
+            contact_required=True,
+            address_required=False,
+        )
+
+    def _check_courier_receiver(
+        self,
+        payload: dict[str, Any],
+        errors: ValidationErrors,
+    ) -> None:
+        _check_peer(
+            payload.get("receiver"),
+            "receiver",
+            errors,
+            contact_required=True,
+            address_required=True,
+        )
+
+    def _check_sender(
+        self,
+        payload: dict[str, Any],
+        errors: ValidationErrors,
+    ) -> None:
+        # The organization's default sender is used when omitted.
+        if "sender" in payload:
+            _check_peer(
+                payload["sender"],
+                "sender",
+                errors,
+                contact_required=False,
+                address_required=False,
+            )
+
+    def _check_target_point(
+        self,
+        payload: dict[str, Any],
+        errors: ValidationErrors,
+    ) -> None:
+        attributes = payload.get("custom_attributes") or {}
+        if not attributes.get("target_point"):
+            _error(errors, "custom_attributes.target_point", "is required")
+
+    def _check_locker_parcels(
+        self,
+        payload: dict[str, Any],
+        errors: ValidationErrors,
+    ) -> None:
+        parcels = payload.get("parcels") or []
+        if not parcels:
+            _error(errors, "parcels", "is required")
+        for index, parcel in enumerate(parcels):
+            prefix = f"parcels[{index}]"
+            template = parcel.get("template")
+            size = self.locker_sizes.get(str(template))
+            if size is None:
+                _error(
+                    errors,
+                    f"{prefix}.template",
+                    "must be one of " + ", ".join(self.locker_sizes),
+                )
+            dimensions = parcel.get("dimensions")
+            if size is not None and dimensions:
+                sides = _dimensions_mm(dimensions)
+                if sides is None:
+                    _error(errors, f"{prefix}.dimensions", "is invalid")
+                elif not _fits(sides, size):
+                    _error(
+                        errors,
+                        f"{prefix}.dimensions",
+                        f"do not fit the {template} template",
+                    )
+            weight = parcel.get("weight")
+            if weight:
+                kg = _weight_kg(weight)
+                if kg is None:
+                    _error(errors, f"{prefix}.weight", "is invalid")
+                elif kg > self.locker_max_weight_kg:
+                    _error(
+                        errors,
+                        f"{prefix}.weight",
+                        f"exceeds {self.locker_max_weight_kg:g} kg",
+                    )
+
+    def _check_courier_parcels(
+        self,
+        payload: dict[str, Any],
+        errors: ValidationErrors,
+    ) -> None:
+        parcels = payload.get("parcels") or []
+        if not parcels:
+            _error(errors, "parcels", "is required")
+        for index, parcel in enumerate(parcels):
+            prefix = f"parcels[{index}]"
+            dimensions = parcel.get("dimensions")
+            if not dimensions:
+                _error(errors, f"{prefix}.dimensions", "is required")
+            else:
+                sides = _dimensions_mm(dimensions)
+                if sides is None or min(sides) <= 0:
+                    _error(errors, f"{prefix}.dimensions", "is invalid")
+                elif max(sides) > self.courier_max_side_mm:
+                    _error(
+                        errors,
+                        f"{prefix}.dimensions",
+                        f"longest side exceeds {self.courier_max_side_mm:g} mm",
+                    )
+            weight = parcel.get("weight")
+            kg = _weight_kg(weight) if weight else None
+            if not weight:
+                _error(errors, f"{prefix}.weight", "is required")
+            elif kg is None or kg <= 0:
+                _error(errors, f"{prefix}.weight", "is invalid")
+            elif kg > self.courier_max_weight_kg:
+                _error(
+                    errors,
+                    f"{prefix}.weight",
+                    f"exceeds {self.courier_max_weight_kg:g} kg",
+                )
+
+
+default_validator = PayloadValidator()
+
+
+def validate_shipment_payload(payload: dict[str, Any]) -> ValidationErrors:
+    """Validate a payload with the default rules."""
+    return default_validator.validate(payload)
+
+
+def raise_for_invalid_payload(payload: dict[str, Any]) -> None:
+    """Raise :class:`ShipXValidationError` if the payload is invalid."""
+    errors = validate_shipment_payload(payload)
+    if errors:
+        raise ShipXValidationError(
+            detail="Payload failed local validation",
+            errors=errors,
+        )
@@ -0,0 +1,199 @@
+"""In-process registry of coroutines waiting for a shipment status.
+
+ShipX prepares shipments asynchronously (``created`` -> ``confirmed``).
+Instead of busy-polling ``get_shipment``, callers wait on
+:data:`waiter_registry`; the providers' ``handle_callback`` feeds webhook
+statuses into it, and an optional low-frequency poll covers missed
+webhooks.
+
+Usage::
+
+    status = await client.await_status(
+        shipment_id,
+        ShipmentStatus.LABEL_READY,
+        timeout=60.0,
+    )
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+from typing import cast
+
+import anyio
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.cache import TTLCache
+from sendparcel_inpost.status_mapping import map_shipx_status
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 30.0
+DEFAULT_RECENT_TTL = 300.0
+
+# Forward lifecycle order; waiting for a status is also satisfied by any
+# later status in this chain (e.g. a shipment already in transit is past
+# LABEL_READY).
+_PROGRESSION: tuple[ShipmentStatus, ...] = (
+    ShipmentStatus.NEW,
+    ShipmentStatus.CREATED,
+    ShipmentStatus.LABEL_READY,
+    ShipmentStatus.IN_TRANSIT,
+    ShipmentStatus.OUT_FOR_DELIVERY,
+    ShipmentStatus.DELIVERED,
+)
+
+TERMINAL_STATUSES = frozenset(
+    {
+        ShipmentStatus.DELIVERED,
+        ShipmentStatus.CANCELLED,
+        ShipmentStatus.FAILED,
+        ShipmentStatus.RETURNED,
+    },
+)
+
+StatusPoll = Callable[[], Awaitable[str]]
+
+
+def _coerce_status(status: ShipmentStatus | str) -> ShipmentStatus:
+    if isinstance(status, ShipmentStatus):
+        return status
+    mapped = map_shipx_status(status)
+    return mapped if mapped is not None else ShipmentStatus(status)
+
+
+def status_satisfies(
+    status: ShipmentStatus,
+    target: ShipmentStatus,
+) -> bool:
+    """Return whether ``status`` ends a wait for ``target``.
+
+    A wait ends when the target is reached, passed in the forward
+    lifecycle, or the shipment reached a terminal status.
+    """
+    if status == target or status in TERMINAL_STATUSES:
+        return True
+    if status in _PROGRESSION and target in _PROGRESSION:
+        return _PROGRESSION.index(status) >= _PROGRESSION.index(target)
+    return False
+
+
+class _Waiter:
+    __slots__ = ("event", "result", "target")
+
+    def __init__(self, target: ShipmentStatus) -> None:
+        self.target = target
+        self.event = anyio.Event()
+        self.result: ShipmentStatus | None = None
+
+
+class StatusWaiterRegistry:
+    """Resolve status waiters from webhook or polled ShipX statuses.
+
+    Statuses are remembered for ``recent_ttl`` seconds, so a webhook that
+    arrives just before somebody starts waiting is not lost.
+    """
+
+    def __init__(self, *, recent_ttl: float = DEFAULT_RECENT_TTL) -> None:
+        self._waiters: dict[str, list[_Waiter]] = {}
+        self._recent: TTLCache[str, ShipmentStatus] = TTLCache(recent_ttl)
+
+    def waiting(self, shipment_id: int | str) -> int:
+        """Return the number of waiters registered for a shipment."""
+        return len(self._waiters.get(str(shipment_id), ()))
+
+    def notify(
+        self,
+        shipment_id: int | str | None,
+        shipx_status: str,
+    ) -> int:
+        """Record a ShipX status and wake satisfied waiters.
+
+        Returns the number of resolved waiters. Unknown statuses and
+        missing shipment ids are ignored.
+        """
+        if shipment_id is None:
+            return 0
+        status = map_shipx_status(shipx_status)
+        if status is None:
+            return 0
+        key = str(shipment_id)
+        self._recent.set(key, status)
+        resolved = 0
+        for waiter in self._waiters.get(key, ()):
+            if not waiter.event.is_set() and status_satisfies(
+                status,
+                waiter.target,
+            ):
+                waiter.result = status
+                waiter.event.set()
+                resolved += 1
+        return resolved
+
+    async def wait(
+        self,
+        shipment_id: int | str,
+        target: ShipmentStatus | str,
+        *,
+        timeout: float,
+        poll: StatusPoll | None = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> ShipmentStatus:
+        """Wait until the shipment reaches ``target`` (or a later status).
+
+        ``target`` is a sendparcel status or a ShipX status string. If
+        ``poll`` is given it is called right away and then every
+        ``poll_interval`` seconds as a fallback for missed webhooks; it
+        must return the current ShipX status. Poll errors are logged and
+        retried on the next interval. Returns the status that ended
+        the wait, which may be a terminal one such as ``CANCELLED``.
+
+        Raises:
+            TimeoutError: The status was not reached within ``timeout``.
+        """
+        key = str(shipment_id)
+        target_status = _coerce_status(target)
+        recent = self._recent.get(key)
+        if recent is not None and status_satisfies(recent, target_status):
+            return recent
+
+        waiter = _Waiter(target_status)
+        self._waiters.setdefault(key, []).append(waiter)
+        try:
+            with anyio.fail_after(timeout):
+                if poll is None:
+                    await waiter.event.wait()
+                else:
+                    async with anyio.create_task_group() as task_group:
+                        task_group.start_soon(
+                            self._poll_loop,
+                            key,
+                            poll,
+                            poll_interval,
+                        )
+                        await waiter.event.wait()
+                        task_group.cancel_scope.cancel()
+        finally:
+            waiters = self._waiters[key]
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[key]
+        return cast(ShipmentStatus, waiter.result)
+
+    async def _poll_loop(
+        self,
+        key: str,
+        poll: StatusPoll,
+        poll_interval: float,
+    ) -> None:
+        while True:
+            try:
+                self.notify(key, await poll())
+            except Exception as exc:
+                logger.warning(
+                    "Status poll for shipment %s failed: %s", key, exc
+                )
+            await anyio.sleep(poll_interval)
+
+
+waiter_registry = StatusWaiterRegistry()
+"""Process-wide registry shared by ``ShipXClient`` and the providers."""
@@ -7,6 +7,22 @@ from sendparcel_inpost.client import ShipXClient
 SANDBOX_BASE_URL = "https://sandbox-api-shipx-pl.easypack24.net"
 
 
+class FakeClock:
+    """Manually advanced time source for ``clock=`` parameters."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """A fake clock starting at 1000.0; advance it with ``clock.now +=``."""
+    return FakeClock()
+
+
 @pytest.fixture
 def shipx_client() -> ShipXClient:
     """ShipXClient pointed at sandbox with a fake token."""
@@ -0,0 +1,201 @@
+"""Tests for the adaptive concurrency limiter."""
+
+import anyio
+import httpx
+import pytest
+import respx
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.adaptive import AdaptiveConcurrencyLimiter
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.lanes import request_lane
+from sendparcel_inpost.polling import PollScheduler
+from tests.conftest import FakeClock
+
+
+class TestLimit:
+    def test_rejects_invalid_bounds(self) -> None:
+        with pytest.raises(ValueError, match="min_limit"):
+            AdaptiveConcurrencyLimiter(initial=5, max_limit=4)
+        with pytest.raises(ValueError, match="decrease"):
+            AdaptiveConcurrencyLimiter(decrease=1.0)
+
+    def test_increases_by_one_per_round_trip(self, clock: FakeClock) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=4, clock=clock)
+        for _ in range(4):
+            limiter.record(clock.now, 0.1, 200)
+        assert limiter.limit == 4
+        limiter.record(clock.now, 0.1, 200)
+        assert limiter.limit == 5
+        assert limiter.stats().increases == 1
+
+    def test_overload_halves_once_per_round_trip(
+        self,
+        clock: FakeClock,
+    ) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=16, clock=clock)
+        sent = clock.now
+        clock.now += 1.0
+        limiter.record(sent, 1.0, 429)
+        limiter.record(sent, 1.0, 503)
+        assert limiter.limit == 8
+        limiter.record(clock.now, 0.1, 500)
+        assert limiter.limit == 4
+        assert limiter.stats().decreases == 2
+
+    def test_client_errors_are_not_overload(self, clock: FakeClock) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=4, clock=clock)
+        limiter.record(clock.now, 0.1, 404)
+        assert limiter.limit == 4
+
+    def test_rising_latency_is_overload(self, clock: FakeClock) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=10, clock=clock)
+        limiter.record(clock.now, 0.1, 200, key="get_shipment")
+        limiter.record(clock.now, 0.5, 200, key="get_shipment")
+        assert limiter.limit == 5
+
+    def test_baseline_is_per_operation(self, clock: FakeClock) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=10, clock=clock)
+        limiter.record(clock.now, 0.1, 200, key="get_shipment")
+        limiter.record(clock.now, 2.0, 200, key="get_label")
+        assert limiter.limit == 10
+        assert set(limiter.baseline_latency) == {"get_shipment", "get_label"}
+
+    def test_remaining_quota_caps_limit(self, clock: FakeClock) -> None:
+        changes: list[int] = []
+        limiter = AdaptiveConcurrencyLimiter(
+            initial=10,
+            clock=clock,
+            on_change=changes.append,
+        )
+        limiter.record(clock.now, 0.1, 200, {"x-ratelimit-remaining": "3"})
+        assert limiter.limit == 3
+        assert limiter.stats().remaining == 3
+        assert changes == [3]
+
+    def test_never_below_min_limit(self, clock: FakeClock) -> None:
+        limiter = AdaptiveConcurrencyLimiter(
+            initial=2,
+            min_limit=2,
+            clock=clock,
+        )
+        limiter.record(clock.now, 0.1, 503)
+        assert limiter.limit == 2
+
+
+class TestRun:
+    async def test_limits_requests_in_flight(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=1)
+        release = anyio.Event()
+
+        async def call() -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200)
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(limiter.run, call)
+            task_group.start_soon(limiter.run, call)
+            await anyio.wait_all_tasks_blocked()
+            stats = limiter.stats()
+            assert (stats.in_flight, stats.waiting) == (1, 1)
+            release.set()
+
+    async def test_timeout_is_overload(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=8)
+
+        async def call() -> httpx.Response:
+            raise httpx.ReadTimeout("slow")
+
+        with pytest.raises(httpx.ReadTimeout):
+            await limiter.run(call)
+        assert limiter.limit == 4
+
+
+class TestClientIntegration:
+    async def test_overload_lowers_client_limit(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=8)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            concurrency_limiter=limiter,
+        )
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/shipments/1").respond(503)
+            with pytest.raises(ShipXAPIError):
+                await client.get_shipment(1)
+        await client.close()
+
+        assert limiter.limit == 4
+
+    async def test_interactive_lane_bypasses_limit(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=1)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            lanes={"interactive": 1, "bulk": 1},
+            concurrency_limiter=limiter,
+        )
+        release = anyio.Event()
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200, json={"id": 1})
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/shipments/1").mock(side_effect=slow)
+            mock.get("/v1/shipments/2").respond(json={"id": 2})
+            async with anyio.create_task_group() as task_group:
+                with request_lane("bulk"):
+                    task_group.start_soon(client.get_shipment, 1)
+                await anyio.wait_all_tasks_blocked()
+                assert limiter.stats().in_flight == 1
+
+                with anyio.fail_after(1):
+                    assert await client.get_shipment(2) == {"id": 2}
+                release.set()
+        await client.close()
+
+    @pytest.mark.parametrize(
+        "lanes",
+        [
+            {"interactive": 1, "background": 2},
+            {"interactive": 2, "bulk": 1},
+        ],
+    )
+    async def test_poll_sweep_is_limited(self, lanes: dict[str, int]) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial=1)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            lanes=lanes,
+            concurrency_limiter=limiter,
+        )
+        scheduler = PollScheduler(jitter=0.0)
+        release = anyio.Event()
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200, json={"status": "delivered"})
+
+        async def poll(shipment_id: str) -> str:
+            shipment = await client.get_shipment(int(shipment_id))
+            return str(shipment["status"])
+
+        for shipment_id in ("1", "2"):
+            scheduler.schedule(shipment_id, ShipmentStatus.CREATED, now=0.0)
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get(url__regex=r"/v1/shipments/[12]$").mock(side_effect=slow)
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(
+                    lambda: scheduler.run(poll, concurrency=2),
+                )
+                await anyio.wait_all_tasks_blocked()
+                stats = limiter.stats()
+                assert (stats.in_flight, stats.waiting) == (1, 1)
+                release.set()
+                task_group.cancel_scope.cancel()
+        await client.close()
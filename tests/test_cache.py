@@ -0,0 +1,41 @@
+"""Tests for in-process caches."""
+
+import pytest
+
+from sendparcel_inpost.cache import TTLCache
+from tests.conftest import FakeClock
+
+
+class TestTTLCache:
+    def test_get_and_expire(self, clock: FakeClock) -> None:
+        cache: TTLCache[str, int] = TTLCache(10.0, clock=clock)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert "a" in cache
+        clock.now += 10.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(10.0, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_invalidate(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(10.0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.invalidate("a")
+        assert "a" not in cache
+        cache.invalidate()
+        assert len(cache) == 0
+
+    def test_rejects_non_positive_ttl(self) -> None:
+        with pytest.raises(ValueError, match="ttl"):
+            TTLCache(0)
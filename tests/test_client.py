@@ -1,15 +1,19 @@
 """Tests for ShipXClient."""
 
+import anyio
 import httpx
 import pytest
 import respx
+from sendparcel.enums import ShipmentStatus
 
 from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.enums import ShipXCancelOutcome
 from sendparcel_inpost.exceptions import (
     ShipXAPIError,
     ShipXAuthenticationError,
     ShipXValidationError,
 )
+from sendparcel_inpost.ratelimit import MemoryRateLimitBackend, RateLimiter
 
 SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
 PROD_URL = "https://api-shipx-pl.easypack24.net"
@@ -132,6 +136,158 @@ class TestCreateShipment:
         assert exc_info.value.status_code == 500
 
 
+class TestIdempotentCreate:
+    URL = f"{SANDBOX_URL}/v1/organizations/12345/shipments"
+
+    @respx.mock
+    async def test_unknown_outcome_finds_existing_shipment(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        create = respx.post(self.URL).mock(
+            side_effect=httpx.ReadTimeout("timed out"),
+        )
+        lookup = respx.get(self.URL).respond(
+            json={"items": [{"id": 7, "reference": "ORDER-1"}]},
+        )
+
+        result = await shipx_client.create_shipment(
+            {"service": "inpost_courier_standard"},
+            reference="ORDER-1",
+            retry_delay=0,
+        )
+
+        assert result == {"id": 7, "reference": "ORDER-1"}
+        assert create.call_count == 1
+        sent = create.calls.last.request.read()
+        assert b'"reference":"ORDER-1"' in sent.replace(b" ", b"")
+        assert lookup.calls.last.request.url.params["reference"] == "ORDER-1"
+
+    @respx.mock
+    async def test_retries_when_shipment_was_not_created(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        create = respx.post(self.URL).mock(
+            side_effect=[
+                httpx.Response(503, json={"message": "Unavailable"}),
+                httpx.Response(201, json={"id": 8}),
+            ],
+        )
+        respx.get(self.URL).respond(json={"items": []})
+
+        result = await shipx_client.create_shipment(
+            {},
+            reference="ORDER-2",
+            retry_delay=0,
+        )
+
+        assert result == {"id": 8}
+        assert create.call_count == 2
+
+    @respx.mock
+    async def test_failed_lookup_is_retried(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        create = respx.post(self.URL).mock(
+            side_effect=httpx.ReadTimeout("timed out"),
+        )
+        lookup = respx.get(self.URL).mock(
+            side_effect=[
+                httpx.Response(503, json={"message": "Unavailable"}),
+                httpx.Response(
+                    200,
+                    json={"items": [{"id": 7, "reference": "ORDER-5"}]},
+                ),
+            ],
+        )
+
+        result = await shipx_client.create_shipment(
+            {},
+            reference="ORDER-5",
+            retry_delay=0,
+        )
+
+        assert result == {"id": 7, "reference": "ORDER-5"}
+        assert (create.call_count, lookup.call_count) == (1, 2)
+
+    @respx.mock
+    async def test_lookup_requires_exact_reference(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        first_page = [{"id": i, "reference": f"ORDER-6{i}"} for i in range(100)]
+        lookup = respx.get(self.URL).mock(
+            side_effect=[
+                httpx.Response(200, json={"items": first_page}),
+                httpx.Response(
+                    200,
+                    json={"items": [{"id": 200, "reference": "ORDER-6"}]},
+                ),
+            ],
+        )
+
+        result = await shipx_client.find_shipment_by_reference("ORDER-6")
+
+        assert result == {"id": 200, "reference": "ORDER-6"}
+        assert lookup.calls.last.request.url.params["page"] == "2"
+
+    @respx.mock
+    async def test_lookup_without_exact_match(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.get(self.URL).respond(
+            json={"items": [{"id": 1, "reference": "ORDER-70"}]},
+        )
+        assert await shipx_client.find_shipment_by_reference("ORDER-7") is None
+
+    @respx.mock
+    async def test_gives_up_after_attempts(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        create = respx.post(self.URL).mock(
+            side_effect=httpx.ConnectError("refused"),
+        )
+        respx.get(self.URL).respond(json={"items": []})
+
+        with pytest.raises(httpx.ConnectError):
+            await shipx_client.create_shipment(
+                {},
+                reference="ORDER-3",
+                attempts=2,
+                retry_delay=0,
+            )
+        assert create.call_count == 2
+
+    @respx.mock
+    async def test_definite_errors_are_not_retried(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        create = respx.post(self.URL).respond(
+            status_code=422,
+            json={"message": "Validation failed"},
+        )
+
+        with pytest.raises(ShipXValidationError):
+            await shipx_client.create_shipment({}, reference="ORDER-4")
+        assert create.call_count == 1
+
+    @respx.mock
+    async def test_without_reference_nothing_is_retried(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        create = respx.post(self.URL).respond(status_code=503, json={})
+
+        with pytest.raises(ShipXAPIError):
+            await shipx_client.create_shipment({})
+        assert create.call_count == 1
+
+
 class TestGetShipment:
     @respx.mock
     async def test_success(self, shipx_client: ShipXClient) -> None:
@@ -231,3 +387,390 @@ class TestHTTPError:
         )
         with pytest.raises(httpx.ConnectError):
             await shipx_client.get_shipment(shipment_id=1)
+
+
+class TestGetTrackings:
+    @respx.mock
+    async def test_returns_results_and_errors(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.get(f"{SANDBOX_URL}/v1/tracking/T1").respond(
+            json={"tracking_number": "T1", "tracking_details": []},
+        )
+        respx.get(f"{SANDBOX_URL}/v1/tracking/T2").respond(
+            status_code=404,
+            json={"error": "resource_not_found", "message": "Not found"},
+        )
+        results = await shipx_client.get_trackings(
+            ["T1", "T2"],
+            concurrency=2,
+        )
+        assert results["T1"] == {
+            "tracking_number": "T1",
+            "tracking_details": [],
+        }
+        error = results["T2"]
+        assert isinstance(error, ShipXAPIError)
+        assert error.status_code == 404
+
+    @respx.mock
+    async def test_deduplicates_numbers(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.get(f"{SANDBOX_URL}/v1/tracking/T1").respond(
+            json={"tracking_number": "T1"},
+        )
+        results = await shipx_client.get_trackings(["T1", "T1", "T1"])
+        assert list(results) == ["T1"]
+        assert route.call_count == 1
+
+
+class TestTrackingCache:
+    def test_disabled_by_default(self, shipx_client: ShipXClient) -> None:
+        assert shipx_client.tracking_cache is None
+
+    @respx.mock
+    async def test_serves_repeated_lookups_from_cache(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            tracking_cache_ttl=60.0,
+        )
+        route = respx.get(f"{SANDBOX_URL}/v1/tracking/T1").respond(
+            json={"tracking_number": "T1"},
+        )
+        first = await client.get_tracking("T1")
+        second = await client.get_tracking("T1")
+        assert first == second == {"tracking_number": "T1"}
+        assert route.call_count == 1
+
+    @respx.mock
+    async def test_concurrent_lookups_share_one_request(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            tracking_cache_ttl=60.0,
+        )
+        route = respx.get(f"{SANDBOX_URL}/v1/tracking/T1").respond(
+            json={"tracking_number": "T1"},
+        )
+        results: list[dict[str, object]] = []
+
+        async def _lookup() -> None:
+            results.append(await client.get_tracking("T1"))
+
+        async with anyio.create_task_group() as task_group:
+            for _ in range(5):
+                task_group.start_soon(_lookup)
+
+        assert len(results) == 5
+        assert route.call_count == 1
+
+    @respx.mock
+    async def test_errors_are_not_cached(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            tracking_cache_ttl=60.0,
+        )
+        route = respx.get(f"{SANDBOX_URL}/v1/tracking/T1").mock(
+            side_effect=[
+                httpx.Response(503, json={"error": "unavailable"}),
+                httpx.Response(200, json={"tracking_number": "T1"}),
+            ],
+        )
+        with pytest.raises(ShipXAPIError):
+            await client.get_tracking("T1")
+        assert await client.get_tracking("T1") == {"tracking_number": "T1"}
+        assert route.call_count == 2
+
+
+class TestWarmUp:
+    @respx.mock
+    async def test_opens_requested_connections(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.head(f"{SANDBOX_URL}/").respond(status_code=404)
+        warmed = await shipx_client.warm_up(connections=3)
+        assert warmed == 3
+        assert route.call_count == 3
+
+    @respx.mock
+    async def test_capped_at_keepalive_limit(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            max_keepalive_connections=2,
+        )
+        respx.head(f"{SANDBOX_URL}/").respond(status_code=200)
+        assert await client.warm_up(connections=10) == 2
+
+    @respx.mock
+    async def test_failed_connections_are_not_counted(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.head(f"{SANDBOX_URL}/").mock(
+            side_effect=[
+                httpx.Response(200),
+                httpx.ConnectError("refused"),
+            ],
+        )
+        assert await shipx_client.warm_up(connections=2) == 1
+
+    @respx.mock
+    async def test_does_not_take_rate_limit_tokens(self) -> None:
+        backend = MemoryRateLimitBackend()
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            rate_limiter=RateLimiter(backend, key="org:1", rate=1.0, burst=1),
+        )
+        respx.head(f"{SANDBOX_URL}/").respond(status_code=200)
+        respx.get(f"{SANDBOX_URL}/v1/shipments/1").respond(json={"id": 1})
+        await client.warm_up(connections=2)
+        with anyio.fail_after(0.5):
+            assert await client.get_shipment(1) == {"id": 1}
+        await client.close()
+
+    @respx.mock
+    async def test_keep_warm_repeats(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            keepalive_expiry=0.02,
+        )
+        route = respx.head(f"{SANDBOX_URL}/").respond(status_code=200)
+        with anyio.move_on_after(0.05):
+            await client.keep_warm(1)
+        assert route.call_count >= 2
+
+    async def test_keep_warm_rejects_interval_past_expiry(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        with pytest.raises(ValueError, match="keepalive_expiry"):
+            await shipx_client.keep_warm(1, interval=30.0)
+
+
+class TestCancelShipments:
+    @respx.mock
+    async def test_classifies_outcomes(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.delete(f"{SANDBOX_URL}/v1/shipments/1").respond(status_code=204)
+        respx.delete(f"{SANDBOX_URL}/v1/shipments/2").respond(
+            status_code=400,
+            json={"error": "invalid_action"},
+        )
+        respx.get(f"{SANDBOX_URL}/v1/shipments/2").respond(
+            json={"id": 2, "status": "canceled"},
+        )
+        respx.delete(f"{SANDBOX_URL}/v1/shipments/3").respond(
+            status_code=400,
+            json={"error": "invalid_action"},
+        )
+        respx.get(f"{SANDBOX_URL}/v1/shipments/3").respond(
+            json={"id": 3, "status": "dispatched_by_sender"},
+        )
+        respx.delete(f"{SANDBOX_URL}/v1/shipments/4").respond(
+            status_code=503,
+        )
+        respx.delete(f"{SANDBOX_URL}/v1/shipments/5").mock(
+            side_effect=httpx.ReadTimeout("timed out"),
+        )
+
+        results = await shipx_client.cancel_shipments(
+            [1, 2, 3, 4, 5],
+            concurrency=2,
+        )
+
+        outcomes = {key: result.outcome for key, result in results.items()}
+        assert outcomes == {
+            1: ShipXCancelOutcome.CANCELLED,
+            2: ShipXCancelOutcome.ALREADY_CANCELLED,
+            3: ShipXCancelOutcome.NOT_CANCELLABLE,
+            4: ShipXCancelOutcome.TRANSIENT_ERROR,
+            5: ShipXCancelOutcome.TRANSIENT_ERROR,
+        }
+        assert results[1].error is None
+        assert isinstance(results[3].error, ShipXAPIError)
+        assert isinstance(results[5].error, httpx.ReadTimeout)
+
+    @respx.mock
+    async def test_authentication_error_propagates(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.delete(f"{SANDBOX_URL}/v1/shipments/1").respond(
+            status_code=401,
+        )
+        with pytest.raises(ShipXAuthenticationError):
+            await shipx_client.cancel_shipments([1, 2])
+
+
+class TestSyncShipments:
+    @staticmethod
+    def _page(*items: tuple[int, str, str]) -> dict:
+        return {
+            "items": [
+                {"id": id_, "status": status, "updated_at": updated_at}
+                for id_, status, updated_at in items
+            ],
+        }
+
+    @respx.mock
+    async def test_walks_pages_by_cursor(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.get(f"{SANDBOX_URL}/v1/organizations/12345/shipments")
+        route.side_effect = [
+            httpx.Response(
+                200,
+                json=self._page(
+                    (1, "confirmed", "2026-10-01T10:00:00+02:00"),
+                    (2, "delivered", "2026-10-01T11:00:00+02:00"),
+                ),
+            ),
+            httpx.Response(
+                200,
+                json=self._page(
+                    (2, "delivered", "2026-10-01T11:00:00+02:00"),
+                    (3, "taken_by_courier", "2026-10-01T12:00:00+02:00"),
+                ),
+            ),
+            httpx.Response(
+                200,
+                json=self._page(
+                    (3, "taken_by_courier", "2026-10-01T12:00:00+02:00"),
+                ),
+            ),
+        ]
+
+        result = await shipx_client.sync_shipments(
+            "2026-10-01T09:00:00+02:00",
+            per_page=2,
+        )
+
+        assert result.cursor == "2026-10-01T12:00:00+02:00"
+        assert result.changes == {
+            1: ShipmentStatus.LABEL_READY,
+            2: ShipmentStatus.DELIVERED,
+            3: ShipmentStatus.IN_TRANSIT,
+        }
+        params = [call.request.url.params for call in route.calls]
+        assert params[0]["updated_at_gteq"] == "2026-10-01T09:00:00+02:00"
+        assert params[1]["updated_at_gteq"] == "2026-10-01T11:00:00+02:00"
+        assert params[2]["updated_at_gteq"] == "2026-10-01T12:00:00+02:00"
+        assert params[0]["sort_by"] == "updated_at"
+
+    @respx.mock
+    async def test_full_page_with_one_timestamp_advances_page(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        stamp = "2026-10-01T10:00:00Z"
+        route = respx.get(f"{SANDBOX_URL}/v1/organizations/12345/shipments")
+        route.side_effect = [
+            httpx.Response(
+                200,
+                json=self._page((1, "created", stamp), (2, "created", stamp)),
+            ),
+            httpx.Response(200, json=self._page((3, "created", stamp))),
+        ]
+
+        result = await shipx_client.sync_shipments(stamp, per_page=2)
+
+        assert set(result.changes) == {1, 2, 3}
+        assert result.cursor == stamp
+        assert route.calls[1].request.url.params["page"] == "2"
+
+    @respx.mock
+    async def test_filters_by_reverse_mapped_statuses(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.get(
+            f"{SANDBOX_URL}/v1/organizations/12345/shipments",
+        ).respond(json={"items": []})
+
+        result = await shipx_client.sync_shipments(
+            statuses=[ShipmentStatus.LABEL_READY, ShipmentStatus.CANCELLED],
+        )
+
+        assert result == (None, {})
+        params = route.calls.last.request.url.params
+        assert params["status"] == "confirmed,canceled"
+        assert "updated_at_gteq" not in params
+
+
+class TestTimeouts:
+    def test_phase_timeouts_default_to_timeout(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            timeout=10.0,
+            connect_timeout=2.0,
+        )
+        timeout = client._timeout_for("get_shipment")
+        assert timeout.connect == 2.0
+        assert timeout.read == 10.0
+        assert timeout.pool == 10.0
+
+    @respx.mock
+    async def test_operation_timeout_overrides_read(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            connect_timeout=2.0,
+            operation_timeouts={"get_label": 60.0},
+        )
+        respx.get(f"{SANDBOX_URL}/v1/shipments/1/label").respond(
+            content=b"%PDF",
+        )
+        route = respx.get(f"{SANDBOX_URL}/v1/shipments/1").respond(
+            json={"id": 1},
+        )
+
+        await client.get_label(1)
+        await client.get_shipment(1)
+        await client.close()
+
+        label = respx.calls[0].request.extensions["timeout"]
+        assert label["read"] == 60.0
+        assert label["connect"] == 2.0
+        assert route.calls.last.request.extensions["timeout"]["read"] == 30.0
+
+    def test_unknown_operation_rejected(self) -> None:
+        with pytest.raises(ValueError, match="get_lable"):
+            ShipXClient(
+                token="t",
+                organization_id=1,
+                operation_timeouts={"get_lable": 5.0},
+            )
+
+    @respx.mock
+    async def test_deadline_bounds_total_time(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await anyio.sleep(1)
+            return httpx.Response(200, json={"id": 1})
+
+        respx.get(f"{SANDBOX_URL}/v1/shipments/1").mock(side_effect=slow)
+
+        with pytest.raises(TimeoutError), shipx_client.deadline(0.05):
+            await shipx_client.get_shipment(1)
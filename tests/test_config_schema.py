@@ -37,8 +37,7 @@ class TestLockerConfigSchema:
 
 
 class TestCourierConfigSchema:
-    def test_has_same_schema_as_locker(self) -> None:
-        assert (
-            InPostCourierProvider.config_schema
-            == InPostLockerProvider.config_schema
-        )
+    def test_has_locker_schema_without_point_validation(self) -> None:
+        locker = dict(InPostLockerProvider.config_schema)
+        del locker["validate_target_point"]
+        assert InPostCourierProvider.config_schema == locker
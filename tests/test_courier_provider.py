@@ -6,10 +6,19 @@ from dataclasses import dataclass
 from decimal import Decimal
 from unittest.mock import AsyncMock, patch
 
+import anyio
+import httpx
+import pytest
+import respx
 from sendparcel.enums import ConfirmationMethod, ShipmentStatus
 from sendparcel.types import AddressInfo, ParcelInfo
 
+from sendparcel_inpost.client import SANDBOX_BASE_URL
+from sendparcel_inpost.exceptions import ShipXValidationError
+from sendparcel_inpost.labels import label_prefetcher
+from sendparcel_inpost.pool import ShipXClientPool
 from sendparcel_inpost.providers.courier import InPostCourierProvider
+from sendparcel_inpost.waiters import waiter_registry
 
 SENDER_ADDRESS: AddressInfo = {
     "first_name": "Jan",
@@ -123,6 +132,25 @@ class TestCourierCreateShipment:
         assert "weight" in parcel
         assert "template" not in parcel
 
+    async def test_passes_reference(self) -> None:
+        provider = InPostCourierProvider(
+            shipment=_FakeShipment(),
+            config={"token": "t", "organization_id": 1},
+        )
+        mock_client = AsyncMock()
+        mock_client.create_shipment = AsyncMock(return_value={"id": 5})
+
+        with patch.object(provider, "_get_client", return_value=mock_client):
+            await provider.create_shipment(
+                sender_address=SENDER_ADDRESS,
+                receiver_address=RECEIVER_ADDRESS,
+                parcels=PARCELS,
+                idempotency_key="ORDER-9",
+            )
+
+        call = mock_client.create_shipment.call_args
+        assert call.kwargs["reference"] == "ORDER-9"
+
     async def test_includes_receiver_address(self) -> None:
         shipment = _FakeShipment()
         config = {
@@ -210,3 +238,120 @@ class TestCourierFetchStatus:
             result = await provider.fetch_shipment_status()
 
         assert result["status"] == ShipmentStatus.IN_TRANSIT
+
+
+class TestCourierAwaitStatus:
+    async def test_fetch_status_resolves_waiter(self) -> None:
+        shipment = _FakeShipment(external_id="4343")
+        provider = InPostCourierProvider(shipment, config={})
+        results: list[ShipmentStatus] = []
+
+        async def _wait() -> None:
+            results.append(
+                await waiter_registry.wait(
+                    4343,
+                    ShipmentStatus.LABEL_READY,
+                    timeout=1.0,
+                ),
+            )
+
+        with patch.object(
+            provider,
+            "_get_client",
+            return_value=AsyncMock(),
+        ) as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.get_shipment = AsyncMock(
+                return_value={"id": 4343, "status": "confirmed"},
+            )
+            mock_client.close = AsyncMock()
+
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(_wait)
+                await anyio.sleep(0.01)
+                await provider.fetch_shipment_status()
+
+        assert results == [ShipmentStatus.LABEL_READY]
+
+
+class TestCourierLabelPrefetch:
+    async def test_confirmed_status_schedules_prefetch(self) -> None:
+        shipment = _FakeShipment(external_id="6161")
+        provider = InPostCourierProvider(
+            shipment,
+            config={"prefetch_labels": True, "prefetch_label_format": "Zpl"},
+        )
+        with (
+            patch.object(
+                provider,
+                "_get_client",
+                return_value=AsyncMock(),
+            ) as mock_get_client,
+            patch.object(label_prefetcher, "schedule") as mock_schedule,
+        ):
+            mock_client = mock_get_client.return_value
+            mock_client.get_shipment = AsyncMock(
+                return_value={"id": 6161, "status": "confirmed"},
+            )
+            mock_client.close = AsyncMock()
+
+            await provider.fetch_shipment_status()
+
+        assert mock_schedule.call_args.args[:2] == (6161, "Zpl")
+
+
+class TestCourierClientPool:
+    async def test_pooled_calls_share_one_client(self) -> None:
+        shipment = _FakeShipment(external_id="777")
+        config = {
+            "token": "t",
+            "organization_id": 1,
+            "sandbox": True,
+            "use_client_pool": True,
+        }
+        provider = InPostCourierProvider(shipment, config=config)
+        pool = ShipXClientPool()
+
+        with (
+            patch("sendparcel_inpost.pool.client_pool", pool),
+            respx.mock(base_url=SANDBOX_BASE_URL) as mock,
+        ):
+            mock.get("/v1/shipments/777").mock(
+                return_value=httpx.Response(
+                    200,
+                    json={"id": 777, "status": "taken_by_courier"},
+                ),
+            )
+            await provider.fetch_shipment_status()
+            await provider.fetch_shipment_status()
+
+        usage = pool.usage()[(1, SANDBOX_BASE_URL)]
+        assert usage.leases == 2
+        assert usage.clients_created == 1
+        await pool.aclose()
+
+
+class TestCourierPayloadValidation:
+    async def test_invalid_payload_is_rejected_before_sending(self) -> None:
+        provider = InPostCourierProvider(
+            _FakeShipment(),
+            config={"validate_payloads": True},
+        )
+        receiver = {**RECEIVER_ADDRESS, "postal_code": "30001"}
+
+        with (
+            patch.object(provider, "_get_client") as mock_get_client,
+            pytest.raises(ShipXValidationError) as exc_info,
+        ):
+            await provider.create_shipment(
+                sender_address=SENDER_ADDRESS,
+                receiver_address=receiver,
+                parcels=[{"weight_kg": Decimal("80")}],
+            )
+
+        assert [error["field"] for error in exc_info.value.errors] == [
+            "receiver.address.post_code",
+            "parcels[0].dimensions",
+            "parcels[0].weight",
+        ]
+        mock_get_client.assert_not_called()
@@ -0,0 +1,187 @@
+"""Tests for dispatch order aggregation."""
+
+import json
+
+import anyio
+import httpx
+import respx
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.dispatch import DispatchOrderAggregator, pickup_from_peer
+from sendparcel_inpost.types import ShipXDispatchPickup
+from tests.conftest import FakeClock
+
+SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
+DISPATCH_URL = f"{SANDBOX_URL}/v1/organizations/12345/dispatch_orders"
+
+WAREHOUSE: ShipXDispatchPickup = {
+    "address": {
+        "street": "Magazynowa",
+        "building_number": "1",
+        "city": "Warszawa",
+        "post_code": "00-001",
+        "country_code": "PL",
+    },
+    "name": "Magazyn",
+    "phone": "500100200",
+}
+
+STORE: ShipXDispatchPickup = {
+    "address": {
+        "street": "Sklepowa",
+        "building_number": "2",
+        "city": "Krakow",
+        "post_code": "30-001",
+        "country_code": "PL",
+    },
+}
+
+
+class TestPickupFromPeer:
+    def test_person(self) -> None:
+        pickup = pickup_from_peer(
+            {
+                "first_name": "Jan",
+                "last_name": "Nadawca",
+                "phone": "500100200",
+                "email": "jan@example.com",
+                "address": {"street": "Nadawcza", "city": "Warszawa"},
+            },
+            comment="Gate 3",
+        )
+        assert pickup == {
+            "address": {"street": "Nadawcza", "city": "Warszawa"},
+            "name": "Jan Nadawca",
+            "phone": "500100200",
+            "email": "jan@example.com",
+            "comment": "Gate 3",
+        }
+
+    def test_company_name_wins(self) -> None:
+        pickup = pickup_from_peer(
+            {"first_name": "Jan", "company_name": "Firma"},
+        )
+        assert pickup["name"] == "Firma"
+
+
+class TestClientCreateDispatchOrder:
+    @respx.mock
+    async def test_posts_to_organization(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.post(DISPATCH_URL).respond(json={"id": 7})
+        result = await shipx_client.create_dispatch_order(
+            payload={"shipments": [1, 2]},
+        )
+        assert result == {"id": 7}
+        assert json.loads(route.calls[0].request.content) == {
+            "shipments": [1, 2],
+        }
+
+
+class TestAggregator:
+    @respx.mock
+    async def test_flushes_when_batch_is_full(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.post(DISPATCH_URL).respond(json={"id": 1})
+        aggregator = DispatchOrderAggregator(shipx_client, max_batch=2)
+
+        assert await aggregator.add(10, WAREHOUSE) is None
+        assert await aggregator.add(11, WAREHOUSE) == {"id": 1}
+
+        body = json.loads(route.calls[0].request.content)
+        assert body["shipments"] == [10, 11]
+        assert body["name"] == "Magazyn"
+        assert aggregator.pending == 0
+
+    @respx.mock
+    async def test_groups_by_address_and_window(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.post(DISPATCH_URL).respond(json={"id": 1})
+        aggregator = DispatchOrderAggregator(shipx_client)
+        shouting = {
+            **WAREHOUSE,
+            "address": {
+                **WAREHOUSE["address"],
+                "street": " MAGAZYNOWA ",
+            },
+        }
+
+        await aggregator.add(1, WAREHOUSE, window="mon")
+        await aggregator.add(2, shouting, window="mon")  # type: ignore[arg-type]
+        await aggregator.add(3, WAREHOUSE, window="tue")
+        await aggregator.add(4, STORE, window="mon")
+        assert aggregator.pending == 4
+
+        results = await aggregator.flush()
+
+        assert len(results) == 3
+        batches = sorted(
+            json.loads(call.request.content)["shipments"]
+            for call in route.calls
+        )
+        assert batches == [[1, 2], [3], [4]]
+
+    @respx.mock
+    async def test_flushes_expired_groups(
+        self,
+        shipx_client: ShipXClient,
+        clock: FakeClock,
+    ) -> None:
+        route = respx.post(DISPATCH_URL).respond(json={"id": 1})
+        aggregator = DispatchOrderAggregator(
+            shipx_client,
+            max_delay=60.0,
+            clock=clock,
+        )
+        await aggregator.add(1, WAREHOUSE)
+        clock.now += 30.0
+        await aggregator.add(2, STORE)
+
+        clock.now += 30.0
+        await aggregator.flush_expired()
+
+        assert route.call_count == 1
+        assert aggregator.pending == 1
+
+    @respx.mock
+    async def test_errors_are_reported(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.post(DISPATCH_URL).mock(
+            return_value=httpx.Response(
+                422,
+                json={"error": "validation_failed"},
+            ),
+        )
+        failed: list[list[int]] = []
+        aggregator = DispatchOrderAggregator(
+            shipx_client,
+            on_error=lambda exc, ids: failed.append(ids),
+        )
+        await aggregator.add(1, WAREHOUSE)
+        assert await aggregator.flush() == []
+        assert failed == [[1]]
+
+    @respx.mock
+    async def test_run_flushes_on_cancel(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.post(DISPATCH_URL).respond(json={"id": 1})
+        created: list[list[int]] = []
+        aggregator = DispatchOrderAggregator(
+            shipx_client,
+            on_created=lambda response, ids: created.append(ids),
+        )
+        await aggregator.add(1, WAREHOUSE)
+        with anyio.move_on_after(0.02):
+            await aggregator.run(check_interval=0.01)
+        assert route.call_count == 1
+        assert created == [[1]]
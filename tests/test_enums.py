@@ -1,6 +1,11 @@
 """Tests for ShipX enums."""
 
-from sendparcel_inpost.enums import ShipXParcelTemplate, ShipXService
+from sendparcel_inpost.enums import (
+    ShipXCancelOutcome,
+    ShipXOutboxStatus,
+    ShipXParcelTemplate,
+    ShipXService,
+)
 
 
 class TestShipXService:
@@ -23,3 +28,23 @@ class TestShipXParcelTemplate:
 
     def test_large(self) -> None:
         assert ShipXParcelTemplate.LARGE == "large"
+
+
+class TestShipXCancelOutcome:
+    def test_values(self) -> None:
+        assert {outcome.value for outcome in ShipXCancelOutcome} == {
+            "cancelled",
+            "already_cancelled",
+            "not_cancellable",
+            "transient_error",
+        }
+
+
+class TestShipXOutboxStatus:
+    def test_values(self) -> None:
+        assert {status.value for status in ShipXOutboxStatus} == {
+            "queued",
+            "sending",
+            "created",
+            "failed",
+        }
@@ -0,0 +1,255 @@
+"""Tests for hedged reads."""
+
+import anyio
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.hedging import HedgingPolicy, LatencyTracker
+from tests.conftest import FakeClock
+
+
+def _trained(policy: HedgingPolicy, operation: str, latency: float) -> None:
+    for _ in range(policy.min_samples):
+        policy.tracker(operation).record(latency)
+
+
+class TestLatencyTracker:
+    def test_percentile_nearest_rank(self) -> None:
+        tracker = LatencyTracker()
+        for value in range(1, 101):
+            tracker.record(value / 100)
+        assert tracker.percentile(95) == 0.95
+        assert tracker.percentile(50) == 0.5
+
+    def test_empty(self) -> None:
+        assert LatencyTracker().percentile(95) is None
+
+    def test_window_drops_old_samples(self) -> None:
+        tracker = LatencyTracker(window=2)
+        for value in (10.0, 1.0, 2.0):
+            tracker.record(value)
+        assert tracker.percentile(99) == 2.0
+
+
+class TestHedgingPolicy:
+    def test_rejects_invalid_budget(self) -> None:
+        with pytest.raises(ValueError, match="budget"):
+            HedgingPolicy(budget=2.0)
+
+    def test_no_delay_until_enough_samples(self) -> None:
+        policy = HedgingPolicy(min_samples=3, min_delay=0.5)
+        policy.tracker("op").record(0.1)
+        assert policy.delay("op") is None
+        _trained(policy, "op", 0.1)
+        assert policy.delay("op") == 0.5
+
+    async def test_slow_attempt_is_hedged(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "op", 0.01)
+        attempts: list[int] = []
+        cancelled = anyio.Event()
+
+        async def call() -> int:
+            attempt = len(attempts)
+            attempts.append(attempt)
+            if attempt == 0:
+                try:
+                    await anyio.sleep(5)
+                except anyio.get_cancelled_exc_class():
+                    cancelled.set()
+                    raise
+            return attempt
+
+        assert await policy.run("op", call) == 1
+        assert cancelled.is_set()
+        assert (policy.hedges, policy.hedge_wins) == (1, 1)
+
+    async def test_fast_attempt_is_not_hedged(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "op", 1.0)
+
+        async def call() -> str:
+            return "ok"
+
+        assert await policy.run("op", call) == "ok"
+        assert policy.hedges == 0
+
+    async def test_budget_limits_hedges(self) -> None:
+        policy = HedgingPolicy(budget=0.5, min_samples=100)
+        _trained(policy, "op", 0.001)
+
+        async def call() -> None:
+            await anyio.sleep(0.01)
+
+        for _ in range(4):
+            await policy.run("op", call)
+
+        assert policy.calls == 4
+        assert policy.hedges == 2
+
+    async def test_fast_failing_hedge_does_not_win(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "op", 0.01)
+        attempts: list[int] = []
+
+        async def call() -> str:
+            attempt = len(attempts)
+            attempts.append(attempt)
+            if attempt == 1:
+                raise RuntimeError("hedge failed")
+            await anyio.sleep(0.05)
+            return "primary"
+
+        assert await policy.run("op", call) == "primary"
+        assert (policy.hedges, policy.hedge_wins) == (1, 0)
+
+    async def test_raises_when_every_attempt_fails(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "op", 0.01)
+        attempts: list[int] = []
+
+        async def call() -> None:
+            attempt = len(attempts)
+            attempts.append(attempt)
+            await anyio.sleep(0.05 if attempt == 0 else 0)
+            raise RuntimeError(f"boom {attempt}")
+
+        with pytest.raises(RuntimeError, match="boom 1"):
+            await policy.run("op", call)
+        assert len(attempts) == 2
+
+    async def test_error_before_delay_is_not_hedged(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "op", 1.0)
+
+        async def call() -> None:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await policy.run("op", call)
+        assert policy.hedges == 0
+
+    async def test_only_successful_attempts_are_recorded(
+        self,
+        clock: FakeClock,
+    ) -> None:
+        policy = HedgingPolicy(budget=1.0, clock=clock)
+        _trained(policy, "op", 0.01)
+        attempts: list[int] = []
+
+        async def call() -> int:
+            attempt = len(attempts)
+            attempts.append(attempt)
+            if attempt == 0:
+                await anyio.sleep(5)
+            clock.now += 3.0
+            return attempt
+
+        assert await policy.run("op", call) == 1
+        assert policy.tracker("op").percentile(100) == 3.0
+        assert len(policy.tracker("op")) == policy.min_samples + 1
+
+    async def test_failed_result_does_not_win(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "op", 0.01)
+        attempts: list[int] = []
+
+        async def call() -> int:
+            attempt = len(attempts)
+            attempts.append(attempt)
+            if attempt == 0:
+                await anyio.sleep(0.05)
+                return 200
+            return 503
+
+        assert await policy.run("op", call, failed=lambda s: s >= 500) == 200
+        assert (policy.hedges, policy.hedge_wins) == (1, 0)
+        assert len(policy.tracker("op")) == policy.min_samples + 1
+
+    async def test_failed_result_is_returned_when_all_fail(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+
+        async def call() -> int:
+            return 503
+
+        assert await policy.run("op", call, failed=lambda s: s >= 500) == 503
+        assert len(policy.tracker("op")) == 0
+
+
+class TestClientHedging:
+    async def test_get_shipment_is_hedged(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "get_shipment", 0.01)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            hedging=policy,
+        )
+        calls = 0
+
+        async def respond(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await anyio.sleep(5)
+            return httpx.Response(200, json={"id": 1, "attempt": calls})
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/shipments/1").mock(side_effect=respond)
+            with anyio.fail_after(2):
+                result = await client.get_shipment(1)
+        await client.close()
+
+        assert result["attempt"] == 2
+        assert policy.hedges == 1
+
+    async def test_writes_are_not_hedged(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "create_shipment", 0.0)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            hedging=policy,
+        )
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            route = mock.post("/v1/organizations/1/shipments").respond(
+                201,
+                json={"id": 1},
+            )
+            await client.create_shipment({"service": "inpost_courier_c2c"})
+        await client.close()
+
+        assert route.call_count == 1
+        assert policy.calls == 0
+
+    async def test_fast_error_response_does_not_win(self) -> None:
+        policy = HedgingPolicy(budget=1.0)
+        _trained(policy, "get_shipment", 0.01)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            hedging=policy,
+        )
+        calls = 0
+
+        async def respond(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await anyio.sleep(0.05)
+                return httpx.Response(200, json={"id": 1})
+            return httpx.Response(503, json={"error": "unavailable"})
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/shipments/1").mock(side_effect=respond)
+            with anyio.fail_after(2):
+                result = await client.get_shipment(1)
+        await client.close()
+
+        assert result == {"id": 1}
+        assert (policy.hedges, policy.hedge_wins) == (1, 0)
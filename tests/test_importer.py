@@ -0,0 +1,464 @@
+"""Tests for the bulk import pipeline."""
+
+import io
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import anyio
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.exceptions import ShipXValidationError
+from sendparcel_inpost.importer import (
+    BulkImporter,
+    ImportCheckpoint,
+    ImportResult,
+    build_order_payload,
+    main,
+    order_from_row,
+    read_orders,
+)
+from sendparcel_inpost.points import Point, PointDirectory
+
+RECEIVER = {
+    "first_name": "Anna",
+    "last_name": "Odbiorca",
+    "phone": "600200300",
+    "email": "anna@example.com",
+    "street": "Odbiorcza",
+    "building_number": "5",
+    "city": "Krakow",
+    "postal_code": "30-001",
+}
+
+
+def _order(order_id: str, **extra: Any) -> dict[str, Any]:
+    return {
+        "order_id": order_id,
+        "receiver": RECEIVER,
+        "parcels": [{"weight_kg": "2.5", "length_cm": "30"}],
+        **extra,
+    }
+
+
+def _lines(path: Path) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _mock_shipx(mock: respx.MockRouter, first_id: int = 100) -> respx.Route:
+    ids = iter(range(first_id, first_id + 100))
+
+    def create(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(201, json={"id": next(ids), "status": "created"})
+
+    def shipment(request: httpx.Request) -> httpx.Response:
+        shipment_id = int(request.url.path.rsplit("/", 1)[1])
+        return httpx.Response(
+            200,
+            json={
+                "id": shipment_id,
+                "status": "confirmed",
+                "tracking_number": f"TN{shipment_id}",
+            },
+        )
+
+    route = mock.post("/v1/organizations/1/shipments").mock(
+        side_effect=create,
+    )
+    mock.get(url__regex=r"/v1/shipments/\d+$").mock(side_effect=shipment)
+    mock.get(url__regex=r"/v1/shipments/\d+/label").respond(content=b"%PDF")
+    return route
+
+
+@pytest.fixture
+def client() -> ShipXClient:
+    return ShipXClient(token="t", organization_id=1, sandbox=True)
+
+
+class TestOrders:
+    def test_order_from_row(self) -> None:
+        order = order_from_row(
+            {
+                "order_id": "A1",
+                "service": "locker",
+                "receiver_first_name": "Anna",
+                "receiver_phone": "600200300",
+                "sender_company": "",
+                "weight_kg": "1.5",
+                "target_point": "KRA010",
+            },
+        )
+        assert order == {
+            "order_id": "A1",
+            "service": "locker",
+            "receiver": {"first_name": "Anna", "phone": "600200300"},
+            "sender": {},
+            "parcels": [{"weight_kg": "1.5"}],
+            "target_point": "KRA010",
+        }
+
+    def test_read_csv_and_jsonl(self, tmp_path: Path) -> None:
+        csv_path = tmp_path / "orders.csv"
+        csv_path.write_text("order_id,receiver_city\nA1,Krakow\n,Gdansk\n")
+        jsonl_path = tmp_path / "orders.jsonl"
+        jsonl_path.write_text('{"order_id": "B1"}\n\n{"receiver": {}}\n')
+
+        csv_orders = list(read_orders(csv_path))
+        assert [order["order_id"] for order in csv_orders] == ["A1", "2"]
+        assert csv_orders[1]["receiver"] == {"city": "Gdansk"}
+        assert [order["order_id"] for order in read_orders(jsonl_path)] == [
+            "B1",
+            "2",
+        ]
+
+    def test_payload_uses_provider_logic(self) -> None:
+        payload = build_order_payload(
+            _order("A1", service="locker", target_point="KRA010"),
+        )
+        assert payload["service"] == "inpost_locker_standard"
+        assert payload["custom_attributes"]["target_point"] == "KRA010"
+        assert payload["receiver"]["address"]["post_code"] == "30-001"
+
+        courier = build_order_payload(_order("A2"))
+        assert courier["parcels"][0]["weight"] == {"amount": 2.5, "unit": "kg"}
+
+    def test_malformed_lines_are_yielded(self, tmp_path: Path) -> None:
+        path = tmp_path / "orders.jsonl"
+        path.write_text('{"order_id": "A1"}\n{"order_id": \n[1]\n')
+
+        orders = list(read_orders(path))
+        assert [order["order_id"] for order in orders] == ["A1", "2", "3"]
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            build_order_payload(orders[1])
+        with pytest.raises(ValueError, match="not a JSON object"):
+            build_order_payload(orders[2])
+
+    def test_locker_order_needs_target_point(self) -> None:
+        with pytest.raises(ValueError, match="target_point"):
+            build_order_payload(_order("A1", service="locker"))
+
+    def test_provider_config_enables_point_validation(self) -> None:
+        directory = PointDirectory()
+        directory.upsert([Point("KRA010", 50.06, 19.94, ("parcel_locker",))])
+        order = _order("A1", service="locker", target_point="XXX999")
+        with (
+            patch("sendparcel_inpost.points.point_directory", directory),
+            pytest.raises(ShipXValidationError),
+        ):
+            build_order_payload(
+                order,
+                provider_config={"validate_target_point": True},
+            )
+
+    def test_invalid_weight(self) -> None:
+        order = _order("A1", parcels=[{"weight_kg": "heavy"}])
+        with pytest.raises(ValueError, match="weight_kg"):
+            build_order_payload(order)
+
+    def test_unknown_service(self) -> None:
+        with pytest.raises(ValueError, match="pallet"):
+            build_order_payload(_order("A1", service="pallet"))
+
+
+class TestBulkImporter:
+    async def test_imports_orders(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        output = tmp_path / "out.jsonl"
+        importer = BulkImporter(
+            client,
+            output,
+            labels_dir=tmp_path / "labels",
+            concurrency=2,
+            label_concurrency=2,
+        )
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL, assert_all_called=False
+        ) as mock:
+            _mock_shipx(mock)
+            summary = await importer.run(
+                [_order(f"A{index}") for index in range(5)],
+            )
+        await client.close()
+
+        assert (summary.created, summary.completed, summary.failed) == (5, 5, 0)
+        results = {line["order_id"]: line for line in _lines(output)}
+        assert set(results) == {f"A{index}" for index in range(5)}
+        first = results["A0"]
+        assert first["status"] == "ok"
+        assert first["tracking_number"] == f"TN{first['shipment_id']}"
+        assert Path(first["label_path"]).read_bytes() == b"%PDF"
+        assert len(importer.checkpoint.load()) == 5
+
+    async def test_failures_are_recorded(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        output = tmp_path / "out.jsonl"
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL, assert_all_called=False
+        ) as mock:
+            mock.post("/v1/organizations/1/shipments").respond(
+                422,
+                json={
+                    "message": "Invalid",
+                    "details": {"receiver": ["invalid"]},
+                },
+            )
+            summary = await BulkImporter(client, output).run([_order("A1")])
+        await client.close()
+
+        assert summary.failed == 1
+        [line] = _lines(output)
+        assert line["status"] == "error"
+        assert line["shipment_id"] is None
+
+    async def test_bad_orders_do_not_stop_the_import(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        orders = tmp_path / "orders.jsonl"
+        orders.write_text(
+            "\n".join(
+                [
+                    json.dumps(_order("A1", parcels=[{"weight_kg": "x"}])),
+                    "{not json",
+                    json.dumps(_order("A3")),
+                    json.dumps(_order("A4", parcels=["oops"])),
+                    json.dumps(_order("A5", parcels=5)),
+                    json.dumps(_order("A6", receiver="nobody")),
+                ],
+            ),
+        )
+        output = tmp_path / "out.jsonl"
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL,
+            assert_all_called=False,
+        ) as mock:
+            _mock_shipx(mock)
+            summary = await BulkImporter(client, output).run(
+                read_orders(orders),
+            )
+        await client.close()
+
+        assert (summary.completed, summary.failed) == (1, 5)
+        statuses = {line["order_id"]: line["status"] for line in _lines(output)}
+        assert statuses == {
+            "A1": "error",
+            "2": "error",
+            "A3": "ok",
+            "A4": "error",
+            "A5": "error",
+            "A6": "error",
+        }
+
+    async def test_duplicate_order_id_is_created_once(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        output = tmp_path / "out.jsonl"
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL,
+            assert_all_called=False,
+        ) as mock:
+            create = _mock_shipx(mock)
+            summary = await BulkImporter(client, output).run(
+                [_order("A1"), _order("A1"), _order("A2")],
+            )
+        await client.close()
+
+        assert create.call_count == 2
+        assert (summary.created, summary.skipped) == (2, 1)
+        assert [line["order_id"] for line in _lines(output)].count("A1") == 1
+
+    async def test_label_write_error_is_recorded(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        labels = tmp_path / "labels"
+        (labels / "A1.pdf").mkdir(parents=True)
+        output = tmp_path / "out.jsonl"
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL,
+            assert_all_called=False,
+        ) as mock:
+            _mock_shipx(mock)
+            summary = await BulkImporter(
+                client,
+                output,
+                labels_dir=labels,
+            ).run([_order("A1"), _order("A2")])
+        await client.close()
+
+        assert (summary.completed, summary.failed) == (1, 1)
+        results = {line["order_id"]: line for line in _lines(output)}
+        assert results["A1"]["status"] == "error"
+        assert results["A1"]["shipment_id"] is not None
+        assert results["A2"]["status"] == "ok"
+
+    async def test_confirmation_is_polled_at_poll_interval(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        output = tmp_path / "out.jsonl"
+        polls: dict[str, int] = {}
+
+        def shipment(request: httpx.Request) -> httpx.Response:
+            shipment_id = request.url.path.rsplit("/", 1)[1]
+            polls[shipment_id] = polls.get(shipment_id, 0) + 1
+            status = "confirmed" if polls[shipment_id] > 1 else "created"
+            return httpx.Response(
+                200,
+                json={"id": int(shipment_id), "status": status},
+            )
+
+        importer = BulkImporter(
+            client,
+            output,
+            label_concurrency=1,
+            confirm_poll_interval=0.01,
+        )
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL,
+            assert_all_called=False,
+        ) as mock:
+            _mock_shipx(mock)
+            mock.get(url__regex=r"/v1/shipments/\d+$").mock(
+                side_effect=shipment,
+            )
+            with anyio.fail_after(2):
+                summary = await importer.run(
+                    [_order(f"A{index}") for index in range(3)],
+                )
+        await client.close()
+
+        assert summary.completed == 3
+
+    async def test_resumes_from_checkpoint(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        output = tmp_path / "out.jsonl"
+        output.write_text(
+            json.dumps({"order_id": "A1", "status": "ok"})
+            + '\n{"order_id": "A2", "sta',
+        )
+        checkpoint = ImportCheckpoint(tmp_path / "created.jsonl")
+        await checkpoint.record(
+            ImportResult(order_id="A2", status="created", shipment_id=7),
+        )
+        importer = BulkImporter(client, output, checkpoint=checkpoint)
+
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL, assert_all_called=False
+        ) as mock:
+            create = _mock_shipx(mock, first_id=50)
+            summary = await importer.run(
+                [_order("A1"), _order("A2"), _order("A3")],
+            )
+        await client.close()
+
+        assert create.call_count == 1
+        assert (summary.skipped, summary.created, summary.completed) == (
+            1,
+            1,
+            2,
+        )
+        lines = output.read_text().splitlines()
+        assert lines[1] == '{"order_id": "A2", "sta'
+        results = {
+            record["order_id"]: record for record in map(json.loads, lines[2:])
+        }
+        assert results["A2"]["shipment_id"] == 7
+        assert results["A3"]["shipment_id"] == 50
+
+    async def test_pending_create_is_looked_up(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        checkpoint = ImportCheckpoint(tmp_path / "created.jsonl")
+        await checkpoint.record(ImportResult(order_id="A1", status="pending"))
+        importer = BulkImporter(
+            client,
+            tmp_path / "out.jsonl",
+            checkpoint=checkpoint,
+        )
+
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL,
+            assert_all_called=False,
+        ) as mock:
+            create = _mock_shipx(mock)
+            lookup = mock.get("/v1/organizations/1/shipments").respond(
+                json={"items": [{"id": 42, "reference": "A1"}]},
+            )
+            summary = await importer.run([_order("A1")])
+        await client.close()
+
+        assert create.call_count == 0
+        assert lookup.call_count == 1
+        assert summary.completed == 1
+        assert checkpoint.load()["A1"].shipment_id == 42
+
+    async def test_retry_failed(
+        self,
+        client: ShipXClient,
+        tmp_path: Path,
+    ) -> None:
+        output = tmp_path / "out.jsonl"
+        output.write_text(json.dumps({"order_id": "A1", "status": "error"}))
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL, assert_all_called=False
+        ) as mock:
+            create = _mock_shipx(mock)
+            await BulkImporter(client, output).run([_order("A1")])
+            await BulkImporter(client, output, retry_failed=True).run(
+                [_order("A1")],
+            )
+        await client.close()
+
+        assert create.call_count == 1
+        assert _lines(output)[-1]["status"] == "ok"
+
+
+class TestMain:
+    def test_cli_imports_file(self, tmp_path: Path) -> None:
+        orders = tmp_path / "orders.jsonl"
+        orders.write_text(json.dumps(_order("A1")) + "\n")
+        output = tmp_path / "out.jsonl"
+        out = io.StringIO()
+
+        with respx.mock(
+            base_url=SANDBOX_BASE_URL, assert_all_called=False
+        ) as mock:
+            _mock_shipx(mock)
+            code = main(
+                [
+                    str(orders),
+                    "--output",
+                    str(output),
+                    "--organization-id",
+                    "1",
+                    "--sandbox",
+                    "--token",
+                    "t",
+                ],
+                stdout=out,
+            )
+
+        assert code == 0
+        assert "completed=1" in out.getvalue()
+        assert _lines(output)[0]["status"] == "ok"
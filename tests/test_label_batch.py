@@ -0,0 +1,203 @@
+"""Tests for streaming label merging."""
+
+import io
+from collections.abc import AsyncIterator
+
+import anyio
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.label_batch import (
+    A4_FOUR_UP,
+    compose_pdf_sheets,
+    label_stream,
+    merge_pdf_labels,
+    merge_zpl_labels,
+)
+
+pypdf = pytest.importorskip("pypdf")
+
+SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
+
+
+def _a6_pdf(pages: int = 1) -> bytes:
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=298, height=420)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+async def _stream(items: list[bytes]) -> AsyncIterator[bytes]:
+    for item in items:
+        yield item
+
+
+class TestComposePdfSheets:
+    def test_four_labels_per_a4_page(self) -> None:
+        merged = compose_pdf_sheets([_a6_pdf()] * 5)
+        reader = pypdf.PdfReader(io.BytesIO(merged))
+        assert len(reader.pages) == 2
+        assert float(reader.pages[0].mediabox.width) == pytest.approx(
+            A4_FOUR_UP.page_width,
+        )
+
+    def test_multi_page_labels_fill_cells(self) -> None:
+        merged = compose_pdf_sheets([_a6_pdf(pages=3), _a6_pdf(pages=2)])
+        assert len(pypdf.PdfReader(io.BytesIO(merged)).pages) == 2
+
+
+class TestMergePdfLabels:
+    async def test_emits_one_document_per_chunk(self) -> None:
+        documents = [
+            document
+            async for document in merge_pdf_labels(
+                _stream([_a6_pdf()] * 10),
+                labels_per_document=4,
+            )
+        ]
+        page_counts = [
+            len(pypdf.PdfReader(io.BytesIO(document)).pages)
+            for document in documents
+        ]
+        assert page_counts == [1, 1, 1]
+
+    async def test_rejects_non_positive_chunk(self) -> None:
+        with pytest.raises(ValueError, match="positive"):
+            async for _ in merge_pdf_labels(
+                _stream([_a6_pdf()]),
+                labels_per_document=0,
+            ):
+                pass
+
+
+class TestMergeZplLabels:
+    async def test_concatenates_jobs(self) -> None:
+        labels = [b"^XA^FDone^XZ\n", b"^XA^FDtwo^XZ", b"^XA^FDthree^XZ"]
+        jobs = [
+            job
+            async for job in merge_zpl_labels(
+                _stream(labels),
+                labels_per_job=2,
+            )
+        ]
+        assert jobs == [
+            b"^XA^FDone^XZ\n^XA^FDtwo^XZ\n",
+            b"^XA^FDthree^XZ\n",
+        ]
+
+
+class TestLabelStream:
+    @respx.mock
+    async def test_streams_labels_in_order(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        routes = [
+            respx.get(
+                f"{SANDBOX_URL}/v1/shipments/{shipment_id}/label",
+            ).respond(content=f"label-{shipment_id}".encode())
+            for shipment_id in range(1, 6)
+        ]
+
+        async with label_stream(
+            shipx_client,
+            [5, 3, 1, 2, 4],
+            concurrency=2,
+        ) as stream:
+            labels = [label async for label in stream]
+
+        assert labels == [
+            b"label-5",
+            b"label-3",
+            b"label-1",
+            b"label-2",
+            b"label-4",
+        ]
+        assert routes[0].calls.last.request.url.params["type"] == "A6"
+
+    @respx.mock
+    async def test_failed_label_is_skipped_and_reported(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        for shipment_id in (1, 3):
+            respx.get(
+                f"{SANDBOX_URL}/v1/shipments/{shipment_id}/label",
+            ).respond(content=f"label-{shipment_id}".encode())
+        respx.get(f"{SANDBOX_URL}/v1/shipments/2/label").respond(
+            status_code=404,
+            json={"message": "Not found"},
+        )
+        errors: list[tuple[int, Exception]] = []
+
+        async with label_stream(
+            shipx_client,
+            [1, 2, 3],
+            concurrency=2,
+            on_error=lambda shipment_id, exc: errors.append(
+                (shipment_id, exc),
+            ),
+        ) as stream:
+            labels = [label async for label in stream]
+
+        assert labels == [b"label-1", b"label-3"]
+        [(shipment_id, error)] = errors
+        assert shipment_id == 2
+        assert isinstance(error, ShipXAPIError)
+
+    @respx.mock
+    async def test_slow_label_does_not_hold_back_the_window(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        third_requested = anyio.Event()
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await third_requested.wait()
+            return httpx.Response(200, content=b"label-2")
+
+        async def third(request: httpx.Request) -> httpx.Response:
+            third_requested.set()
+            return httpx.Response(200, content=b"label-3")
+
+        respx.get(f"{SANDBOX_URL}/v1/shipments/1/label").respond(
+            content=b"label-1",
+        )
+        respx.get(f"{SANDBOX_URL}/v1/shipments/2/label").mock(side_effect=slow)
+        respx.get(f"{SANDBOX_URL}/v1/shipments/3/label").mock(
+            side_effect=third,
+        )
+
+        with anyio.fail_after(1):
+            async with label_stream(
+                shipx_client,
+                [1, 2, 3],
+                concurrency=2,
+            ) as stream:
+                labels = [label async for label in stream]
+
+        assert labels == [b"label-1", b"label-2", b"label-3"]
+
+    @respx.mock
+    async def test_leaving_early_cancels_downloads(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.get(url__regex=r"/v1/shipments/\d+/label").respond(
+            content=b"label",
+        )
+
+        async with label_stream(
+            shipx_client,
+            range(100),
+            concurrency=4,
+        ) as stream:
+            async for _ in stream:
+                break
+
+        assert route.call_count < 100
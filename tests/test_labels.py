@@ -0,0 +1,132 @@
+"""Tests for label prefetching."""
+
+import anyio
+
+from sendparcel_inpost.labels import LabelPrefetcher, LabelStore
+
+
+class TestLabelStore:
+    def test_put_and_get(self) -> None:
+        store = LabelStore()
+        assert store.put(1, "Pdf", b"label")
+        assert store.get("1", "Pdf") == b"label"
+        assert store.get(1, "Zpl") is None
+        assert store.bytes_used == 5
+
+    def test_evicts_least_recently_used_over_budget(self) -> None:
+        store = LabelStore(max_bytes=10)
+        store.put(1, "Pdf", b"aaaa")
+        store.put(2, "Pdf", b"bbbb")
+        store.get(1, "Pdf")
+        store.put(3, "Pdf", b"cccc")
+        assert store.get(2, "Pdf") is None
+        assert store.get(1, "Pdf") == b"aaaa"
+        assert store.bytes_used == 8
+
+    def test_rejects_label_larger_than_budget(self) -> None:
+        store = LabelStore(max_bytes=3)
+        assert not store.put(1, "Pdf", b"toolarge")
+        assert len(store) == 0
+
+    def test_replace_updates_size(self) -> None:
+        store = LabelStore()
+        store.put(1, "Pdf", b"aaaa")
+        store.put(1, "Pdf", b"aa")
+        assert store.bytes_used == 2
+        store.discard(1, "Pdf")
+        assert store.bytes_used == 0
+
+
+class TestLabelPrefetcher:
+    async def test_downloads_into_store(self) -> None:
+        prefetcher = LabelPrefetcher()
+
+        async def _fetch() -> bytes:
+            return b"%PDF"
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(prefetcher.run)
+            await anyio.wait_all_tasks_blocked()
+            assert prefetcher.schedule(1, "Pdf", _fetch)
+            assert not prefetcher.schedule(1, "Pdf", _fetch)
+            while prefetcher.pending:
+                await anyio.sleep(0.01)
+            task_group.cancel_scope.cancel()
+
+        assert prefetcher.store.get(1, "Pdf") == b"%PDF"
+        assert not prefetcher.schedule(1, "Pdf", _fetch)
+
+    async def test_bounded_concurrency(self) -> None:
+        prefetcher = LabelPrefetcher(concurrency=2)
+        in_flight = 0
+        peak = 0
+
+        async def _fetch() -> bytes:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await anyio.sleep(0.01)
+            in_flight -= 1
+            return b"x"
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(prefetcher.run)
+            await anyio.wait_all_tasks_blocked()
+            for shipment_id in range(6):
+                prefetcher.schedule(shipment_id, "Pdf", _fetch)
+            while prefetcher.pending:
+                await anyio.sleep(0.01)
+            task_group.cancel_scope.cancel()
+
+        assert peak == 2
+        assert len(prefetcher.store) == 6
+
+    async def test_failures_are_dropped(self) -> None:
+        prefetcher = LabelPrefetcher()
+
+        async def _fetch() -> bytes:
+            raise RuntimeError("boom")
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(prefetcher.run)
+            await anyio.wait_all_tasks_blocked()
+            prefetcher.schedule(1, "Pdf", _fetch)
+            while prefetcher.pending:
+                await anyio.sleep(0.01)
+            task_group.cancel_scope.cancel()
+
+        assert prefetcher.store.get(1, "Pdf") is None
+
+    async def test_max_pending(self) -> None:
+        prefetcher = LabelPrefetcher(concurrency=1, max_pending=1)
+        release = anyio.Event()
+
+        async def _fetch() -> bytes:
+            await release.wait()
+            return b""
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(prefetcher.run)
+            await anyio.wait_all_tasks_blocked()
+            assert prefetcher.schedule(1, "Pdf", _fetch)
+            assert not prefetcher.schedule(2, "Pdf", _fetch)
+            task_group.cancel_scope.cancel()
+
+    async def test_skips_when_not_running(self) -> None:
+        prefetcher = LabelPrefetcher()
+
+        async def _fetch() -> bytes:
+            return b"%PDF"
+
+        assert not prefetcher.running
+        assert not prefetcher.schedule(1, "Pdf", _fetch)
+        assert prefetcher.pending == 0
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(prefetcher.run)
+            await anyio.wait_all_tasks_blocked()
+            assert prefetcher.running
+            task_group.cancel_scope.cancel()
+
+        assert not prefetcher.running
+        assert not prefetcher.schedule(1, "Pdf", _fetch)
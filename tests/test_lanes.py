@@ -0,0 +1,176 @@
+"""Tests for priority lanes."""
+
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+import respx
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.lanes import (
+    Bulkhead,
+    current_lane,
+    default_lane,
+    request_lane,
+)
+from sendparcel_inpost.polling import PollScheduler
+from sendparcel_inpost.pool import ShipXClientPool
+
+
+class TestLaneContext:
+    def test_request_lane_is_scoped(self) -> None:
+        assert current_lane() is None
+        with request_lane("bulk"):
+            assert current_lane() == "bulk"
+        assert current_lane() is None
+
+    def test_default_lane_keeps_explicit_choice(self) -> None:
+        with default_lane("bulk"):
+            assert current_lane() == "bulk"
+        with request_lane("interactive"), default_lane("bulk"):
+            assert current_lane() == "interactive"
+
+
+class TestBulkhead:
+    def test_requires_default_lane(self) -> None:
+        with pytest.raises(ValueError, match="default lane"):
+            Bulkhead({"bulk": 2})
+
+    def test_rejects_empty_lane(self) -> None:
+        with pytest.raises(ValueError, match="at least 1"):
+            Bulkhead({"interactive": 1, "bulk": 0})
+
+    def test_unknown_lane_uses_default(self) -> None:
+        bulkhead = Bulkhead({"interactive": 2, "bulk": 1})
+        assert bulkhead.limiter("nope") is bulkhead.limiter()
+        assert bulkhead.limiter("bulk") is not bulkhead.limiter()
+        assert bulkhead.total == 3
+
+
+class TestClientLanes:
+    def test_lanes_must_fit_connection_pool(self) -> None:
+        with pytest.raises(ValueError, match="max_connections"):
+            ShipXClient(
+                token="t",
+                organization_id=1,
+                max_connections=4,
+                lanes={"interactive": 3, "bulk": 3},
+            )
+
+    async def test_interactive_does_not_queue_behind_bulk(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            lanes={"interactive": 1, "bulk": 1},
+        )
+        release = anyio.Event()
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200, json={"id": 1})
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/shipments/1").mock(side_effect=slow)
+            mock.get("/v1/shipments/2").respond(json={"id": 2})
+            async with anyio.create_task_group() as task_group:
+                with request_lane("bulk"):
+                    task_group.start_soon(client.get_shipment, 1)
+                    task_group.start_soon(client.get_shipment, 1)
+                await anyio.wait_all_tasks_blocked()
+
+                assert client.bulkhead is not None
+                bulk = client.bulkhead.limiter("bulk")
+                assert bulk.statistics().tasks_waiting == 1
+                with anyio.fail_after(1):
+                    assert await client.get_shipment(2) == {"id": 2}
+                release.set()
+        await client.close()
+
+    async def test_bulk_helpers_default_to_bulk_lane(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            lanes={"interactive": 2, "bulk": 2},
+        )
+        lanes: list[str | None] = []
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            lanes.append(current_lane())
+            return httpx.Response(200, json={"tracking_details": []})
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get(url__regex=r"/v1/tracking/.*").mock(side_effect=respond)
+            await client.get_trackings(["T1", "T2"])
+            await client.get_tracking("T3")
+        await client.close()
+
+        assert lanes == ["bulk", "bulk", None]
+
+    async def test_poll_sweep_leaves_interactive_lane_free(self) -> None:
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            lanes={"interactive": 1, "background": 1},
+        )
+        scheduler = PollScheduler(jitter=0.0)
+        release = anyio.Event()
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200, json={"status": "delivered"})
+
+        async def poll(shipment_id: str) -> str:
+            shipment = await client.get_shipment(int(shipment_id))
+            return str(shipment["status"])
+
+        for shipment_id in ("1", "2"):
+            scheduler.schedule(shipment_id, ShipmentStatus.CREATED, now=0.0)
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get(url__regex=r"/v1/shipments/[12]$").mock(side_effect=slow)
+            mock.get("/v1/shipments/3").respond(json={"id": 3})
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(
+                    lambda: scheduler.run(poll, concurrency=2),
+                )
+                await anyio.wait_all_tasks_blocked()
+
+                assert client.bulkhead is not None
+                background = client.bulkhead.limiter("background")
+                assert background.statistics().tasks_waiting == 1
+                with anyio.fail_after(1):
+                    assert await client.get_shipment(3) == {"id": 3}
+                release.set()
+                task_group.cancel_scope.cancel()
+        await client.close()
+
+
+class TestPoolLanes:
+    async def test_pool_passes_lanes_to_clients(self) -> None:
+        created: list[dict[str, Any]] = []
+
+        def factory(**kwargs: Any) -> ShipXClient:
+            created.append(kwargs)
+            return ShipXClient(**kwargs)
+
+        pool = ShipXClientPool(
+            connections_per_tenant=4,
+            lanes={"interactive": 2, "bulk": 2},
+            client_factory=factory,
+        )
+        async with pool.client("t", 1) as client:
+            assert client.bulkhead is not None
+        await pool.aclose()
+
+        assert created[0]["lanes"] == {"interactive": 2, "bulk": 2}
+
+    def test_pool_rejects_oversized_lanes(self) -> None:
+        with pytest.raises(ValueError, match="connections_per_tenant"):
+            ShipXClientPool(
+                connections_per_tenant=2,
+                lanes={"interactive": 2, "bulk": 2},
+            )
@@ -0,0 +1,98 @@
+"""Tests for lazy package attributes and deferred imports."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import sendparcel_inpost
+import sendparcel_inpost.providers
+
+
+def _run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    ).stdout.strip()
+
+
+class TestLazyAttributes:
+    def test_package_exports_resolve(self) -> None:
+        from sendparcel_inpost.client import ShipXClient
+        from sendparcel_inpost.providers.courier import InPostCourierProvider
+        from sendparcel_inpost.providers.locker import InPostLockerProvider
+
+        assert sendparcel_inpost.ShipXClient is ShipXClient
+        assert sendparcel_inpost.InPostLockerProvider is InPostLockerProvider
+        assert (
+            sendparcel_inpost.providers.InPostCourierProvider
+            is InPostCourierProvider
+        )
+
+    def test_unknown_attribute_raises(self) -> None:
+        with pytest.raises(AttributeError, match="no_such_name"):
+            _ = sendparcel_inpost.no_such_name
+
+    def test_dir_lists_public_names(self) -> None:
+        assert set(sendparcel_inpost.__all__) <= set(dir(sendparcel_inpost))
+
+
+class TestDeferredImports:
+    def test_package_import_loads_no_submodules(self) -> None:
+        loaded = _run(
+            "import sys, sendparcel_inpost\n"
+            "print(sorted(m for m in sys.modules"
+            " if m.startswith('sendparcel')))",
+        )
+        assert loaded == "['sendparcel_inpost']"
+
+    def test_client_import_loads_no_optional_modules(self) -> None:
+        # sendparcel core may load httpx itself, so only count what
+        # importing the client adds.
+        added = _run(
+            "import sys, sendparcel\n"
+            "before = set(sys.modules)\n"
+            "import sendparcel_inpost.client\n"
+            "print(' '.join(sorted(set(sys.modules) - before)))",
+        ).split()
+        assert not [name for name in added if name.startswith("httpx")]
+        assert "sqlite3" not in added
+        assert sorted(
+            name for name in added if name.startswith("sendparcel_inpost")
+        ) == [
+            "sendparcel_inpost",
+            "sendparcel_inpost.client",
+            "sendparcel_inpost.enums",
+            "sendparcel_inpost.exceptions",
+            "sendparcel_inpost.status_mapping",
+            "sendparcel_inpost.types",
+        ]
+
+    @pytest.mark.parametrize("provider", ["courier", "locker"])
+    def test_provider_import_loads_no_optional_modules(
+        self,
+        provider: str,
+    ) -> None:
+        added = _run(
+            "import sys, sendparcel\n"
+            "before = set(sys.modules)\n"
+            f"import sendparcel_inpost.providers.{provider}\n"
+            "print(' '.join(sorted(set(sys.modules) - before)))",
+        ).split()
+        assert not [name for name in added if name.startswith("httpx")]
+        assert sorted(
+            name for name in added if name.startswith("sendparcel_inpost")
+        ) == [
+            "sendparcel_inpost",
+            "sendparcel_inpost.client",
+            "sendparcel_inpost.enums",
+            "sendparcel_inpost.exceptions",
+            "sendparcel_inpost.providers",
+            f"sendparcel_inpost.providers.{provider}",
+            "sendparcel_inpost.status_mapping",
+            "sendparcel_inpost.types",
+        ]
@@ -0,0 +1,180 @@
+"""Tests for the open-loop load generator."""
+
+import io
+import json
+
+import pytest
+import respx
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.loadgen import (
+    LatencyHistogram,
+    LoadProfile,
+    format_report,
+    main,
+    parse_mix,
+    run_load,
+)
+
+SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
+
+
+class TestLatencyHistogram:
+    def test_empty(self) -> None:
+        histogram = LatencyHistogram()
+        assert histogram.count == 0
+        assert histogram.percentile(99) == 0.0
+        assert histogram.mean == 0.0
+
+    def test_percentiles_within_relative_error(self) -> None:
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+        assert histogram.count == 1000
+        assert histogram.percentile(50) == pytest.approx(0.5, rel=0.01)
+        assert histogram.percentile(99) == pytest.approx(0.99, rel=0.01)
+        assert histogram.percentile(100) == pytest.approx(1.0)
+        assert histogram.max == pytest.approx(1.0)
+
+    def test_merge(self) -> None:
+        first = LatencyHistogram()
+        second = LatencyHistogram()
+        first.record(0.010)
+        second.record(0.020)
+        first.merge(second)
+        assert first.count == 2
+        assert first.max == pytest.approx(0.020)
+        assert first.mean == pytest.approx(0.015)
+
+
+class TestParseMix:
+    def test_weights(self) -> None:
+        assert parse_mix("status=6, tracking=3,label") == {
+            "status": 6.0,
+            "tracking": 3.0,
+            "label": 1.0,
+        }
+
+    def test_unknown_operation(self) -> None:
+        with pytest.raises(ValueError, match="Unknown operation"):
+            parse_mix("status=1,delete=1")
+
+    def test_all_zero(self) -> None:
+        with pytest.raises(ValueError, match="positive weight"):
+            parse_mix("status=0")
+
+
+class TestRunLoad:
+    @respx.mock
+    async def test_offers_fixed_rate_and_records_errors(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.get(f"{SANDBOX_URL}/v1/shipments/1").respond(
+            json={"id": 1, "status": "confirmed"},
+        )
+        respx.get(f"{SANDBOX_URL}/v1/tracking/T1").respond(
+            status_code=503,
+            json={"error": "unavailable"},
+        )
+        profile = LoadProfile(
+            rate=200.0,
+            duration=0.1,
+            mix={"status": 1.0, "tracking": 1.0},
+            shipment_ids=[1],
+            tracking_numbers=["T1"],
+            seed=7,
+        )
+        report = await run_load(shipx_client, profile, report_interval=1.0)
+
+        status = report.operations["status"]
+        tracking = report.operations["tracking"]
+        assert status.corrected.count + tracking.corrected.count == 20
+        assert status.error_count == 0
+        assert tracking.errors == {"503": tracking.corrected.count}
+        assert tracking.error_rate == 1.0
+
+    @respx.mock
+    async def test_unexpected_exception_is_counted(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.get(f"{SANDBOX_URL}/v1/shipments/1").respond(text="<html>")
+        profile = LoadProfile(
+            rate=100.0,
+            duration=0.05,
+            mix={"status": 1.0},
+            shipment_ids=[1],
+        )
+        report = await run_load(shipx_client, profile, report_interval=1.0)
+
+        status = report.operations["status"]
+        assert status.corrected.count == 5
+        assert status.errors == {"JSONDecodeError": 5}
+
+    @respx.mock
+    async def test_create_feeds_id_pool(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        respx.post(
+            f"{SANDBOX_URL}/v1/organizations/12345/shipments",
+        ).respond(json={"id": 5, "tracking_number": "T5"})
+        respx.get(f"{SANDBOX_URL}/v1/shipments/5").respond(
+            json={"id": 5, "status": "created"},
+        )
+        profile = LoadProfile(
+            rate=100.0,
+            duration=0.05,
+            mix={"create": 1.0, "status": 1.0},
+            payload={"service": "inpost_courier_standard"},
+            seed=1,
+        )
+        report = await run_load(shipx_client, profile)
+
+        assert report.operations["create"].corrected.count >= 1
+        text = format_report(report, title="Summary")
+        assert "create" in text
+        assert "p99.9" in text
+
+
+class TestMain:
+    def test_requires_payload_for_create(self) -> None:
+        with pytest.raises(SystemExit):
+            main(
+                [
+                    "--organization-id",
+                    "1",
+                    "--rate",
+                    "1",
+                    "--mix",
+                    "create=1",
+                ],
+            )
+
+    def test_runs_and_prints_summary(self, tmp_path) -> None:
+        payload = tmp_path / "payload.json"
+        payload.write_text(json.dumps({"service": "inpost_courier_standard"}))
+        out = io.StringIO()
+        with respx.mock:
+            respx.post(
+                f"{SANDBOX_URL}/v1/organizations/1/shipments",
+            ).respond(json={"id": 1})
+            code = main(
+                [
+                    "--organization-id",
+                    "1",
+                    "--sandbox",
+                    "--rate",
+                    "50",
+                    "--duration",
+                    "0.05",
+                    "--mix",
+                    "create=1",
+                    "--payload",
+                    str(payload),
+                ],
+                stdout=out,
+            )
+        assert code == 0
+        assert "Summary" in out.getvalue()
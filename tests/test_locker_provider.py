@@ -2,17 +2,27 @@
 
 from __future__ import annotations
 
+import base64
 from dataclasses import dataclass
 from decimal import Decimal
 from unittest.mock import AsyncMock, patch
 
+import anyio
 import pytest
+import respx
 from sendparcel.enums import ConfirmationMethod, ShipmentStatus
 from sendparcel.exceptions import InvalidCallbackError
 from sendparcel.types import AddressInfo, ParcelInfo
 
-from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.cache import TTLCache
+from sendparcel_inpost.client import SANDBOX_BASE_URL
+from sendparcel_inpost.enums import ShipXCancelOutcome
+from sendparcel_inpost.exceptions import ShipXAPIError, ShipXValidationError
+from sendparcel_inpost.labels import label_prefetcher
+from sendparcel_inpost.points import Point, PointDirectory
 from sendparcel_inpost.providers.locker import InPostLockerProvider
+from sendparcel_inpost.types import ShipXCancelResult
+from sendparcel_inpost.waiters import waiter_registry
 
 SENDER_ADDRESS: AddressInfo = {
     "first_name": "Jan",
@@ -315,3 +325,229 @@ class TestLockerAddressConversion:
         assert peer["first_name"] == "Jan"
         assert peer["last_name"] == "Kowalski"
         assert peer["address"]["street"] == "Marszalkowska 1"
+
+
+class TestLockerAwaitStatus:
+    async def test_webhook_resolves_waiter(self) -> None:
+        shipment = _FakeShipment(external_id="4242")
+        provider = InPostLockerProvider(shipment, config={})
+        results: list[ShipmentStatus] = []
+
+        async def _wait() -> None:
+            results.append(
+                await waiter_registry.wait(
+                    4242,
+                    ShipmentStatus.LABEL_READY,
+                    timeout=1.0,
+                ),
+            )
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(_wait)
+            await anyio.sleep(0.01)
+            await provider.handle_callback(
+                data={"payload": {"shipment_id": 4242, "status": "confirmed"}},
+                headers={},
+            )
+
+        assert results == [ShipmentStatus.LABEL_READY]
+
+    async def test_await_status_uses_client(self) -> None:
+        shipment = _FakeShipment(external_id="999")
+        provider = InPostLockerProvider(shipment, config={})
+
+        with patch.object(
+            provider,
+            "_get_client",
+            return_value=AsyncMock(),
+        ) as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.await_status = AsyncMock(
+                return_value=ShipmentStatus.LABEL_READY,
+            )
+            mock_client.close = AsyncMock()
+
+            status = await provider.await_status(timeout=5.0)
+
+        assert status == ShipmentStatus.LABEL_READY
+        mock_client.await_status.assert_awaited_once_with(
+            999,
+            ShipmentStatus.LABEL_READY,
+            5.0,
+            poll_interval=None,
+        )
+        mock_client.close.assert_awaited_once()
+
+
+class TestLockerLabelPrefetch:
+    async def test_confirmed_webhook_schedules_prefetch(self) -> None:
+        shipment = _FakeShipment(external_id="5151")
+        provider = InPostLockerProvider(
+            shipment,
+            config={"prefetch_labels": True},
+        )
+        with patch.object(label_prefetcher, "schedule") as mock_schedule:
+            await provider.handle_callback(
+                data={"payload": {"shipment_id": 5151, "status": "confirmed"}},
+                headers={},
+            )
+        args = mock_schedule.call_args.args
+        assert args[:2] == (5151, "Pdf")
+
+    async def test_prefetch_disabled_by_default(self) -> None:
+        shipment = _FakeShipment(external_id="5151")
+        provider = InPostLockerProvider(shipment, config={})
+        with patch.object(label_prefetcher, "schedule") as mock_schedule:
+            await provider.handle_callback(
+                data={"payload": {"shipment_id": 5151, "status": "confirmed"}},
+                headers={},
+            )
+        mock_schedule.assert_not_called()
+
+    async def test_create_label_served_from_store(self) -> None:
+        shipment = _FakeShipment(external_id="5252")
+        provider = InPostLockerProvider(shipment, config={})
+        label_prefetcher.store.put(5252, "Pdf", b"%PDF-prefetched")
+        try:
+            with patch.object(provider, "_get_client") as mock_get_client:
+                label = await provider.create_label()
+        finally:
+            label_prefetcher.store.discard(5252, "Pdf")
+
+        mock_get_client.assert_not_called()
+        assert base64.b64decode(label["content_base64"]) == b"%PDF-prefetched"
+
+
+class TestLockerBulkCancel:
+    async def test_keys_results_by_external_id(self) -> None:
+        shipment = _FakeShipment()
+        provider = InPostLockerProvider(shipment, config={})
+
+        with patch.object(
+            provider,
+            "_get_client",
+            return_value=AsyncMock(),
+        ) as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.cancel_shipments = AsyncMock(
+                return_value={
+                    1: ShipXCancelResult(ShipXCancelOutcome.CANCELLED),
+                    2: ShipXCancelResult(ShipXCancelOutcome.TRANSIENT_ERROR),
+                },
+            )
+            mock_client.close = AsyncMock()
+
+            results = await provider.cancel_shipments(["1", "2"])
+
+        assert results["1"].outcome == ShipXCancelOutcome.CANCELLED
+        assert results["2"].outcome == ShipXCancelOutcome.TRANSIENT_ERROR
+        assert list(mock_client.cancel_shipments.call_args.args[0]) == [1, 2]
+        mock_client.close.assert_awaited_once()
+
+
+class TestLockerTargetPointValidation:
+    @staticmethod
+    def _directory() -> PointDirectory:
+        directory = PointDirectory()
+        directory.upsert(
+            [
+                Point("KRA010", 50.06, 19.94, functions=("parcel_collect",)),
+                Point("KRA011", 50.07, 19.95, status="Disabled"),
+                Point("KRA012", 50.08, 19.96, functions=("parcel_send",)),
+            ],
+        )
+        return directory
+
+    async def _create(self, target_point: str) -> AsyncMock:
+        provider = InPostLockerProvider(
+            _FakeShipment(),
+            config={"validate_target_point": True},
+        )
+        with patch.object(
+            provider,
+            "_get_client",
+            return_value=AsyncMock(),
+        ) as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.create_shipment = AsyncMock(
+                return_value={"id": 1, "tracking_number": "T"},
+            )
+            await provider.create_shipment(
+                sender_address=SENDER_ADDRESS,
+                receiver_address=RECEIVER_ADDRESS,
+                parcels=PARCELS,
+                target_point=target_point,
+            )
+        return mock_client
+
+    async def test_valid_point_is_created(self) -> None:
+        with patch(
+            "sendparcel_inpost.points.point_directory",
+            self._directory(),
+        ):
+            mock_client = await self._create("KRA010")
+        mock_client.create_shipment.assert_awaited_once()
+
+    @pytest.mark.parametrize(
+        ("target_point", "message"),
+        [
+            ("KRA999", "does not exist"),
+            ("KRA011", "not operating"),
+            ("KRA012", "does not accept small parcels"),
+        ],
+    )
+    async def test_invalid_point_is_rejected_locally(
+        self,
+        target_point: str,
+        message: str,
+    ) -> None:
+        with (
+            patch(
+                "sendparcel_inpost.points.point_directory",
+                self._directory(),
+            ),
+            pytest.raises(ShipXValidationError) as exc_info,
+        ):
+            await self._create(target_point)
+
+        [error] = exc_info.value.errors
+        assert error["field"] == "custom_attributes.target_point"
+        assert message in error["message"]
+
+    async def test_skipped_while_catalogue_is_empty(self) -> None:
+        with patch(
+            "sendparcel_inpost.points.point_directory",
+            PointDirectory(),
+        ):
+            mock_client = await self._create("KRA999")
+        mock_client.create_shipment.assert_awaited_once()
+
+
+class TestLockerQuote:
+    async def test_quote_uses_shared_price_cache(self) -> None:
+        provider = InPostLockerProvider(
+            _FakeShipment(),
+            config={"token": "t", "organization_id": 1, "sandbox": True},
+        )
+        cache: TTLCache = TTLCache(60.0)
+
+        with (
+            patch("sendparcel_inpost.pricing.price_cache", cache),
+            respx.mock(base_url=SANDBOX_BASE_URL) as mock,
+        ):
+            route = mock.post(
+                "/v1/organizations/1/shipments/calculate"
+            ).respond(
+                json=[{"id": "0", "calculated_charge_amount": "12.99"}],
+            )
+            for _ in range(2):
+                quote = await provider.quote(
+                    sender_address=SENDER_ADDRESS,
+                    receiver_address=RECEIVER_ADDRESS,
+                    parcels=PARCELS,
+                )
+
+        assert quote == {"amount": Decimal("12.99"), "currency": "PLN"}
+        assert route.call_count == 1
+        body = route.calls.last.request.content
+        assert b"target_point" not in body
@@ -0,0 +1,309 @@
+"""Tests for the shipment creation outbox."""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.enums import ShipXOutboxStatus
+from sendparcel_inpost.exceptions import ShipXValidationError
+from sendparcel_inpost.outbox import OutboxDrainer, OutboxEntry, ShipmentOutbox
+from sendparcel_inpost.ratelimit import RateLimiter
+from tests.conftest import FakeClock
+
+SHIPMENTS = "/v1/organizations/1/shipments"
+PAYLOAD = {"service": "inpost_courier_standard", "parcels": []}
+
+
+@pytest.fixture
+def outbox(tmp_path: Path, clock: FakeClock) -> Iterator[ShipmentOutbox]:
+    outbox = ShipmentOutbox(str(tmp_path / "outbox.db"), clock=clock)
+    yield outbox
+    outbox.close()
+
+
+@pytest.fixture
+def client() -> ShipXClient:
+    return ShipXClient(token="t", organization_id=1, sandbox=True)
+
+
+class CountingBackend:
+    def __init__(self) -> None:
+        self.reserved = 0
+
+    async def reserve(self, key: str, interval: float, burst: int) -> float:
+        self.reserved += 1
+        return 0.0
+
+    async def penalize(self, key: str, until: float) -> None:
+        pass
+
+
+def _raise(entry: OutboxEntry) -> None:
+    raise RuntimeError("callback broke")
+
+
+class TestShipmentOutbox:
+    async def test_enqueue_is_durable_and_idempotent(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        path = str(tmp_path / "outbox.db")
+        outbox = ShipmentOutbox(path)
+        entry = await outbox.enqueue(PAYLOAD, reference="A1")
+        again = await outbox.enqueue({"other": True}, reference="A1")
+        outbox.close()
+
+        assert entry.status == ShipXOutboxStatus.QUEUED
+        assert again.payload == PAYLOAD
+        reopened = ShipmentOutbox(path)
+        stored = await reopened.get("A1")
+        reopened.close()
+        assert stored is not None
+        assert stored.payload == PAYLOAD
+
+    async def test_generates_reference(self, outbox: ShipmentOutbox) -> None:
+        entry = await outbox.enqueue(PAYLOAD)
+        assert len(entry.reference) == 32
+
+    async def test_validates_before_queueing(self, tmp_path: Path) -> None:
+        outbox = ShipmentOutbox(
+            str(tmp_path / "outbox.db"),
+            validate_payloads=True,
+        )
+        with pytest.raises(ShipXValidationError):
+            await outbox.enqueue({}, reference="A1")
+        assert await outbox.get("A1") is None
+        outbox.close()
+
+    async def test_claim_order_and_lease(
+        self,
+        outbox: ShipmentOutbox,
+        clock: FakeClock,
+    ) -> None:
+        await outbox.enqueue(PAYLOAD, reference="A1")
+        clock.now += 1
+        await outbox.enqueue(PAYLOAD, reference="A2")
+
+        [first] = await outbox.claim(lease=60)
+        assert (first.reference, first.status, first.attempts) == (
+            "A1",
+            ShipXOutboxStatus.SENDING,
+            1,
+        )
+        assert [entry.reference for entry in await outbox.claim(5)] == ["A2"]
+        assert await outbox.claim() == []
+
+        clock.now += 61
+        [reclaimed] = await outbox.claim()
+        assert (reclaimed.reference, reclaimed.attempts) == ("A1", 2)
+
+    async def test_retry_later_and_requeue(
+        self,
+        outbox: ShipmentOutbox,
+        clock: FakeClock,
+    ) -> None:
+        await outbox.enqueue(PAYLOAD, reference="A1")
+        [entry] = await outbox.claim()
+        await outbox.retry_later(entry, "503", delay=10)
+        assert await outbox.claim() == []
+        clock.now += 10
+        [entry] = await outbox.claim()
+
+        failed = await outbox.mark_failed(entry, "gave up")
+        assert failed is not None
+        assert (failed.status, failed.error) == (
+            ShipXOutboxStatus.FAILED,
+            "gave up",
+        )
+        assert await outbox.requeue("A1")
+        assert not await outbox.requeue("A1")
+        counts = await outbox.counts()
+        assert counts[ShipXOutboxStatus.QUEUED] == 1
+        assert counts[ShipXOutboxStatus.FAILED] == 0
+
+        [requeued] = await outbox.claim()
+        assert (requeued.attempts, requeued.sends) == (1, 3)
+
+    async def test_expired_claim_cannot_store_result(
+        self,
+        outbox: ShipmentOutbox,
+        clock: FakeClock,
+    ) -> None:
+        await outbox.enqueue(PAYLOAD, reference="A1")
+        [stale] = await outbox.claim(lease=60)
+        clock.now += 61
+        [current] = await outbox.claim(lease=60)
+
+        assert await outbox.mark_failed(stale, "late") is None
+        created = await outbox.mark_created(current, {"id": 7})
+        assert created is not None
+        assert created.shipment_id == 7
+        assert await outbox.mark_created(current, {"id": 8}) is None
+
+
+class TestOutboxDrainer:
+    async def test_creates_queued_shipments(
+        self,
+        outbox: ShipmentOutbox,
+        client: ShipXClient,
+    ) -> None:
+        created: list[OutboxEntry] = []
+        drainer = OutboxDrainer(outbox, client, on_created=created.append)
+        await outbox.enqueue(PAYLOAD, reference="A1")
+        await outbox.enqueue(PAYLOAD, reference="A2")
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            route = mock.post(SHIPMENTS).mock(
+                side_effect=lambda request: httpx.Response(
+                    201,
+                    json={"id": 7, **json.loads(request.content)},
+                ),
+            )
+            assert await drainer.drain() == 2
+        await client.close()
+
+        assert route.call_count == 2
+        assert sorted(entry.reference for entry in created) == ["A1", "A2"]
+        entry = await outbox.get("A1")
+        assert entry is not None
+        assert entry.status == ShipXOutboxStatus.CREATED
+        assert entry.shipment_id == 7
+        assert entry.shipment is not None
+        assert entry.shipment["reference"] == "A1"
+
+    async def test_transient_error_is_retried_later(
+        self,
+        outbox: ShipmentOutbox,
+        client: ShipXClient,
+        clock: FakeClock,
+    ) -> None:
+        drainer = OutboxDrainer(outbox, client, retry_delay=30)
+        await outbox.enqueue(PAYLOAD, reference="A1")
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.post(SHIPMENTS).respond(503)
+            await drainer.drain()
+            entry = await outbox.get("A1")
+            assert entry is not None
+            assert entry.status == ShipXOutboxStatus.QUEUED
+
+            clock.now += 30
+            lookup = mock.get(SHIPMENTS).respond(
+                json={"items": [{"id": 9, "reference": "A1"}]},
+            )
+            await drainer.drain()
+        await client.close()
+
+        assert lookup.call_count == 1
+        entry = await outbox.get("A1")
+        assert entry is not None
+        assert entry.shipment_id == 9
+
+    async def test_requeued_entry_is_looked_up(
+        self,
+        outbox: ShipmentOutbox,
+        client: ShipXClient,
+    ) -> None:
+        drainer = OutboxDrainer(outbox, client, max_attempts=1)
+        await outbox.enqueue(PAYLOAD, reference="A1")
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            create = mock.post(SHIPMENTS).mock(
+                side_effect=httpx.ReadTimeout("slow"),
+            )
+            await drainer.drain()
+            failed = await outbox.get("A1")
+            assert failed is not None
+            assert failed.status == ShipXOutboxStatus.FAILED
+
+            await outbox.requeue("A1")
+            lookup = mock.get(SHIPMENTS).respond(
+                json={"items": [{"id": 9, "reference": "A1"}]},
+            )
+            await drainer.drain()
+        await client.close()
+
+        assert (create.call_count, lookup.call_count) == (1, 1)
+        entry = await outbox.get("A1")
+        assert entry is not None
+        assert entry.shipment_id == 9
+
+    async def test_permanent_error_fails_entry(
+        self,
+        outbox: ShipmentOutbox,
+        client: ShipXClient,
+    ) -> None:
+        failed: list[OutboxEntry] = []
+        drainer = OutboxDrainer(outbox, client, on_failed=failed.append)
+        await outbox.enqueue(PAYLOAD, reference="A1")
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.post(SHIPMENTS).respond(400, json={"message": "Bad"})
+            await drainer.drain()
+        await client.close()
+
+        [entry] = failed
+        assert entry.status == ShipXOutboxStatus.FAILED
+        assert entry.error is not None
+        assert "400" in entry.error
+
+    async def test_callback_errors_do_not_stop_drain(
+        self,
+        outbox: ShipmentOutbox,
+        client: ShipXClient,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        drainer = OutboxDrainer(
+            outbox,
+            client,
+            concurrency=1,
+            on_created=_raise,
+            on_failed=_raise,
+        )
+        await outbox.enqueue(PAYLOAD, reference="A1")
+        await outbox.enqueue({**PAYLOAD, "bad": True}, reference="A2")
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            if json.loads(request.content).get("bad"):
+                return httpx.Response(400, json={"message": "Bad"})
+            return httpx.Response(201, json={"id": 7})
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.post(SHIPMENTS).mock(side_effect=respond)
+            assert await drainer.drain() == 2
+        await client.close()
+
+        created = await outbox.get("A1")
+        failed = await outbox.get("A2")
+        assert created is not None
+        assert created.status == ShipXOutboxStatus.CREATED
+        assert failed is not None
+        assert failed.status == ShipXOutboxStatus.FAILED
+        assert caplog.text.count("callback failed") == 2
+
+    async def test_rate_limit_is_spent_only_on_sends(
+        self,
+        outbox: ShipmentOutbox,
+        client: ShipXClient,
+    ) -> None:
+        backend = CountingBackend()
+        limiter = RateLimiter(backend, key="org:1", rate=1000.0)
+        drainer = OutboxDrainer(
+            outbox,
+            client,
+            concurrency=3,
+            rate_limiter=limiter,
+        )
+        await outbox.enqueue(PAYLOAD, reference="A1")
+
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.post(SHIPMENTS).respond(201, json={"id": 7})
+            assert await drainer.drain() == 1
+        await client.close()
+
+        assert backend.reserved == 1
@@ -0,0 +1,177 @@
+"""Tests for the local point directory."""
+
+import random
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.points import Point, PointDirectory, haversine_km
+
+SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
+
+
+def _item(name: str, lat: float, lon: float, **extra: object) -> dict:
+    return {
+        "name": name,
+        "type": ["parcel_locker"],
+        "status": "Operating",
+        "location": {"latitude": lat, "longitude": lon},
+        "address_details": {"city": "Kraków", "post_code": "30-001"},
+        "functions": ["parcel_collect"],
+        **extra,
+    }
+
+
+class TestPoint:
+    def test_from_shipx(self) -> None:
+        point = Point.from_shipx(_item("KRA010", 50.06, 19.94))
+        assert point.name == "KRA010"
+        assert point.types == ("parcel_locker",)
+        assert point.city == "Kraków"
+        assert point.operating
+
+    def test_haversine(self) -> None:
+        # Warsaw - Kraków, roughly 252 km.
+        distance = haversine_km(52.2297, 21.0122, 50.0647, 19.945)
+        assert distance == pytest.approx(252, abs=2)
+
+
+class TestPointDirectory:
+    def test_lookup_by_name_is_case_insensitive(self) -> None:
+        directory = PointDirectory()
+        directory.upsert([Point("KRA010", 50.06, 19.94)])
+        assert directory.get("kra010") is not None
+        assert "KRA010" in directory
+        assert directory.remove("kra010")
+        assert len(directory) == 0
+
+    def test_nearest_matches_brute_force(self) -> None:
+        rng = random.Random(7)
+        points = [
+            Point(
+                f"P{index}",
+                rng.uniform(49.0, 54.8),
+                rng.uniform(14.1, 24.1),
+            )
+            for index in range(3000)
+        ]
+        directory = PointDirectory()
+        directory.upsert(points)
+
+        for _ in range(25):
+            lat, lon = rng.uniform(49.0, 54.8), rng.uniform(14.1, 24.1)
+            expected = sorted(
+                points,
+                key=lambda p: haversine_km(lat, lon, p.latitude, p.longitude),
+            )[:5]
+            result = directory.nearest(lat, lon, k=5)
+            assert [point for point, _ in result] == expected
+
+    def test_nearest_far_from_all_points(self) -> None:
+        directory = PointDirectory()
+        directory.upsert([Point("A", 50.0, 20.0), Point("B", 54.0, 18.0)])
+        result = directory.nearest(60.0, 25.0, k=1)
+        assert [point.name for point, _ in result] == ["B"]
+
+    def test_filters(self) -> None:
+        directory = PointDirectory()
+        directory.upsert(
+            [
+                Point("A", 50.0, 20.0, types=("pop",)),
+                Point("B", 50.001, 20.0, status="Disabled"),
+                Point("C", 50.002, 20.0, types=("parcel_locker",)),
+                Point("D", 50.5, 20.0, types=("parcel_locker",)),
+            ],
+        )
+        result = directory.nearest(
+            50.0,
+            20.0,
+            k=5,
+            point_type="parcel_locker",
+            max_distance_km=10.0,
+        )
+        assert [point.name for point, _ in result] == ["C"]
+
+    def test_upsert_moves_point(self) -> None:
+        directory = PointDirectory()
+        directory.upsert([Point("A", 50.0, 20.0)])
+        directory.upsert([Point("A", 52.0, 21.0)])
+        result = directory.nearest(52.0, 21.0, k=1)
+        assert result[0][1] == pytest.approx(0.0)
+        assert len(directory) == 1
+
+    def test_save_and_load(self, tmp_path: Path) -> None:
+        directory = PointDirectory()
+        directory.cursor = "2026-10-01T00:00:00+00:00"
+        directory.upsert(
+            [Point("A", 50.0, 20.0, types=("pop",), functions=("send",))],
+        )
+        path = tmp_path / "points.json"
+        directory.save(path)
+
+        loaded = PointDirectory.load(path)
+        assert loaded.cursor == directory.cursor
+        assert loaded.get("A") == directory.get("A")
+        assert len(PointDirectory.load(tmp_path / "missing.json")) == 0
+
+    @respx.mock
+    async def test_refresh_is_incremental(self) -> None:
+        route = respx.get(f"{SANDBOX_URL}/v1/points")
+        route.side_effect = [
+            httpx.Response(
+                200,
+                json={
+                    "items": [_item("A", 50.0, 20.0)],
+                    "page": 1,
+                    "total_pages": 2,
+                },
+            ),
+            httpx.Response(
+                200,
+                json={
+                    "items": [_item("B", 51.0, 20.0)],
+                    "page": 2,
+                    "total_pages": 2,
+                },
+            ),
+            httpx.Response(
+                200,
+                json={
+                    "items": [_item("A", 50.0, 20.0, status="Disabled")],
+                    "page": 1,
+                    "total_pages": 1,
+                },
+            ),
+        ]
+        client = ShipXClient(token="t", organization_id=1, sandbox=True)
+        directory = PointDirectory()
+
+        assert await directory.refresh(client) == 2
+        cursor = directory.cursor
+        assert cursor is not None
+        assert await directory.refresh(client) == 1
+        await client.close()
+
+        params = route.calls[2].request.url.params
+        assert params["updated_from"] == cursor
+        assert "updated_from" not in route.calls[0].request.url.params
+        assert not directory.get("A").operating
+        assert [p.name for p, _ in directory.nearest(50.0, 20.0, k=1)] == [
+            "B",
+        ]
+
+
+class TestTargetPointErrors:
+    def test_accepts_locker_templates_only(self) -> None:
+        point = Point("A", 50.0, 20.0, functions=("parcel_collect",))
+        assert point.accepts_template("large")
+        assert not point.accepts_template("xxl")
+        assert Point("B", 50.0, 20.0).accepts_template("small")
+
+    def test_valid_point_has_no_errors(self) -> None:
+        directory = PointDirectory()
+        directory.upsert([Point("KRA010", 50.0, 20.0)])
+        assert directory.target_point_errors("KRA010", "medium") == []
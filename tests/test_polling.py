@@ -0,0 +1,259 @@
+"""Tests for the status-aware polling scheduler."""
+
+import anyio
+import pytest
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.polling import DEFAULT_POLL_INTERVALS, PollScheduler
+from tests.conftest import FakeClock
+
+
+@pytest.fixture
+def scheduler(clock: FakeClock) -> PollScheduler:
+    return PollScheduler(jitter=0.0, clock=clock)
+
+
+class TestSchedule:
+    def test_interval_depends_on_status(
+        self,
+        scheduler: PollScheduler,
+        clock: FakeClock,
+    ) -> None:
+        scheduler.schedule("a", ShipmentStatus.OUT_FOR_DELIVERY)
+        scheduler.schedule("b", ShipmentStatus.IN_TRANSIT)
+        out_for_delivery = DEFAULT_POLL_INTERVALS[
+            ShipmentStatus.OUT_FOR_DELIVERY
+        ]
+        in_transit = DEFAULT_POLL_INTERVALS[ShipmentStatus.IN_TRANSIT]
+        assert out_for_delivery is not None
+        assert in_transit is not None
+        assert scheduler.due_at("a") == clock.now + out_for_delivery
+        assert scheduler.due_at("b") == clock.now + in_transit
+
+    @pytest.mark.parametrize(
+        "status",
+        [
+            ShipmentStatus.DELIVERED,
+            ShipmentStatus.CANCELLED,
+            ShipmentStatus.RETURNED,
+        ],
+    )
+    def test_terminal_status_stops_polling(
+        self,
+        scheduler: PollScheduler,
+        status: ShipmentStatus,
+    ) -> None:
+        scheduler.schedule("a", ShipmentStatus.IN_TRANSIT)
+        assert scheduler.schedule("a", status) is None
+        assert "a" not in scheduler
+        assert scheduler.next_due() is None
+
+    def test_accepts_status_strings(self, scheduler: PollScheduler) -> None:
+        scheduler.schedule("a", "created")
+        assert scheduler.status_of("a") == ShipmentStatus.CREATED
+
+    def test_custom_intervals(self, clock: FakeClock) -> None:
+        scheduler = PollScheduler(
+            {ShipmentStatus.IN_TRANSIT: 10.0},
+            jitter=0.0,
+            clock=clock,
+        )
+        scheduler.schedule("a", ShipmentStatus.IN_TRANSIT)
+        assert scheduler.due_at("a") == clock.now + 10.0
+
+    def test_jitter_stays_within_bounds(self, clock: FakeClock) -> None:
+        scheduler = PollScheduler(jitter=0.1, clock=clock)
+        for i in range(100):
+            scheduler.schedule(str(i), ShipmentStatus.CREATED)
+            due = scheduler.due_at(str(i))
+            assert due is not None
+            assert 54.0 <= due - clock.now <= 66.0
+
+
+class TestWebhookBackoff:
+    def test_webhook_stretches_interval(
+        self,
+        scheduler: PollScheduler,
+        clock: FakeClock,
+    ) -> None:
+        scheduler.record_webhook("a", ShipmentStatus.OUT_FOR_DELIVERY)
+        base = DEFAULT_POLL_INTERVALS[ShipmentStatus.OUT_FOR_DELIVERY]
+        assert base is not None
+        assert scheduler.due_at("a") == clock.now + base * 4
+
+    def test_backoff_expires_after_window(
+        self,
+        clock: FakeClock,
+    ) -> None:
+        scheduler = PollScheduler(
+            jitter=0.0,
+            clock=clock,
+            webhook_window=100.0,
+        )
+        scheduler.record_webhook("a", ShipmentStatus.CREATED)
+        clock.now += 200.0
+        scheduler.schedule("a", ShipmentStatus.CREATED)
+        assert scheduler.due_at("a") == clock.now + 60.0
+
+    def test_webhook_with_terminal_status_drops(
+        self,
+        scheduler: PollScheduler,
+    ) -> None:
+        scheduler.schedule("a", ShipmentStatus.OUT_FOR_DELIVERY)
+        scheduler.record_webhook("a", ShipmentStatus.DELIVERED)
+        assert "a" not in scheduler
+
+
+class TestPopDue:
+    def test_pops_in_due_order(
+        self,
+        scheduler: PollScheduler,
+        clock: FakeClock,
+    ) -> None:
+        scheduler.schedule("slow", ShipmentStatus.IN_TRANSIT)
+        scheduler.schedule("fast", ShipmentStatus.CREATED)
+        scheduler.schedule("medium", ShipmentStatus.OUT_FOR_DELIVERY)
+        assert scheduler.pop_due() == []
+        clock.now += 7 * 60 * 60
+        assert scheduler.pop_due() == ["fast", "medium", "slow"]
+        assert scheduler.pop_due() == []
+        assert scheduler.due_at("fast") is None
+        assert len(scheduler) == 3
+
+    def test_reschedule_discards_old_due_time(
+        self,
+        scheduler: PollScheduler,
+        clock: FakeClock,
+    ) -> None:
+        scheduler.schedule("a", ShipmentStatus.CREATED)
+        scheduler.schedule("a", ShipmentStatus.IN_TRANSIT)
+        clock.now += 120.0
+        assert scheduler.pop_due() == []
+
+    def test_limit(self, scheduler: PollScheduler, clock: FakeClock) -> None:
+        for i in range(5):
+            scheduler.schedule(str(i), ShipmentStatus.CREATED)
+        clock.now += 60.0
+        assert len(scheduler.pop_due(limit=2)) == 2
+        assert len(scheduler.pop_due()) == 3
+
+    def test_heap_is_compacted(self, scheduler: PollScheduler) -> None:
+        for _ in range(1000):
+            scheduler.schedule("a", ShipmentStatus.CREATED)
+        assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+
+
+class TestRun:
+    async def test_polls_and_reschedules(self) -> None:
+        scheduler = PollScheduler(
+            {ShipmentStatus.CREATED: 0.01},
+            jitter=0.0,
+        )
+        polled: list[str] = []
+
+        async def poll(shipment_id: str) -> str:
+            polled.append(shipment_id)
+            return "delivered" if len(polled) >= 3 else "created"
+
+        scheduler.schedule("a", ShipmentStatus.CREATED)
+        with anyio.move_on_after(1.0):
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(scheduler.run, poll)
+                while "a" in scheduler:
+                    await anyio.sleep(0.01)
+                task_group.cancel_scope.cancel()
+
+        assert polled == ["a", "a", "a"]
+        assert "a" not in scheduler
+
+    async def test_poll_errors_keep_shipment_scheduled(self) -> None:
+        scheduler = PollScheduler(
+            {ShipmentStatus.CREATED: 0.01},
+            jitter=0.0,
+        )
+        calls = 0
+
+        async def poll(shipment_id: str) -> str:
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("boom")
+
+        scheduler.schedule("a", ShipmentStatus.CREATED)
+        with anyio.move_on_after(0.1):
+            await scheduler.run(poll)
+
+        assert calls >= 2
+        assert scheduler.status_of("a") == ShipmentStatus.CREATED
+
+    async def test_slow_poll_does_not_stall_others(self) -> None:
+        scheduler = PollScheduler(
+            {ShipmentStatus.CREATED: 0.01},
+            jitter=0.0,
+        )
+        release = anyio.Event()
+        polled: list[str] = []
+
+        async def poll(shipment_id: str) -> None:
+            polled.append(shipment_id)
+            if shipment_id == "slow":
+                await release.wait()
+
+        scheduler.schedule("slow", ShipmentStatus.CREATED)
+        scheduler.schedule("fast", ShipmentStatus.CREATED)
+        with anyio.fail_after(1.0):
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(scheduler.run, poll)
+                while polled.count("fast") < 3:
+                    await anyio.sleep(0.01)
+                release.set()
+                task_group.cancel_scope.cancel()
+
+        assert polled.count("slow") == 1
+
+    async def test_unknown_status_keeps_shipment_scheduled(self) -> None:
+        scheduler = PollScheduler(
+            {ShipmentStatus.CREATED: 0.01},
+            jitter=0.0,
+        )
+        calls = 0
+
+        async def poll(shipment_id: str) -> str:
+            nonlocal calls
+            calls += 1
+            return "no_such_status"
+
+        scheduler.schedule("a", ShipmentStatus.CREATED)
+        with anyio.move_on_after(0.1):
+            await scheduler.run(poll)
+
+        assert calls > 1
+        assert "a" in scheduler
+
+    async def test_limits_polls_in_flight(self) -> None:
+        scheduler = PollScheduler(jitter=0.0)
+        in_flight = 0
+        peak = 0
+        polled = 0
+
+        async def poll(shipment_id: str) -> str:
+            nonlocal in_flight, peak, polled
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await anyio.sleep(0.01)
+            in_flight -= 1
+            polled += 1
+            return "delivered"
+
+        for i in range(6):
+            scheduler.schedule(str(i), ShipmentStatus.CREATED, now=0.0)
+        with anyio.fail_after(1.0):
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(
+                    lambda: scheduler.run(poll, concurrency=2),
+                )
+                while polled < 6:
+                    await anyio.sleep(0.01)
+                task_group.cancel_scope.cancel()
+
+        assert peak == 2
+        assert len(scheduler) == 0
@@ -0,0 +1,146 @@
+"""Tests for the multi-tenant ShipX client pool."""
+
+from typing import Any
+
+import anyio
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.pool import ShipXClientPool
+from tests.conftest import FakeClock
+
+
+class TestShipXClientPool:
+    async def test_reuses_client_per_tenant(self) -> None:
+        pool = ShipXClientPool()
+        async with pool.client("t1", 1) as first:
+            pass
+        async with pool.client("t1", 1) as second:
+            pass
+        async with pool.client("t2", 2) as other:
+            pass
+
+        assert first is second
+        assert other is not first
+        assert pool.open_clients == 2
+        usage = pool.usage()
+        assert usage[(1, first.base_url)].leases == 2
+        assert usage[(1, first.base_url)].clients_created == 1
+        await pool.aclose()
+
+    async def test_client_limits_follow_per_tenant_share(self) -> None:
+        built: list[dict[str, Any]] = []
+
+        def _factory(**kwargs: Any) -> ShipXClient:
+            built.append(kwargs)
+            return ShipXClient(**kwargs)
+
+        pool = ShipXClientPool(
+            max_connections=20,
+            connections_per_tenant=5,
+            client_factory=_factory,
+        )
+        async with pool.client("t", 1, sandbox=True) as client:
+            assert client.base_url == SANDBOX_BASE_URL
+        assert built[0]["max_connections"] == 5
+        assert built[0]["max_keepalive_connections"] == 5
+        assert pool.max_clients == 4
+        await pool.aclose()
+
+    async def test_evicts_least_recently_used_idle_tenant(self) -> None:
+        pool = ShipXClientPool(max_connections=20, connections_per_tenant=10)
+        async with pool.client("t1", 1) as first:
+            pass
+        async with pool.client("t2", 2):
+            pass
+        async with pool.client("t1", 1):
+            pass
+        async with pool.client("t3", 3):
+            pass
+
+        assert pool.open_clients == 2
+        usage = pool.usage()
+        assert usage[(2, first.base_url)].evictions == 1
+        assert usage[(1, first.base_url)].evictions == 0
+        await pool.aclose()
+
+    async def test_waits_when_all_clients_are_leased(self) -> None:
+        pool = ShipXClientPool(max_connections=10, connections_per_tenant=10)
+        order: list[str] = []
+
+        async def _second() -> None:
+            async with pool.client("t2", 2):
+                order.append("second")
+
+        async with (
+            anyio.create_task_group() as task_group,
+            pool.client("t1", 1),
+        ):
+            task_group.start_soon(_second)
+            await anyio.sleep(0.05)
+            order.append("first done")
+
+        assert order == ["first done", "second"]
+        assert pool.open_clients == 1
+        await pool.aclose()
+
+    async def test_every_waiter_is_served(self) -> None:
+        pool = ShipXClientPool(max_connections=10, connections_per_tenant=10)
+        served: list[int] = []
+
+        async def _wait(organization_id: int) -> None:
+            async with pool.client(f"t{organization_id}", organization_id):
+                served.append(organization_id)
+
+        with anyio.fail_after(1):
+            async with (
+                anyio.create_task_group() as task_group,
+                pool.client("t1", 1),
+            ):
+                task_group.start_soon(_wait, 2)
+                task_group.start_soon(_wait, 3)
+                await anyio.wait_all_tasks_blocked()
+
+        assert sorted(served) == [2, 3]
+        await pool.aclose()
+
+    async def test_rotated_token_replaces_client(self) -> None:
+        pool = ShipXClientPool()
+        async with pool.client("old", 1) as old:
+            async with pool.client("new", 1) as new:
+                assert new is not old
+                assert pool.open_clients == 2
+            assert not old._http.is_closed
+        assert old._http.is_closed
+        assert pool.open_clients == 1
+        await pool.aclose()
+
+    async def test_close_idle(self, clock: FakeClock) -> None:
+        pool = ShipXClientPool(idle_timeout=60.0, clock=clock)
+        async with pool.client("t1", 1) as client:
+            pass
+        clock.now += 30.0
+        assert await pool.close_idle() == 0
+        clock.now += 31.0
+        assert await pool.close_idle() == 1
+        assert client._http.is_closed
+        assert pool.open_clients == 0
+
+    async def test_leased_client_sends_tenant_token(self) -> None:
+        pool = ShipXClientPool()
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            route = mock.get("/v1/shipments/1").mock(
+                return_value=httpx.Response(200, json={"id": 1}),
+            )
+            async with pool.client("secret", 7, sandbox=True) as client:
+                await client.get_shipment(shipment_id=1)
+
+        request = route.calls.last.request
+        assert request.headers["Authorization"] == "Bearer secret"
+        await pool.aclose()
+
+    def test_rejects_cap_below_one_client(self) -> None:
+        with pytest.raises(ValueError, match="max_connections"):
+            ShipXClientPool(max_connections=5, connections_per_tenant=10)
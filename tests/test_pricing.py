@@ -0,0 +1,167 @@
+"""Tests for price calculation and caching."""
+
+import json
+from decimal import Decimal
+from typing import Any
+
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.cache import TTLCache
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.exceptions import ShipXValidationError
+from sendparcel_inpost.pricing import price_cache_key, quote_from_price
+
+SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
+CALCULATE_URL = f"{SANDBOX_URL}/v1/organizations/12345/shipments/calculate"
+
+
+def _locker(template: str, **extra: Any) -> dict[str, Any]:
+    return {
+        "service": "inpost_locker_standard",
+        "parcels": [{"template": template}],
+        "receiver": {"email": "a@example.com"},
+        **extra,
+    }
+
+
+def _calculate(request: httpx.Request) -> httpx.Response:
+    shipments = json.loads(request.content)["shipments"]
+    prices = {"small": "12.99", "medium": "13.99", "large": "15.99"}
+    return httpx.Response(
+        200,
+        json=[
+            {
+                "id": shipment["id"],
+                "calculated_charge_amount": prices[
+                    shipment["parcels"][0]["template"]
+                ],
+                "currency": "PLN",
+            }
+            for shipment in shipments
+        ],
+    )
+
+
+class TestPriceCacheKey:
+    def test_ignores_receiver_and_orientation(self) -> None:
+        first = {
+            "service": "inpost_courier_standard",
+            "parcels": [
+                {
+                    "dimensions": {
+                        "length": 30,
+                        "width": 20,
+                        "height": 10,
+                        "unit": "cm",
+                    },
+                    "weight": {"amount": 1000, "unit": "g"},
+                },
+            ],
+            "receiver": {"email": "a@example.com"},
+        }
+        second = {
+            "service": "inpost_courier_standard",
+            "parcels": [
+                {
+                    "dimensions": {
+                        "length": 100,
+                        "width": 300,
+                        "height": 200,
+                        "unit": "mm",
+                    },
+                    "weight": {"amount": 1, "unit": "kg"},
+                },
+            ],
+            "receiver": {"email": "b@example.com"},
+        }
+        assert price_cache_key(1, first) == price_cache_key(1, second)
+        assert price_cache_key(1, first) != price_cache_key(2, first)
+
+    def test_options_change_the_key(self) -> None:
+        base = price_cache_key(1, _locker("small"))
+        assert base != price_cache_key(1, _locker("medium"))
+        assert base != price_cache_key(
+            1,
+            _locker("small", cod={"amount": 100, "currency": "PLN"}),
+        )
+        assert base != price_cache_key(
+            1,
+            _locker(
+                "small", custom_attributes={"sending_method": "parcel_locker"}
+            ),
+        )
+
+
+class TestCalculatePrices:
+    @respx.mock
+    async def test_dedupes_and_batches(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.post(CALCULATE_URL).mock(side_effect=_calculate)
+        payloads = [
+            _locker("small"),
+            _locker("medium"),
+            _locker("small", receiver={"email": "other@example.com"}),
+            _locker("large"),
+        ]
+
+        results = await shipx_client.calculate_prices(payloads, batch_size=2)
+
+        amounts = [result["calculated_charge_amount"] for result in results]
+        assert amounts == ["12.99", "13.99", "12.99", "15.99"]
+        assert route.call_count == 2
+        sizes = [
+            len(json.loads(call.request.content)["shipments"])
+            for call in route.calls
+        ]
+        assert sizes == [2, 1]
+
+    @respx.mock
+    async def test_serves_repeat_quotes_from_cache(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.post(CALCULATE_URL).mock(side_effect=_calculate)
+        cache: TTLCache = TTLCache(60.0)
+
+        await shipx_client.calculate_prices([_locker("small")], cache=cache)
+        [result] = await shipx_client.calculate_prices(
+            [_locker("small")],
+            cache=cache,
+        )
+
+        assert result["calculated_charge_amount"] == "12.99"
+        assert route.call_count == 1
+
+    @respx.mock
+    async def test_errors_are_not_cached(
+        self,
+        shipx_client: ShipXClient,
+    ) -> None:
+        route = respx.post(CALCULATE_URL).respond(
+            json=[{"id": "0", "error": "invalid_parcel"}],
+        )
+        cache: TTLCache = TTLCache(60.0)
+
+        for _ in range(2):
+            [result] = await shipx_client.calculate_prices(
+                [_locker("small")],
+                cache=cache,
+            )
+            assert result["error"] == "invalid_parcel"
+        assert route.call_count == 2
+
+
+class TestQuoteFromPrice:
+    def test_converts_amount(self) -> None:
+        quote = quote_from_price(
+            {"calculated_charge_amount": "12.99", "currency": "PLN"},
+        )
+        assert quote == {"amount": Decimal("12.99"), "currency": "PLN"}
+
+    def test_error_raises_validation_error(self) -> None:
+        with pytest.raises(ShipXValidationError):
+            quote_from_price({"error": "invalid_parcel"})
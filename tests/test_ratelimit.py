@@ -0,0 +1,143 @@
+"""Tests for client-side rate limiting."""
+
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.ratelimit import (
+    MemoryRateLimitBackend,
+    RateLimiter,
+    SQLiteRateLimitBackend,
+    parse_retry_after,
+)
+from tests.conftest import FakeClock
+
+
+class TestMemoryBackend:
+    async def test_spaces_requests_after_burst(self, clock: FakeClock) -> None:
+        backend = MemoryRateLimitBackend(clock=clock)
+        waits = [await backend.reserve("k", 0.5, 2) for _ in range(4)]
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+
+    async def test_idle_time_refills_burst(self, clock: FakeClock) -> None:
+        backend = MemoryRateLimitBackend(clock=clock)
+        for _ in range(3):
+            await backend.reserve("k", 1.0, 2)
+        clock.now += 10.0
+        assert await backend.reserve("k", 1.0, 2) == 0.0
+        assert await backend.reserve("k", 1.0, 2) == 0.0
+
+    async def test_keys_are_independent(self, clock: FakeClock) -> None:
+        backend = MemoryRateLimitBackend(clock=clock)
+        await backend.reserve("a", 1.0, 1)
+        assert await backend.reserve("b", 1.0, 1) == 0.0
+
+
+class TestSQLiteBackend:
+    async def test_state_is_shared_between_connections(
+        self,
+        tmp_path: Path,
+        clock: FakeClock,
+    ) -> None:
+        path = str(tmp_path / "limits.db")
+        first = SQLiteRateLimitBackend(path, clock=clock)
+        second = SQLiteRateLimitBackend(path, clock=clock)
+
+        assert await first.reserve("org:1", 1.0, 1) == 0.0
+        assert await second.reserve("org:1", 1.0, 1) == 1.0
+        assert await first.reserve("org:1", 1.0, 1) == 2.0
+        first.close()
+        second.close()
+
+    async def test_penalize_only_moves_forward(
+        self,
+        tmp_path: Path,
+        clock: FakeClock,
+    ) -> None:
+        backend = SQLiteRateLimitBackend(
+            str(tmp_path / "limits.db"),
+            clock=clock,
+        )
+        await backend.penalize("k", clock.now + 30.0)
+        await backend.penalize("k", clock.now + 5.0)
+        assert await backend.reserve("k", 1.0, 1) == 30.0
+        backend.close()
+
+
+class TestRateLimiter:
+    async def test_penalize_blocks_whole_burst(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(
+            MemoryRateLimitBackend(clock=clock),
+            key="k",
+            rate=10.0,
+            burst=5,
+            clock=clock,
+        )
+        await limiter.penalize(2.0)
+        wait = await limiter.backend.reserve("k", 0.1, 5)
+        assert wait == pytest.approx(2.0)
+
+    def test_rejects_invalid_rate(self) -> None:
+        with pytest.raises(ValueError, match="rate"):
+            RateLimiter(MemoryRateLimitBackend(), key="k", rate=0)
+
+
+class TestParseRetryAfter:
+    def test_seconds(self) -> None:
+        assert parse_retry_after("12") == 12.0
+
+    def test_http_date(self) -> None:
+        value = "Thu, 01 Jan 1970 00:01:40 GMT"
+        assert parse_retry_after(value, now=70.0) == 30.0
+
+    def test_invalid(self) -> None:
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestClientRateLimiting:
+    async def test_requests_reserve_slots(self) -> None:
+        backend = MemoryRateLimitBackend()
+        limiter = RateLimiter(backend, key="org:1", rate=1000.0, burst=10)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            rate_limiter=limiter,
+        )
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/services").mock(
+                return_value=httpx.Response(200, json=[]),
+            )
+            await client.get_services()
+            await client.get_services()
+        await client.close()
+
+        assert backend._tat["org:1"] > 0
+
+    async def test_429_penalizes_shared_budget(self) -> None:
+        backend = MemoryRateLimitBackend()
+        limiter = RateLimiter(backend, key="org:1", rate=1000.0)
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            rate_limiter=limiter,
+        )
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/services").mock(
+                return_value=httpx.Response(
+                    429,
+                    headers={"Retry-After": "30"},
+                    json={"error": "too_many_requests"},
+                ),
+            )
+            with pytest.raises(ShipXAPIError):
+                await client.get_services()
+        await client.close()
+
+        assert await backend.reserve("org:1", 0.001, 1) > 29.0
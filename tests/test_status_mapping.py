@@ -4,8 +4,10 @@ import pytest
 from sendparcel.enums import ShipmentStatus
 
 from sendparcel_inpost.status_mapping import (
+    SENDPARCEL_TO_SHIPX_STATUSES,
     SHIPX_TO_SENDPARCEL_STATUS,
     map_shipx_status,
+    shipx_statuses_for,
 )
 
 
@@ -55,3 +57,22 @@ class TestStatusMapping:
         for shipx, sendparcel in SHIPX_TO_SENDPARCEL_STATUS.items():
             assert isinstance(shipx, str)
             assert isinstance(sendparcel, ShipmentStatus)
+
+
+class TestReverseMapping:
+    def test_every_shipx_status_is_reachable(self) -> None:
+        reverse = {
+            shipx_status
+            for names in SENDPARCEL_TO_SHIPX_STATUSES.values()
+            for shipx_status in names
+        }
+        assert reverse == set(SHIPX_TO_SENDPARCEL_STATUS)
+
+    def test_shipx_statuses_for(self) -> None:
+        assert shipx_statuses_for([ShipmentStatus.LABEL_READY]) == [
+            "confirmed",
+        ]
+        assert "avizo" in shipx_statuses_for(
+            [ShipmentStatus.OUT_FOR_DELIVERY],
+        )
+        assert shipx_statuses_for([ShipmentStatus.NEW]) == []
@@ -0,0 +1,114 @@
+"""Tests for incremental tracking-history processing."""
+
+from typing import Any
+
+import httpx
+import respx
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.client import SANDBOX_BASE_URL, ShipXClient
+from sendparcel_inpost.exceptions import ShipXAPIError
+from sendparcel_inpost.tracking import TrackingHistoryProcessor
+from sendparcel_inpost.types import ShipXTrackingEvent
+
+
+def _tracking(*events: tuple[str, str]) -> dict[str, Any]:
+    # ShipX lists the newest event first.
+    return {
+        "tracking_details": [
+            {"status": status, "datetime": stamp}
+            for stamp, status in reversed(events)
+        ],
+    }
+
+
+CREATED = ("2026-01-15T10:00:00", "created")
+CONFIRMED = ("2026-01-15T10:05:00", "confirmed")
+DELIVERED = ("2026-01-16T12:00:00", "delivered")
+
+
+class TestDiff:
+    def test_first_response_reports_whole_history(self) -> None:
+        processor = TrackingHistoryProcessor()
+        events = processor.diff("T1", _tracking(CREATED, CONFIRMED))
+        assert events == [
+            ShipXTrackingEvent(*CREATED, ShipmentStatus.CREATED),
+            ShipXTrackingEvent(*CONFIRMED, ShipmentStatus.LABEL_READY),
+        ]
+
+    def test_only_new_events_are_reported(self) -> None:
+        processor = TrackingHistoryProcessor()
+        processor.diff("T1", _tracking(CREATED))
+        events = processor.diff("T1", _tracking(CREATED, CONFIRMED, DELIVERED))
+        assert [event.shipx_status for event in events] == [
+            "confirmed",
+            "delivered",
+        ]
+
+    def test_unchanged_history_reports_nothing(self) -> None:
+        processor = TrackingHistoryProcessor()
+        processor.diff("T1", _tracking(CREATED, CONFIRMED))
+        assert processor.diff("T1", _tracking(CREATED, CONFIRMED)) == []
+
+    def test_rewritten_history_falls_back_to_timestamp(self) -> None:
+        processor = TrackingHistoryProcessor()
+        processor.diff("T1", _tracking(CREATED, CONFIRMED))
+        events = processor.diff(
+            "T1",
+            _tracking(("2026-01-15T10:01:00", "offer_selected"), DELIVERED),
+        )
+        assert [event.shipx_status for event in events] == ["delivered"]
+
+    def test_new_event_sharing_last_timestamp(self) -> None:
+        processor = TrackingHistoryProcessor()
+        processor.diff("T1", _tracking(CREATED, CONFIRMED))
+        same_time = (CONFIRMED[0], "dispatched_by_sender")
+        # CREATED dropped: the history was rewritten, not appended to.
+        events = processor.diff("T1", _tracking(CONFIRMED, same_time))
+        assert [event.shipx_status for event in events] == [
+            "dispatched_by_sender",
+        ]
+
+    def test_forget_and_eviction(self) -> None:
+        processor = TrackingHistoryProcessor(max_tracked=1)
+        processor.diff("T1", _tracking(CREATED))
+        processor.diff("T2", _tracking(CREATED))
+        assert len(processor) == 1
+        assert processor.diff("T1", _tracking(CREATED)) != []
+        processor.forget("T1")
+        assert len(processor) == 0
+
+
+class TestBatch:
+    def test_process_skips_errors_and_unchanged(self) -> None:
+        processor = TrackingHistoryProcessor()
+        processor.diff("T2", _tracking(CREATED))
+        changes = processor.process(
+            {
+                "T1": _tracking(CREATED),
+                "T2": _tracking(CREATED),
+                "T3": ShipXAPIError(status_code=404, detail="not found"),
+            },
+        )
+        assert list(changes) == ["T1"]
+
+    async def test_poll(self) -> None:
+        processor = TrackingHistoryProcessor()
+        client = ShipXClient(token="t", organization_id=1, sandbox=True)
+        with respx.mock(base_url=SANDBOX_BASE_URL) as mock:
+            mock.get("/v1/tracking/T1").mock(
+                side_effect=[
+                    httpx.Response(200, json=_tracking(CREATED)),
+                    httpx.Response(200, json=_tracking(CREATED, DELIVERED)),
+                ],
+            )
+            first = await processor.poll(client, ["T1"])
+            second = await processor.poll(client, ["T1"])
+        await client.close()
+
+        assert [event.status for event in first["T1"]] == [
+            ShipmentStatus.CREATED,
+        ]
+        assert [event.status for event in second["T1"]] == [
+            ShipmentStatus.DELIVERED,
+        ]
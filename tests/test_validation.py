@@ -0,0 +1,183 @@
+"""Tests for local shipment payload validation."""
+
+from typing import Any
+
+import httpx
+import pytest
+import respx
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.exceptions import ShipXValidationError
+from sendparcel_inpost.validation import (
+    PayloadValidator,
+    validate_shipment_payload,
+)
+
+SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
+
+RECEIVER: dict[str, Any] = {
+    "first_name": "Anna",
+    "last_name": "Odbiorca",
+    "phone": "600 200 300",
+    "email": "anna@example.com",
+    "address": {
+        "street": "Odbiorcza",
+        "building_number": "5",
+        "city": "Krakow",
+        "post_code": "30-001",
+        "country_code": "PL",
+    },
+}
+
+
+def _locker(**overrides: Any) -> dict[str, Any]:
+    return {
+        "service": "inpost_locker_standard",
+        "receiver": RECEIVER,
+        "parcels": [{"template": "small"}],
+        "custom_attributes": {"target_point": "KRA010"},
+        **overrides,
+    }
+
+
+def _courier(**overrides: Any) -> dict[str, Any]:
+    return {
+        "service": "inpost_courier_standard",
+        "receiver": RECEIVER,
+        "parcels": [
+            {
+                "dimensions": {
+                    "length": 300,
+                    "width": 200,
+                    "height": 150,
+                    "unit": "mm",
+                },
+                "weight": {"amount": 2.5, "unit": "kg"},
+            },
+        ],
+        **overrides,
+    }
+
+
+def _fields(payload: dict[str, Any]) -> list[str]:
+    return [error["field"] for error in validate_shipment_payload(payload)]
+
+
+class TestLockerPayloads:
+    def test_valid(self) -> None:
+        assert validate_shipment_payload(_locker()) == []
+
+    def test_reports_all_problems_at_once(self) -> None:
+        payload = _locker(
+            receiver={"phone": "12345", "email": "not-an-email"},
+            parcels=[{"template": "huge"}],
+            custom_attributes={},
+        )
+        assert _fields(payload) == [
+            "receiver.phone",
+            "receiver.email",
+            "custom_attributes.target_point",
+            "parcels[0].template",
+        ]
+
+    def test_dimensions_must_fit_template(self) -> None:
+        parcel = {
+            "template": "small",
+            "dimensions": {
+                "length": 60,
+                "width": 35,
+                "height": 15,
+                "unit": "cm",
+            },
+        }
+        errors = validate_shipment_payload(_locker(parcels=[parcel]))
+        assert errors == [
+            {
+                "field": "parcels[0].dimensions",
+                "message": "do not fit the small template",
+            },
+        ]
+        parcel["template"] = "medium"
+        assert validate_shipment_payload(_locker(parcels=[parcel])) == []
+
+    def test_sender_post_code_format(self) -> None:
+        sender = {"address": {"post_code": "30001", "country_code": "PL"}}
+        assert _fields(_locker(sender=sender)) == ["sender.address.post_code"]
+        sender = {"address": {"post_code": "10115", "country_code": "DE"}}
+        assert _fields(_locker(sender=sender)) == []
+
+
+class TestCourierPayloads:
+    def test_valid(self) -> None:
+        assert validate_shipment_payload(_courier()) == []
+
+    def test_requires_address_and_name(self) -> None:
+        receiver = {"phone": "+48600200300", "email": "a@example.com"}
+        assert _fields(_courier(receiver=receiver)) == [
+            "receiver.name",
+            "receiver.address",
+        ]
+
+    def test_limits(self) -> None:
+        parcel = {
+            "dimensions": {
+                "length": 400,
+                "width": 20,
+                "height": 20,
+                "unit": "cm",
+            },
+            "weight": {"amount": 60, "unit": "kg"},
+        }
+        assert _fields(_courier(parcels=[parcel])) == [
+            "parcels[0].dimensions",
+            "parcels[0].weight",
+        ]
+
+    def test_weight_only_parcel_needs_dimensions(self) -> None:
+        parcel = {"weight": {"amount": 1.0, "unit": "kg"}}
+        assert _fields(_courier(parcels=[parcel])) == ["parcels[0].dimensions"]
+
+    def test_custom_limits(self) -> None:
+        validator = PayloadValidator(courier_max_weight_kg=2.0)
+        assert [e["field"] for e in validator.validate(_courier())] == [
+            "parcels[0].weight",
+        ]
+
+
+def test_unknown_service() -> None:
+    assert _fields({"service": "pigeon"}) == ["service"]
+
+
+class TestClientValidation:
+    @respx.mock
+    async def test_invalid_payload_is_not_sent(self) -> None:
+        route = respx.post(f"{SANDBOX_URL}/v1/organizations/1/shipments")
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            validate_payloads=True,
+        )
+        with pytest.raises(ShipXValidationError) as exc_info:
+            await client.create_shipment(payload=_locker(parcels=[]))
+        await client.close()
+
+        assert exc_info.value.errors == [
+            {"field": "parcels", "message": "is required"},
+        ]
+        assert not route.called
+
+    @respx.mock
+    async def test_valid_payload_is_sent(self) -> None:
+        route = respx.post(
+            f"{SANDBOX_URL}/v1/organizations/1/shipments",
+        ).mock(return_value=httpx.Response(201, json={"id": 1}))
+        client = ShipXClient(
+            token="t",
+            organization_id=1,
+            sandbox=True,
+            validate_payloads=True,
+        )
+        await client.create_shipment(payload=_courier())
+        await client.close()
+        assert route.called
@@ -0,0 +1,128 @@
+"""Tests for the shipment status waiter registry."""
+
+import anyio
+import pytest
+import respx
+from sendparcel.enums import ShipmentStatus
+
+from sendparcel_inpost.client import ShipXClient
+from sendparcel_inpost.waiters import StatusWaiterRegistry, status_satisfies
+
+SANDBOX_URL = "https://sandbox-api-shipx-pl.easypack24.net"
+
+
+class TestStatusSatisfies:
+    @pytest.mark.parametrize(
+        ("status", "target", "expected"),
+        [
+            (ShipmentStatus.LABEL_READY, ShipmentStatus.LABEL_READY, True),
+            (ShipmentStatus.IN_TRANSIT, ShipmentStatus.LABEL_READY, True),
+            (ShipmentStatus.CREATED, ShipmentStatus.LABEL_READY, False),
+            (ShipmentStatus.CANCELLED, ShipmentStatus.LABEL_READY, True),
+            (ShipmentStatus.FAILED, ShipmentStatus.DELIVERED, True),
+        ],
+    )
+    def test_rules(
+        self,
+        status: ShipmentStatus,
+        target: ShipmentStatus,
+        expected: bool,
+    ) -> None:
+        assert status_satisfies(status, target) is expected
+
+
+class TestRegistry:
+    async def test_notify_resolves_waiter(self) -> None:
+        registry = StatusWaiterRegistry()
+        results: list[ShipmentStatus] = []
+
+        async def _wait() -> None:
+            results.append(
+                await registry.wait(1, "confirmed", timeout=1.0),
+            )
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(_wait)
+            await anyio.sleep(0.01)
+            assert registry.waiting(1) == 1
+            assert registry.notify(1, "created") == 0
+            assert registry.notify("1", "confirmed") == 1
+
+        assert results == [ShipmentStatus.LABEL_READY]
+        assert registry.waiting(1) == 0
+
+    async def test_recent_status_returns_immediately(self) -> None:
+        registry = StatusWaiterRegistry()
+        registry.notify(1, "dispatched_by_sender")
+        status = await registry.wait(
+            1,
+            ShipmentStatus.LABEL_READY,
+            timeout=0.01,
+        )
+        assert status == ShipmentStatus.IN_TRANSIT
+
+    async def test_timeout(self) -> None:
+        registry = StatusWaiterRegistry()
+        with pytest.raises(TimeoutError):
+            await registry.wait(1, ShipmentStatus.LABEL_READY, timeout=0.01)
+        assert registry.waiting(1) == 0
+
+    async def test_ignores_unknown_status_and_missing_id(self) -> None:
+        registry = StatusWaiterRegistry()
+        assert registry.notify(None, "confirmed") == 0
+        assert registry.notify(1, "no_such_status") == 0
+
+    async def test_poll_fallback(self) -> None:
+        registry = StatusWaiterRegistry()
+        statuses = iter(["created", "created", "confirmed"])
+        calls = 0
+
+        async def _poll() -> str:
+            nonlocal calls
+            calls += 1
+            return next(statuses)
+
+        status = await registry.wait(
+            1,
+            ShipmentStatus.LABEL_READY,
+            timeout=1.0,
+            poll=_poll,
+            poll_interval=0.01,
+        )
+        assert status == ShipmentStatus.LABEL_READY
+        assert calls == 3
+
+    async def test_poll_errors_are_retried(self) -> None:
+        registry = StatusWaiterRegistry()
+        responses: list[str | Exception] = [RuntimeError("boom"), "confirmed"]
+
+        async def _poll() -> str:
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        status = await registry.wait(
+            1,
+            ShipmentStatus.LABEL_READY,
+            timeout=1.0,
+            poll=_poll,
+            poll_interval=0.01,
+        )
+        assert status == ShipmentStatus.LABEL_READY
+
+
+class TestClientAwaitStatus:
+    @respx.mock
+    async def test_polls_get_shipment(self, shipx_client: ShipXClient) -> None:
+        route = respx.get(f"{SANDBOX_URL}/v1/shipments/999").respond(
+            json={"id": 999, "status": "confirmed"},
+        )
+        status = await shipx_client.await_status(
+            999,
+            ShipmentStatus.LABEL_READY,
+            timeout=1.0,
+            registry=StatusWaiterRegistry(),
+        )
+        assert status == ShipmentStatus.LABEL_READY
+        assert route.call_count == 1